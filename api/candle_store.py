@@ -0,0 +1,361 @@
+# api/candle_store.py
+"""
+Sütunsal mum deposu (sembol + timeframe başına bir klasör).
+
+  {root}/{CODE}_{tf}/t.i8                 int64   bar açılışı, epoch saniye (UTC)
+                     o.f8 h.f8 l.f8 c.f8  float64
+                     v.i8                 int64
+                     meta.json            fetched_at, last_update, source
+
+Kolon dosyaları başlıksız little-endian dizilerdir; okuma np.memmap ile
+yalnızca son N barın dilimini alır (JSON / ISO string parse yok).
+
+Yazma yalnızca sona eklemedir: merge() gelen barların ilk zaman damgasından
+itibaren kuyruğu keser (son bar genelde henüz kapanmamış yarım mumdur,
+güncellenir) ve yeni barları dosya sonuna yazar. Dosya STORE_MAX_BARS'ın
+iki katını geçince son STORE_MAX_BARS bar ile yeniden yazılır.
+
+ByteLRU: store'un önündeki bellek katmanı (byte sınırlı LRU).
+
+resample(): türetilmiş çözünürlükler (30m/1h/4h/1d/1w) için vektörel OHLCV
+birleştirme; kova sınırları verilen saat diliminin duvar saatine hizalıdır.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = (("t", "<i8"), ("o", "<f8"), ("h", "<f8"), ("l", "<f8"), ("c", "<f8"), ("v", "<i8"))
+_ITEM = 8  # tüm kolonlar 8 byte
+
+STORE_MAX_BARS = int(os.getenv("CANDLE_STORE_MAX_BARS", "5000"))
+
+
+def empty_bars() -> Dict[str, np.ndarray]:
+    return {name: np.zeros(0, dtype=dt) for name, dt in COLUMNS}
+
+
+def bars_from_frame(df: Any) -> Dict[str, np.ndarray]:
+    """
+    yfinance dataframe -> kolon dizileri (zaman sıralı, tekrarsız).
+    Naive index UTC kabul edilir; Close'u boş barlar ve OHLC'si tamamen 0 olanlar atılır.
+    """
+    if df is None or len(df) == 0:
+        return empty_bars()
+
+    if isinstance(df.columns, pd.MultiIndex):
+        # yeni yfinance tek ticker için de (alan, ticker) döner
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
+    df = df.loc[:, ~df.columns.duplicated()]
+    if "Close" not in df.columns:
+        return empty_bars()
+
+    idx = pd.DatetimeIndex(df.index)
+    idx = idx.tz_localize("UTC") if idx.tz is None else idx.tz_convert("UTC")
+    t = ((idx - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)).to_numpy(dtype=np.int64)
+
+    def col(name: str) -> np.ndarray:
+        if name not in df.columns:
+            return np.zeros(len(df), dtype=np.float64)
+        return pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=np.float64)
+
+    o, h, l, c, v = col("Open"), col("High"), col("Low"), col("Close"), col("Volume")
+    keep = ~np.isnan(c)
+    o, h, l, v = (np.nan_to_num(a) for a in (o, h, l, v))
+    keep &= ~((o == 0) & (h == 0) & (l == 0) & (c == 0))
+
+    bars = {"t": t[keep], "o": o[keep], "h": h[keep], "l": l[keep], "c": c[keep], "v": v[keep].astype(np.int64)}
+    return _sorted_unique(bars)
+
+
+def _sorted_unique(bars: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    t = bars["t"]
+    if len(t) < 2 or (np.all(t[1:] > t[:-1])):
+        return bars
+    # aynı zaman damgasında son gelen geçerli
+    order = np.argsort(t, kind="stable")
+    ts = t[order]
+    last = np.append(ts[1:] != ts[:-1], True)
+    sel = order[last]
+    return {name: bars[name][sel] for name, _ in COLUMNS}
+
+
+# ============================================================
+# YENİDEN ÖRNEKLEME
+# ============================================================
+_EPOCH = pd.Timestamp(0, tz="UTC")
+
+
+# Sabit genişlikli kurallar (sn). Aralık bu süreden kısaysa ve iki uçta
+# UTC ofseti aynıysa arada yaz saati geçişi olamaz -> saf NumPy yolu.
+_FIXED_RULES = {"15min": 900, "30min": 1800, "1h": 3600, "4h": 14400, "1D": 86400}
+_FIXED_OFFSET_MAX_SPAN = 120 * 86400
+
+
+def _utc_offset(ts: int, tz: Any) -> int:
+    return int(datetime.fromtimestamp(ts, tz).utcoffset().total_seconds())
+
+
+def bucket_keys(t: np.ndarray, rule: str, tz: Any) -> np.ndarray:
+    """
+    Her bar için kova başlangıcı (epoch saniye). rule: pandas floor frekansı
+    ("30min", "1h", "4h", "1D") ya da "1W" (pazartesi 00:00).
+    """
+    t = np.asarray(t, dtype=np.int64)
+    width = _FIXED_RULES.get(rule)
+    if width and len(t) and int(t[-1]) - int(t[0]) < _FIXED_OFFSET_MAX_SPAN:
+        off = _utc_offset(int(t[0]), tz)
+        if off == _utc_offset(int(t[-1]), tz):
+            return (t + off) // width * width - off
+
+    local = pd.DatetimeIndex(pd.to_datetime(t, unit="s", utc=True)).tz_convert(tz)
+    if rule == "1W":
+        keys = local.normalize() - pd.to_timedelta(local.dayofweek, unit="D")
+    else:
+        # yaz saati geçişinde belirsiz/olmayan duvar saatleri için sabit seçim
+        keys = local.floor(rule, ambiguous=False, nonexistent="shift_backward")
+    return ((keys.tz_convert("UTC") - _EPOCH) // pd.Timedelta(seconds=1)).to_numpy(dtype=np.int64)
+
+
+def resample(bars: Dict[str, np.ndarray], rule: str, tz: Any) -> Dict[str, np.ndarray]:
+    """
+    OHLC birleştirme standardı: O=ilk, H=max, L=min, C=son, V=toplam.
+    bars zaman sıralı olmalı (depodan okunan seriler öyledir).
+    """
+    t = bars["t"]
+    if len(t) == 0:
+        return empty_bars()
+    keys = bucket_keys(t, rule, tz)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(t)] - 1
+    return {
+        "t": keys[starts],
+        "o": bars["o"][starts],
+        "h": np.maximum.reduceat(bars["h"], starts),
+        "l": np.minimum.reduceat(bars["l"], starts),
+        "c": bars["c"][ends],
+        "v": np.add.reduceat(bars["v"], starts),
+    }
+
+
+class CandleStore:
+    def __init__(self, root: str):
+        self.root = root
+        self._locks: Dict[str, threading.RLock] = {}
+        self._guard = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    # ------------------------------------------------------------
+    def _dir(self, code: str, tf: str) -> str:
+        return os.path.join(self.root, f"{code}_{tf}")
+
+    def _file(self, code: str, tf: str, name: str) -> str:
+        return os.path.join(self._dir(code, tf), f"{name}.{'i8' if name in ('t', 'v') else 'f8'}")
+
+    def _lock(self, code: str, tf: str) -> threading.RLock:
+        key = f"{code}_{tf}"
+        with self._guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.RLock()
+            return lock
+
+    def _count(self, code: str, tf: str) -> int:
+        # yarım kalmış bir yazımda kolonlar farklı uzunlukta olabilir -> en kısası
+        n = None
+        for name, _ in COLUMNS:
+            try:
+                size = os.path.getsize(self._file(code, tf, name)) // _ITEM
+            except OSError:
+                return 0
+            n = size if n is None else min(n, size)
+        return n or 0
+
+    # ------------------------------------------------------------
+    # OKUMA
+    # ------------------------------------------------------------
+    def count(self, code: str, tf: str) -> int:
+        with self._lock(code, tf):
+            return self._count(code, tf)
+
+    def last_ts(self, code: str, tf: str) -> Optional[int]:
+        with self._lock(code, tf):
+            n = self._count(code, tf)
+            if n == 0:
+                return None
+            mm = np.memmap(self._file(code, tf, "t"), dtype="<i8", mode="r", shape=(n,))
+            return int(mm[-1])
+
+    def tail(
+        self,
+        code: str,
+        tf: str,
+        n: Optional[int] = None,
+        since: Optional[int] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Son n bar (n=None -> hepsi); since verilirse yalnızca t >= since olanlar.
+        Diziler kopyadır; dosya açık kalmaz.
+        """
+        with self._lock(code, tf):
+            total = self._count(code, tf)
+            if total == 0:
+                return empty_bars()
+            start = 0 if n is None else max(0, total - int(n))
+            if since is not None:
+                mm = np.memmap(self._file(code, tf, "t"), dtype="<i8", mode="r", shape=(total,))
+                start = max(start, int(np.searchsorted(mm, since, side="left")))
+                del mm
+            out: Dict[str, np.ndarray] = {}
+            for name, dt in COLUMNS:
+                mm = np.memmap(self._file(code, tf, name), dtype=dt, mode="r", shape=(total,))
+                out[name] = np.array(mm[start:])
+                del mm
+            return out
+
+    def meta(self, code: str, tf: str) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self._dir(code, tf), "meta.json"), "r", encoding="utf-8") as f:
+                return json.load(f) or {}
+        except Exception:
+            return {}
+
+    # ------------------------------------------------------------
+    # YAZMA
+    # ------------------------------------------------------------
+    def set_meta(self, code: str, tf: str, **fields: Any) -> Dict[str, Any]:
+        with self._lock(code, tf):
+            meta = self.meta(code, tf)
+            meta.update(fields)
+            os.makedirs(self._dir(code, tf), exist_ok=True)
+            path = os.path.join(self._dir(code, tf), "meta.json")
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(tmp, path)
+            return meta
+
+    def merge(self, code: str, tf: str, bars: Dict[str, np.ndarray]) -> int:
+        """
+        bars'ı seriye ekler; bars["t"][0] ve sonrası diskteki barların yerine geçer.
+        Dönüş: seriye eklenen yeni bar sayısı (güncellenen kuyruk hariç).
+        """
+        bars = _sorted_unique(bars)
+        if len(bars["t"]) == 0:
+            return 0
+
+        with self._lock(code, tf):
+            os.makedirs(self._dir(code, tf), exist_ok=True)
+            n = self._count(code, tf)
+            cut = 0
+            if n:
+                mm = np.memmap(self._file(code, tf, "t"), dtype="<i8", mode="r", shape=(n,))
+                cut = int(np.searchsorted(mm, bars["t"][0], side="left"))
+                del mm
+
+            for name, dt in COLUMNS:
+                path = self._file(code, tf, name)
+                with open(path, "ab") as f:
+                    f.truncate(cut * _ITEM)
+                    f.write(np.ascontiguousarray(bars[name], dtype=dt).tobytes())
+
+            total = cut + len(bars["t"])
+            if total > 2 * STORE_MAX_BARS:
+                self._compact(code, tf, total)
+            return max(0, total - n)
+
+    def _compact(self, code: str, tf: str, total: int) -> None:
+        # Kolonlar yeni klasöre yazılıp klasör toptan değiştirilir; yarıda
+        # kesilirse seri boş görünür (sonraki yenileme tam çeker), kaymaz.
+        start = total - STORE_MAX_BARS
+        path = self._dir(code, tf)
+        tmp_dir, old_dir = path + ".tmp", path + ".old"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for name, dt in COLUMNS:
+            mm = np.memmap(self._file(code, tf, name), dtype=dt, mode="r", shape=(total,))
+            keep = np.array(mm[start:])
+            del mm
+            with open(os.path.join(tmp_dir, os.path.basename(self._file(code, tf, name))), "wb") as f:
+                f.write(keep.tobytes())
+        meta = os.path.join(path, "meta.json")
+        if os.path.exists(meta):
+            shutil.copy2(meta, os.path.join(tmp_dir, "meta.json"))
+        shutil.rmtree(old_dir, ignore_errors=True)
+        os.rename(path, old_dir)
+        os.rename(tmp_dir, path)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+
+# ============================================================
+# BELLEK KATMANI
+# ============================================================
+class ByteLRU:
+    """
+    Toplam boyutu max_bytes ile sınırlı LRU. Boyut put() çağıranın
+    verdiği tahmindir (ör. dizilerin nbytes toplamı). Değerler paylaşılır;
+    çağıranlar değiştirmemeli.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, int(max_bytes))
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any, size: int) -> None:
+        size = max(0, int(size))
+        with self._lock:
+            if key in self._data:
+                self._bytes -= self._sizes.pop(key)
+                del self._data[key]
+            if size > self.max_bytes:
+                return
+            self._data[key] = value
+            self._sizes[key] = size
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._data:
+                old, _ = self._data.popitem(last=False)
+                self._bytes -= self._sizes.pop(old)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            if key in self._data:
+                self._bytes -= self._sizes.pop(key)
+                del self._data[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else None,
+            }
@@ -0,0 +1,134 @@
+# api/circuit_breaker.py
+"""
+Basit, thread-safe circuit breaker.
+
+Durumlar:
+  - closed    : normal; ardışık hata sayısı failure_threshold'a ulaşırsa open
+  - open      : çağrı yapılmaz (allow() False) -> çağıran hemen yedeğe düşer
+  - half_open : cooldown_sec dolunca TEK deneme çağrısına izin verilir;
+                başarılı -> closed, hatalı -> tekrar open
+
+probe verilirse open durumunda arka planda probe_interval_sec aralıkla
+probe() çağrılır; başarılı olursa breaker kapanır (istek thread'leri
+hiç beklemez). Mongo sağlığı bu modla, canlı fiyat kaynakları
+cooldown moduyla kullanılır.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        cooldown_sec: Optional[float] = None,
+        probe: Optional[Callable[[], Any]] = None,
+        probe_interval_sec: float = 5.0,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown_sec = cooldown_sec
+        self.probe = probe
+        self.probe_interval_sec = probe_interval_sec
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._probe_running = False
+
+        self.trips = 0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+
+    # ------------------------------------------------------------
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and self.cooldown_sec is not None:
+                if time.time() - self._opened_at >= self.cooldown_sec:
+                    self._state = HALF_OPEN
+            if self._state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self, err: Any = None) -> None:
+        start_probe = False
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if err is not None:
+                self.last_error = repr(err)[:200]
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                self._state = OPEN
+                self._opened_at = time.time()
+                self.trips += 1
+                if self.probe is not None and not self._probe_running:
+                    self._probe_running = True
+                    start_probe = True
+        if start_probe:
+            threading.Thread(target=self._probe_loop, daemon=True).start()
+
+    def reset(self) -> None:
+        self.record_success()
+
+    # ------------------------------------------------------------
+    def _probe_loop(self) -> None:
+        """
+        Çıkış kararı ve _probe_running temizliği aynı kilit altında: probe
+        breaker'ı kapattıktan sonra başka bir thread tekrar açarsa döngü sürer
+        (yeni probe başlatılmamış olur, bu thread devam eder).
+        """
+        try:
+            while True:
+                with self._lock:
+                    if self._state == CLOSED:
+                        self._probe_running = False
+                        return
+                time.sleep(self.probe_interval_sec)
+                try:
+                    self.probe()
+                    self.record_success()
+                    print(f"✅ {self.name}: bağlantı geri geldi (breaker kapandı)")
+                except Exception as e:
+                    with self._lock:
+                        self.last_error = repr(e)[:200]
+        except BaseException:
+            # beklenmedik çıkış: sonraki record_failure yeni probe başlatabilsin
+            with self._lock:
+                self._probe_running = False
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self._state,
+                "failures": self._failures,
+                "trips": self.trips,
+                "rejected": self.rejected,
+                "opened_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self._opened_at)) if self._opened_at else None,
+                "last_error": self.last_error,
+            }
@@ -0,0 +1,19 @@
+# api/fund_nav_history.py
+"""
+Fon NAV geçmişi belgelerinin anahtarları (yazan: tefas_batch_scrape,
+okuyan: sparklines). Bağımlılıksızdır; script tek başına çalışırken de
+import edilebilir.
+
+Fon kodunun ilk harfine göre parçalı belgeler ("fund_nav_history_A", ...):
+tek belge ~1300 fon x 260 günle Mongo'nun 16 MB sınırına yaklaşıyordu.
+Parça formatı: {"asof": ..., "data": {kod: {"d": [YYYYMMDD, ...], "v": [nav, ...]}}}
+"""
+from __future__ import annotations
+
+NAV_HISTORY_KEY = "fund_nav_history"
+
+
+def nav_history_key(code: str) -> str:
+    """Fonun NAV geçmişi parçasının belge anahtarı."""
+    c = str(code or "").strip().upper()
+    return f"{NAV_HISTORY_KEY}_{c[:1] if c[:1].isalnum() else '_'}"
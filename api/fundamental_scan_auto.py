@@ -2,10 +2,9 @@
 from __future__ import annotations
 
 import os
-import json
 import time
 import threading
-from datetime import datetime, timedelta
+from datetime import datetime, time as dt_time
 from typing import Any, Dict, Optional, Callable
 
 try:
@@ -13,6 +12,9 @@ try:
 except Exception:
     ZoneInfo = None
 
+from .market_calendar import daily_job_day
+from .storage import get_storage
+
 
 # ============================================================
 # PATHS (sadece temel analiz tarayıcı otomasyonu)
@@ -22,8 +24,10 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 os.makedirs(DATA_DIR, exist_ok=True)
 
-SCANNER_STATE_PATH = os.path.join(DATA_DIR, "scanner_state.json")
-SCANNER_SNAPSHOT_PATH = os.path.join(DATA_DIR, "scanner_snapshot.json")
+# state / snapshot storage katmanında (api/storage.py); dosya backend'inde eski yerleri:
+# data/scanner_state.json, data/scanner_snapshot.json
+SCANNER_STATE_KEY = "scanner_state"
+SCANNER_SNAPSHOT_KEY = "scanner_snapshot"
 
 # Processler arası kilit (aynı makinede çoklu worker/import durumlarına karşı)
 SCANNER_LOCK_PATH = os.path.join(DATA_DIR, "scanner_lock.lock")
@@ -65,31 +69,24 @@ def _is_after_0300(dt: datetime) -> bool:
 
 def _scan_day_key(dt: datetime) -> str:
     """
-    Gün anahtarı:
-    - 03:00 öncesi: 'dün' (çünkü bugünün taraması henüz başlamamalı)
-    - 03:00 sonrası: 'bugün'
+    Gün anahtarı = taranacak işlem günü (market_calendar):
+    - 03:00 sonrası: bir önceki işlem günü (kapanış fiyatlarıyla tarama)
+    - 03:00 öncesi: ondan da bir önceki (bugünün taraması henüz başlamamalı)
+    Hafta sonu / tatil sabahlarında anahtar değişmez; tarama tekrar koşmaz.
     """
-    if _is_after_0300(dt):
-        return dt.strftime("%Y-%m-%d")
-    return (dt.date() - timedelta(days=1)).strftime("%Y-%m-%d")
+    return daily_job_day(dt, run_after=dt_time(3, 0)).strftime("%Y-%m-%d")
 
 
 # ============================================================
-# ATOMIC JSON IO
+# STATE IO (storage katmanı)
 # ============================================================
 
-def _atomic_write_json(path: str, obj: Any) -> None:
-    tmp = path + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
-    os.replace(tmp, path)
+def _write_doc(key: str, obj: Dict[str, Any]) -> None:
+    get_storage().put_doc(key, obj)
 
-def _safe_read_json(path: str) -> Optional[Dict[str, Any]]:
-    if not os.path.exists(path):
-        return None
+def _read_doc(key: str) -> Optional[Dict[str, Any]]:
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return get_storage().get_doc(key)
     except Exception:
         return None
 
@@ -130,8 +127,8 @@ def get_scanner_state() -> Dict[str, Any]:
     """
     UI her girişte bunu okuyabilir.
     """
-    st = _safe_read_json(SCANNER_STATE_PATH) or {}
-    snap = _safe_read_json(SCANNER_SNAPSHOT_PATH) or {}
+    st = _read_doc(SCANNER_STATE_KEY) or {}
+    snap = _read_doc(SCANNER_SNAPSHOT_KEY) or {}
     return {
         "state": st,
         "snapshot": snap,
@@ -166,7 +163,7 @@ def _write_state(day: str, status: str, mode: str, started_at: Optional[str], fi
         "finished_at": finished_at,
         "updated_at": _fmt_dt(_now_tr()),
     }
-    _atomic_write_json(SCANNER_STATE_PATH, obj)
+    _write_doc(SCANNER_STATE_KEY, obj)
 
 def _write_snapshot(day: str, payload: Dict[str, Any]) -> None:
     obj = {
@@ -174,7 +171,7 @@ def _write_snapshot(day: str, payload: Dict[str, Any]) -> None:
         "asof": _fmt_dt(_now_tr()),
         "data": payload,
     }
-    _atomic_write_json(SCANNER_SNAPSHOT_PATH, obj)
+    _write_doc(SCANNER_SNAPSHOT_KEY, obj)
 
 
 # ============================================================
@@ -198,7 +195,7 @@ def maybe_start_daily_scan_after_0300(
     day_key = _scan_day_key(now)
 
     with _STATE_LOCK:
-        state = _safe_read_json(SCANNER_STATE_PATH) or {}
+        state = _read_doc(SCANNER_STATE_KEY) or {}
 
         # Bugün done ise: hiç dokunma
         if state.get("day") == day_key and state.get("status") == "done":
@@ -281,7 +278,7 @@ def _start_scan_background(scan_runner: Callable[[], Dict[str, Any]], day_key: s
                     day=day_key,
                     status="done",
                     mode=mode,
-                    started_at=str((_safe_read_json(SCANNER_STATE_PATH) or {}).get("started_at") or _fmt_dt(_now_tr())),
+                    started_at=str((_read_doc(SCANNER_STATE_KEY) or {}).get("started_at") or _fmt_dt(_now_tr())),
                     finished_at=_fmt_dt(_now_tr()),
                 )
         except Exception as e:
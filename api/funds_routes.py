@@ -11,7 +11,6 @@ import math
 import re
 import requests
 import urllib3
-import yfinance as yf
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 try:
@@ -22,10 +21,21 @@ except Exception:
 
 from fastapi import APIRouter
 
+# ✅ Fon fiyat cache'i storage katmanından (Mongo / SQLite / dosya)
+from api.storage import get_storage
+from api.instrument_registry import fund_master_map
+from api.market_calendar import (
+    is_session_open,
+    nav_effective_date,
+    nav_publish_pending,
+    seconds_until_open,
+    session_ratio,
+)
+from temel_analiz.veri_saglayicilar.toplu_fiyat import fetch_quotes
+
 # ✅ EKLENDİ: Premium AI araçları (summary için)
 from api.premium_ai import (
     build_premium_prediction as premium_build_prediction,
-    load_funds_master_map,
     read_market_snapshot,
     market_change_pct,
 )
@@ -101,6 +111,11 @@ os.makedirs(DATA_DIR, exist_ok=True)
 _PRICE_CACHE: Dict[str, Dict] = {}
 _TEFAS_LOCK = threading.Lock()
 
+# Kalıcı fon fiyat cache'i (storage "fund_prices"): fon başına tekrar okumasın diye kısa memo
+FUND_PRICES_KEY = "fund_prices"
+STORED_PRICES_TTL_SEC = 30
+_STORED_PRICES: Dict[str, Any] = {"ts": 0.0, "data": {}}
+
 # AI TAHMİN CACHE (TEFAS'SIZ, 5 sn)
 _AI_CACHE: Dict[str, Dict[str, Any]] = {}
 _AI_LOCK = threading.Lock()
@@ -108,12 +123,6 @@ _AI_LOCK = threading.Lock()
 # 🔒 Direction Lock Cache
 _AI_DIRECTION_LOCK: Dict[str, Dict[str, Any]] = {}
 
-# ✅ EKLENDİ: funds_master map cache (type/name için)
-_MASTER_MAP: Dict[str, Dict[str, Any]] = {}
-_MASTER_MAP_TS: float = 0.0
-_MASTER_LOCK = threading.Lock()
-_MASTER_TTL_SEC = 3600  # 1 saat
-
 # ✅ EKLENDİ: Predictions Summary cache (çok hızlı UI için)
 _PRED_SUMMARY_CACHE: Dict[str, Any] = {}
 # ✅ PATCH 3.1 & 3.2: Timestamp artık dict (scope bazlı)
@@ -158,35 +167,9 @@ def today_str() -> str:
         pass
     return datetime.now().strftime("%Y-%m-%d")
 
-# ✅ YARDIMCI: Önceki iş gününü bul
-def _prev_business_day(d):
-    d = d - timedelta(days=1)
-    while d.weekday() >= 5:  # 5=Sat, 6=Sun
-        d = d - timedelta(days=1)
-    return d
-
-# ✅ DÜZELTİLDİ: TEFAS Effective Date (Haftasonu + 09:30 Kuralı)
+# ✅ TEFAS Effective Date: market_calendar (hafta sonu + resmi tatil + 09:30 kuralı)
 def tefas_effective_date() -> str:
-    try:
-        now = datetime.now(ZoneInfo("Europe/Istanbul"))
-    except:
-        now = datetime.now()
-
-    today = now.date()
-    after_0930 = (now.hour > 9) or (now.hour == 9 and now.minute >= 30)
-
-    if today.weekday() >= 5:
-        # Hafta sonu: TEFAS hâlâ Perşembe'yi verir (Cuma verisi “yayınlanmış” sayılmaz)
-        d = _prev_business_day(_prev_business_day(today))
-    else:
-        if after_0930:
-            # 09:30 sonrası: dünün iş günü
-            d = _prev_business_day(today)
-        else:
-            # 09:30 öncesi: iki önceki iş günü
-            d = _prev_business_day(_prev_business_day(today))
-
-    return d.strftime("%Y-%m-%d")
+    return nav_effective_date().strftime("%Y-%m-%d")
 
 # ✅ YENİ: Portföy güncelleme durumunu diskten oku (Optional ile uyumlu)
 def _load_portfolio_update_day() -> Optional[str]:
@@ -243,6 +226,23 @@ def _save_fetch_tracking(data: Dict[str, str]):
     except:
         pass
 
+def _load_stored_prices(force: bool = False) -> Dict[str, Dict]:
+    """
+    Kalıcı fon fiyat cache'ini (storage) {kod: kayıt} olarak döndürür.
+    Batch scraper'ın {"data": {...}} formatı da eski düz format da kabul edilir.
+    """
+    now_ts = time.time()
+    if not force and now_ts - _STORED_PRICES["ts"] < STORED_PRICES_TTL_SEC:
+        return _STORED_PRICES["data"]
+    try:
+        raw = get_storage().get_doc(FUND_PRICES_KEY) or {}
+    except Exception:
+        raw = {}
+    data = raw.get("data", {}) if "data" in raw else raw
+    _STORED_PRICES["ts"] = now_ts
+    _STORED_PRICES["data"] = data if isinstance(data, dict) else {}
+    return _STORED_PRICES["data"]
+
 # ✅ GÜNCELLENDİ: RAM CACHE İÇİNDE GÜNCEL VERİ KONTROLÜ (asof_day bazlı)
 def _is_code_fresh(code: str, effective_day: str) -> bool:
     """
@@ -268,16 +268,9 @@ def _is_code_fresh(code: str, effective_day: str) -> bool:
     if check_rec(_PRICE_CACHE.get(code)):
         return True
 
-    # 2) Disk check
-    if os.path.exists(LIVE_PRICES_PATH):
-        try:
-            with open(LIVE_PRICES_PATH, "r", encoding="utf-8") as f:
-                disk_raw = json.load(f)
-            disk_data = disk_raw.get("data", {}) if isinstance(disk_raw, dict) else {}
-            if check_rec(disk_data.get(code)):
-                return True
-        except:
-            pass
+    # 2) Kalıcı cache check (storage)
+    if check_rec(_load_stored_prices().get(code)):
+        return True
 
     return False
 
@@ -344,24 +337,13 @@ def load_cache_to_memory():
     """Server açılınca diskteki veriyi RAM'e yükler"""
     global _PRICE_CACHE
     
-    if not os.path.exists(LIVE_PRICES_PATH):
+    try:
+        # ✅ KRİTİK: batch output içinden SADECE data'yı al (_load_stored_prices yapıyor)
+        _PRICE_CACHE = dict(_load_stored_prices(force=True))
+        print(f"✅ RAM cache yüklendi: {len(_PRICE_CACHE)} fon")
+    except Exception as e:
+        print(f"❌ Cache yüklenedi: {e}")
         _PRICE_CACHE = {}
-    else:
-        try:
-            with open(LIVE_PRICES_PATH, "r", encoding="utf-8") as f:
-                raw = json.load(f)
-
-            # ✅ KRİTİK: batch output içinden SADECE data'yı al
-            if isinstance(raw, dict) and "data" in raw:
-                _PRICE_CACHE = raw["data"]
-            else:
-                _PRICE_CACHE = raw
-
-            print(f"✅ RAM cache yüklendi: {len(_PRICE_CACHE)} fon")
-
-        except Exception as e:
-            print(f"❌ Cache yüklenedi: {e}")
-            _PRICE_CACHE = {}
 
     # ✅ DEBUG PRINTS (İSTENİLEN)
     print(f"🧭 BASE_DIR={BASE_DIR}")
@@ -371,17 +353,11 @@ def load_cache_to_memory():
 
 # ✅ ADIM 3: KAYIT FORMATI DÜZELTİLDİ (Batch scraper uyumlu)
 def save_memory_to_disk():
-    """RAM cache'i diske atomik yaz"""
+    """RAM cache'i storage'a yaz (dosya backend'inde LIVE_PRICES_PATH, atomik)"""
     try:
-        tmp = LIVE_PRICES_PATH + ".tmp"
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(
-                {"data": _PRICE_CACHE, "asof": now_str()},
-                f,
-                ensure_ascii=False,
-                indent=2
-            )
-        os.replace(tmp, LIVE_PRICES_PATH)
+        get_storage().put_doc(FUND_PRICES_KEY, {"data": _PRICE_CACHE, "asof": now_str()})
+        _STORED_PRICES["ts"] = time.time()
+        _STORED_PRICES["data"] = dict(_PRICE_CACHE)
     except Exception as e:
         print(f"❌ save_memory_to_disk: {e}")
 
@@ -396,20 +372,9 @@ def _atomic_write_json(path: str, obj: Any):
     except Exception as e:
         print(f"❌ _atomic_write_json({path}): {e}")
 
-# ✅ EKLENDİ: master map'i cacheli oku (type/name için)
+# ✅ master map (type/name için): enstrüman kaydından, dosya değişince yeniden kurulur
 def _get_master_map_cached() -> Dict[str, Dict[str, Any]]:
-    global _MASTER_MAP, _MASTER_MAP_TS
-    ts = time.time()
-    if _MASTER_MAP and (ts - _MASTER_MAP_TS) < _MASTER_TTL_SEC:
-        return _MASTER_MAP
-
-    with _MASTER_LOCK:
-        ts = time.time()
-        if _MASTER_MAP and (ts - _MASTER_MAP_TS) < _MASTER_TTL_SEC:
-            return _MASTER_MAP
-        _MASTER_MAP = load_funds_master_map(FUNDS_MASTER_PATH)
-        _MASTER_MAP_TS = ts
-        return _MASTER_MAP
+    return fund_master_map()
 
 # ============================================================
 # 3. VERİ ÇEKME MOTORU (TEFAS)
@@ -675,32 +640,17 @@ def get_fund_data_safe(fund_code: str):
     effective_day = tefas_effective_date()
 
     # 🔴 2. KRİTİK HATA DÜZELTİLDİ: Sadece flag olarak kullan, return etme
-    try:
-        now = datetime.now(ZoneInfo("Europe/Istanbul"))
-    except:
-        now = datetime.now()
-    before_open = now.hour < 9 or (now.hour == 9 and now.minute < 30)
-    # ✅ Hafta sonu kontrolü
-    is_weekend = now.weekday() >= 5
-
+    # İşlem günü ve NAV henüz yayınlanmadı (hafta sonu / tatilde False)
+    publish_pending = nav_publish_pending()
 
     cached = _PRICE_CACHE.get(fund_code)
 
     # 🔴 FALLBACK: Batch scrape ile gelen ama RAM'e girmemiş fonlar
     if not cached:
-        if os.path.exists(LIVE_PRICES_PATH):
-            try:
-                with open(LIVE_PRICES_PATH, "r", encoding="utf-8") as f:
-                    disk_raw = json.load(f)
-
-                disk_data = disk_raw.get("data", {})
-                disk_rec = disk_data.get(fund_code)
-
-                if disk_rec and disk_rec.get("nav", 0) > 0:
-                    _PRICE_CACHE[fund_code] = disk_rec
-                    cached = disk_rec # cached'i güncelle
-            except:
-                pass
+        disk_rec = _load_stored_prices().get(fund_code)
+        if disk_rec and disk_rec.get("nav", 0) > 0:
+            _PRICE_CACHE[fund_code] = disk_rec
+            cached = disk_rec # cached'i güncelle
 
     # ✅ GÜNCELLENDİ: Freshness kontrolü asof_day ile yapılır
     cached_asof = (cached.get("asof_day") or "").strip() if cached else ""
@@ -717,8 +667,8 @@ def get_fund_data_safe(fund_code: str):
             # ✅ asof_day yoksa bu kayıt “şüpheli” (legacy) → 1 kez zorla
             force_fetch = True
 
-    # ⛔ Piyasa açılmadan fetch etme (SADECE HAFTA İÇİ & ESKİ FONLAR)
-    if (not is_weekend) and before_open and not is_new_fund:
+    # ⛔ NAV yayınlanmadan fetch etme (SADECE İŞLEM GÜNÜ & ESKİ FONLAR)
+    if publish_pending and not is_new_fund:
         force_fetch = False
         print(f"⏰ Piyasa kapalı, eski fon güncellenmiyor: {fund_code}")
 
@@ -820,15 +770,16 @@ def update_market_data():
     """BIST ve USD günceller"""
     items = []
     tickers = {"USDTRY": "USDTRY=X", "BIST100": "XU100.IS", "BIST30": "XU030.IS"}
+    # ✅ Tek toplu Yahoo isteği (sembol başına Ticker + fast_info yerine)
+    try:
+        quotes = fetch_quotes(list(tickers.values()))
+    except Exception:
+        quotes = {}
     for c, s in tickers.items():
-        try:
-            t = yf.Ticker(s)
-            info = t.fast_info
-            p = info.last_price
-            prev = info.previous_close
-            pct = ((p - prev) / prev) * 100 if prev else 0.0
-            items.append({"code": c, "value": round(p, 4), "change_pct": round(pct, 2)})
-        except:
+        q = quotes.get(s)
+        if q:
+            items.append({"code": c, "value": round(q["price"], 4), "change_pct": round(q["daily"] or 0.0, 2)})
+        else:
             items.append({"code": c, "value": 0.0, "change_pct": 0.0})
 
     # ✅ PATCH 2: Atomik yazma
@@ -861,16 +812,8 @@ def get_ai_prediction_live(fund_code: str, daily_real: float) -> Dict[str, Any]:
     # ===============================
     # ⏰ PİYASA AÇIK / KAPALI KONTROLÜ
     # ===============================
-    try:
-        now_tr = datetime.now(ZoneInfo("Europe/Istanbul"))
-    except:
-        now_tr = datetime.now()
-
-    # BIST: 09:30 – 18:10 arası açık kabul edelim
-    market_open = (
-        (now_tr.hour > 9 or (now_tr.hour == 9 and now_tr.minute >= 30)) and
-        (now_tr.hour < 18 or (now_tr.hour == 18 and now_tr.minute <= 10))
-    )
+    # BIST seansı (market_calendar: tatil + yarım gün dahil)
+    market_open = is_session_open()
 
     """
     🔒 Direction kilidi
@@ -889,10 +832,6 @@ def get_ai_prediction_live(fund_code: str, daily_real: float) -> Dict[str, Any]:
             return cached
 
         # Market açıksa cache'i kısalt
-        try:
-            now_tr = datetime.now(ZoneInfo("Europe/Istanbul"))
-        except:
-            now_tr = datetime.now()
         ttl = 1 if market_open else 3600  # Kapalıyken 1 saat kilit
 
 
@@ -933,13 +872,7 @@ def get_ai_prediction_live(fund_code: str, daily_real: float) -> Dict[str, Any]:
         # ===============================
         # GÜN İÇİ DRIFT (KAPANIŞA SIFIRLANIR)
         # ===============================
-        # ✅ GÜNCELLENDİ: dt İstanbul saatine göre
-        try:
-            dt = datetime.now(ZoneInfo("Europe/Istanbul"))
-        except:
-            dt = datetime.now()
-        minutes = dt.hour * 60 + dt.minute
-        session_pos = max(0.0, min(1.0, (minutes - 570) / (1090 - 570)))
+        session_pos = session_ratio()
         drift = 0.12 * (1.0 - session_pos)
 
         # ===============================
@@ -1004,10 +937,18 @@ def get_ai_prediction_live(fund_code: str, daily_real: float) -> Dict[str, Any]:
 # ============================================================
 
 def auto_market_loop():
-    """Server açık olduğu sürece her 15 dakikada bir çalışır"""
+    """
+    Seans içinde her 15 dakikada bir; seans kapanınca kapanış değerleri bir kez
+    daha alınır, ardından bir sonraki açılışa kadar (hafta sonu / tatil dahil)
+    Yahoo'ya gidilmez. Açılışta bir kez her durumda çalışır.
+    """
+    update_market_data()
     while True:
+        if is_session_open(pad_minutes=5):
+            time.sleep(900)  # 15 dakika bekle
+        else:
+            time.sleep(seconds_until_open(pad_minutes=5))
         update_market_data()
-        time.sleep(900)  # 15 dakika bekle
 
 # ============================================================
 # 6.5 ✅ PREMIUM AI SUMMARY (TIP ÖZET + TOP FONLAR)
@@ -1070,15 +1011,8 @@ def _build_predictions_summary(scope: str = "portfolio") -> Dict[str, Any]:
         info = _PRICE_CACHE.get(code)
         
         if not info:
-            # 🔴 RAM boşsa disk cache'ten oku
-            if os.path.exists(LIVE_PRICES_PATH):
-                try:
-                    with open(LIVE_PRICES_PATH, "r", encoding="utf-8") as f:
-                        disk_raw = json.load(f)
-                    disk_data = disk_raw.get("data", {})
-                    info = disk_data.get(code, {})
-                except:
-                    info = {}
+            # 🔴 RAM boşsa kalıcı cache'ten oku (storage)
+            info = _load_stored_prices().get(code, {})
 
         daily_real = _safe_float(info.get("daily_return_pct") if info else 0.0, 0.0)
 
@@ -1193,7 +1127,7 @@ def maybe_update_portfolio_funds():
         now = datetime.now(ZoneInfo("Europe/Istanbul"))
     except:
         now = datetime.now()
-    if now.hour < 9 or (now.hour == 9 and now.minute < 30):
+    if nav_publish_pending(now):
         return
 
     today = now.strftime("%Y-%m-%d")
@@ -1266,7 +1200,7 @@ def maybe_update_live_list_funds():
         now = datetime.now(ZoneInfo("Europe/Istanbul"))
     except:
         now = datetime.now()
-    if now.hour < 9 or (now.hour == 9 and now.minute < 30):
+    if nav_publish_pending(now):
         return
 
     today = now.strftime("%Y-%m-%d")
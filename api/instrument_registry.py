@@ -0,0 +1,323 @@
+# api/instrument_registry.py
+"""
+Tek enstrüman kaydı (hisse / endeks / fon).
+
+Kaynaklar:
+  - data/technical_symbols.json  -> teknik whitelist (XU100 + hisseler, yf ticker)
+  - sektor_verisi.BIST_SECTOR_MAP -> BIST hisseleri + sektör
+  - data/funds_master.json        -> TEFAS fonları (ad, tür)
+  - INDEX_ALIASES                 -> bilinen endeksler ve takma adları
+
+Kayıt bir kez kurulur ve değişmez bir anlık görüntü olarak tutulur:
+  - by_code: kod -> enstrüman (aynı kod birden çok türde varsa öncelik
+    endeks > hisse > fon; türe özel sözlükler ayrıca tutulur)
+  - aliases: yf ticker, ".IS"siz kod, BIST100 gibi takma adlar -> kod
+  - prefix index: Türkçe katlanmış (İ/ı/ş/ğ/ü/ö/ç -> ascii, küçük harf)
+    kod ve ad kelimeleri sıralı dizide; arama bisect ile önek aralığı
+Kaynak dosyaların (mtime, boyut) imzası değişmedikçe yeniden kurulmaz;
+imza en fazla REGISTRY_CHECK_SEC'te bir kontrol edilir.
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+TECH_SYMBOLS_PATH = os.path.join(DATA_DIR, "technical_symbols.json")
+FUNDS_MASTER_PATH = os.path.join(DATA_DIR, "funds_master.json")
+
+REGISTRY_CHECK_SEC = float(os.getenv("REGISTRY_CHECK_SEC", "5"))
+
+KINDS = ("index", "stock", "fund")
+_KIND_RANK = {k: i for i, k in enumerate(KINDS)}
+
+# code -> (yf ticker, ad, takma adlar)
+INDEX_ALIASES: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {
+    "XU100": ("^XU100", "BIST 100 Endeksi", ("BIST100", "BIST 100", "XU100.IS")),
+    "XU030": ("XU030.IS", "BIST 30 Endeksi", ("BIST30", "BIST 30")),
+}
+
+_TR_FOLD = str.maketrans({"ç": "c", "ğ": "g", "ı": "i", "ö": "o", "ş": "s", "ü": "u", "â": "a", "î": "i", "û": "u"})
+
+
+def fold_tr(s: str) -> str:
+    """Türkçe duyarsız anahtar: 'İŞ BANKASI' / 'is bankasi' -> 'is bankasi'."""
+    s = str(s or "").replace("İ", "i").replace("I", "i").lower()
+    # combining dot (i̇) lower() sonrası kalabilir
+    return s.replace("̇", "").translate(_TR_FOLD).strip()
+
+
+def _alias_key(s: str) -> str:
+    return fold_tr(s).replace(" ", "")
+
+
+# ============================================================
+# KURULUM
+# ============================================================
+def _read_json(path: str) -> Any:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _signature() -> Tuple[Any, ...]:
+    sig = []
+    for p in (TECH_SYMBOLS_PATH, FUNDS_MASTER_PATH):
+        try:
+            st = os.stat(p)
+            sig.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append(None)
+    return tuple(sig)
+
+
+def _sector_map() -> Dict[str, str]:
+    try:
+        from temel_analiz.veri_saglayicilar.sektor_verisi import BIST_SECTOR_MAP
+        return dict(BIST_SECTOR_MAP)
+    except Exception:
+        return {}
+
+
+class _Snapshot:
+    """Kurulduktan sonra salt okunur; okuyucular kilitsiz kullanır."""
+
+    def __init__(self, items: List[Dict[str, Any]], technical: Dict[str, Any], signature: Tuple[Any, ...]) -> None:
+        self.items = items
+        self.technical = technical  # load_symbols() biçimi: {"xu100":..., "stocks": [...]}
+        self.signature = signature
+        self.by_kind: Dict[str, Dict[str, Dict[str, Any]]] = {k: {} for k in KINDS}
+        self.by_code: Dict[str, Dict[str, Any]] = {}
+        self.aliases: Dict[str, str] = {}
+        tokens: List[Tuple[str, int]] = []
+
+        for i, it in enumerate(items):
+            code = it["code"]
+            self.by_kind[it["kind"]][code] = it
+            cur = self.by_code.get(code)
+            if cur is None or _KIND_RANK[it["kind"]] < _KIND_RANK[cur["kind"]]:
+                self.by_code[code] = it
+            for a in it["aliases"]:
+                self.aliases.setdefault(_alias_key(a), code)
+
+            words = {fold_tr(code)}
+            words.update(w for w in fold_tr(it["name"]).replace(".", " ").replace(",", " ").split() if w)
+            words.update(fold_tr(a) for a in it["aliases"] if " " not in a)
+            tokens.extend((w, i) for w in words)
+
+        # funds_routes için hazır code -> {"name", "type"} (load_funds_master_map biçimi)
+        self.fund_map = {c: {"name": it["name"], "type": it["type"]} for c, it in self.by_kind["fund"].items()}
+
+        # varsayılan sıra (endeks > hisse > fon, kod) ve katlanmış kodlar: sorgu başına sort anahtarı hesaplanmaz
+        self.order = sorted(range(len(items)), key=lambda i: (_KIND_RANK[items[i]["kind"]], items[i]["code"]))
+        self.pos = [0] * len(items)
+        for p, i in enumerate(self.order):
+            self.pos[i] = p
+        self.folded_codes = [fold_tr(it["code"]) for it in items]
+
+        tokens.sort()
+        self.tokens = [t for t, _ in tokens]
+        self.token_ids = [i for _, i in tokens]
+
+    def prefix_ids(self, word: str) -> set:
+        lo = bisect.bisect_left(self.tokens, word)
+        hi = bisect.bisect_left(self.tokens, word + "￿")
+        return set(self.token_ids[lo:hi])
+
+
+def _build() -> _Snapshot:
+    signature = _signature()
+    sectors = _sector_map()
+    items: List[Dict[str, Any]] = []
+
+    def add(code: str, kind: str, name: str = "", yf: str = "", itype: str = "",
+            sector: str = "", technical: bool = False, aliases: Tuple[str, ...] = ()) -> Dict[str, Any]:
+        al = {a for a in aliases if a}
+        if yf:
+            al.add(yf)
+        it = {
+            "code": code,
+            "kind": kind,
+            "name": name,
+            "type": itype or kind,
+            "sector": sector,
+            "yf": yf,
+            "technical": technical,
+            "aliases": sorted(al),
+        }
+        items.append(it)
+        return it
+
+    # --- teknik whitelist ---
+    raw = _read_json(TECH_SYMBOLS_PATH) or {}
+    tech_xu = None
+    tech_stocks: List[Dict[str, str]] = []
+    seen_stock: Dict[str, Dict[str, Any]] = {}
+
+    xu = raw.get("xu100") if isinstance(raw, dict) else None
+    if isinstance(xu, dict) and xu.get("code") and xu.get("yf"):
+        code = str(xu["code"]).strip().upper()
+        yf = str(xu["yf"]).strip()
+        name = str(xu.get("name", "")).strip()
+        itype = str(xu.get("type", "index")).strip()
+        tech_xu = {"code": code, "yf": yf, "name": name, "type": itype}
+        add(code, "index", name, yf, itype, technical=True, aliases=INDEX_ALIASES.get(code, ("", "", ()))[2])
+
+    for s in (raw.get("stocks") or []) if isinstance(raw, dict) else []:
+        try:
+            code = str(s.get("code", "")).strip().upper()
+            yf = str(s.get("yf", "")).strip()
+            name = str(s.get("name", "")).strip()
+            itype = str(s.get("type", "stock")).strip()
+        except Exception:
+            continue
+        if not code or not yf or code in seen_stock:
+            continue
+        tech_stocks.append({"code": code, "yf": yf, "name": name, "type": itype})
+        seen_stock[code] = add(code, "stock", name, yf, itype, sectors.get(code, ""), technical=True,
+                               aliases=(f"{code}.IS",))
+
+    # --- diğer endeksler ---
+    for code, (yf, name, aliases) in INDEX_ALIASES.items():
+        if tech_xu is None or tech_xu["code"] != code:
+            add(code, "index", name, yf, "index", aliases=aliases)
+
+    # --- sektör haritasındaki diğer BIST hisseleri ---
+    for code, sector in sectors.items():
+        code = str(code).strip().upper()
+        if code and code not in seen_stock:
+            seen_stock[code] = add(code, "stock", "", f"{code}.IS", "stock", sector, aliases=(f"{code}.IS",))
+
+    # --- TEFAS fonları ---
+    funds = _read_json(FUNDS_MASTER_PATH)
+    seen_fund = set()
+    for f in funds if isinstance(funds, list) else []:
+        if not isinstance(f, dict):
+            continue
+        code = str(f.get("code") or "").strip().upper()
+        if not code or code in seen_fund:
+            continue
+        seen_fund.add(code)
+        add(code, "fund", str(f.get("name") or "").strip(), "", str(f.get("type") or "").strip())
+
+    return _Snapshot(items, {"xu100": tech_xu, "stocks": tech_stocks}, signature)
+
+
+_SNAPSHOT: Optional[_Snapshot] = None
+_SNAPSHOT_CHECKED_AT = 0.0
+_BUILD_LOCK = threading.Lock()
+REGISTRY_STATS: Dict[str, Any] = {"builds": 0, "last_build_ms": None, "last_build_at": None}
+
+
+def _registry() -> _Snapshot:
+    global _SNAPSHOT, _SNAPSHOT_CHECKED_AT
+    snap = _SNAPSHOT
+    now = time.time()
+    if snap is not None and (now - _SNAPSHOT_CHECKED_AT) < REGISTRY_CHECK_SEC:
+        return snap
+    with _BUILD_LOCK:
+        snap = _SNAPSHOT
+        if snap is not None and (time.time() - _SNAPSHOT_CHECKED_AT) < REGISTRY_CHECK_SEC:
+            return snap
+        if snap is None or snap.signature != _signature():
+            t0 = time.perf_counter()
+            snap = _build()
+            _SNAPSHOT = snap
+            REGISTRY_STATS["builds"] += 1
+            REGISTRY_STATS["last_build_ms"] = round((time.perf_counter() - t0) * 1000.0, 2)
+            REGISTRY_STATS["last_build_at"] = int(time.time())
+            print(f"📇 Enstrüman kaydı kuruldu: {len(snap.items)} kayıt ({REGISTRY_STATS['last_build_ms']} ms)")
+        _SNAPSHOT_CHECKED_AT = time.time()
+        return snap
+
+
+# ============================================================
+# SORGULAR
+# ============================================================
+def get_instrument(code_or_alias: str, kind: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Kod veya takma adla O(1) arama; kind verilirse yalnızca o tür."""
+    snap = _registry()
+    raw = str(code_or_alias or "").strip()
+    if not raw:
+        return None
+    code = raw.upper()
+    table = snap.by_kind.get(kind) if kind else snap.by_code
+    if table is None:
+        return None
+    it = table.get(code)
+    if it is None:
+        alias = snap.aliases.get(_alias_key(raw))
+        it = table.get(alias) if alias else None
+    return it
+
+
+def technical_symbols() -> Dict[str, Any]:
+    """Teknik whitelist: {"xu100": {...} | None, "stocks": [{code, yf, name, type}, ...]}."""
+    return _registry().technical
+
+
+def fund_master_map() -> Dict[str, Dict[str, Any]]:
+    """funds_master.json: code -> {"name", "type"} (load_funds_master_map biçimi)."""
+    return _registry().fund_map
+
+
+def search_instruments(
+    q: str = "",
+    kinds: Optional[Tuple[str, ...]] = None,
+    technical_only: bool = False,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Her sorgu kelimesi, kodun / ad kelimelerinden birinin / takma adın öneki
+    olmalı (Türkçe katlanmış). Sıra: tam kod eşleşmesi, kod öneki, diğerleri;
+    her grupta endeks > hisse > fon, sonra kod.
+    """
+    snap = _registry()
+    words = fold_tr(q).replace(".", " ").replace(",", " ").split()
+
+    if words:
+        found: Optional[set] = None
+        for w in words:
+            ids_w = snap.prefix_ids(w)
+            found = ids_w if found is None else (found & ids_w)
+            if not found:
+                return []
+        qcode = fold_tr(q).replace(" ", "")
+        fc, pos = snap.folded_codes, snap.pos
+
+        def rank(i: int) -> Tuple[int, int]:
+            return (0 if fc[i] == qcode else 1 if fc[i].startswith(qcode) else 2, pos[i])
+        ids: Any = sorted(found or (), key=rank)
+    else:
+        ids = snap.order
+
+    out = []
+    for i in ids:
+        it = snap.items[i]
+        if kinds and it["kind"] not in kinds:
+            continue
+        if technical_only and not it["technical"]:
+            continue
+        out.append(it)
+        if limit and len(out) >= limit:
+            break
+    return out
+
+
+def registry_stats() -> Dict[str, Any]:
+    snap = _registry()
+    return {
+        **REGISTRY_STATS,
+        "count": len(snap.items),
+        "by_kind": {k: len(v) for k, v in snap.by_kind.items()},
+        "aliases": len(snap.aliases),
+        "tokens": len(snap.tokens),
+    }
@@ -2,10 +2,9 @@
 from __future__ import annotations
 
 import os
-import json
 import time
 import threading
-from datetime import datetime, timedelta
+from datetime import datetime, time as dt_time
 from typing import Any, Dict, Optional, Callable
 
 try:
@@ -13,6 +12,9 @@ try:
 except Exception:
     ZoneInfo = None
 
+from .market_calendar import daily_job_day
+from .storage import get_storage
+
 
 # ============================================================
 # PATHS (sadece temel analiz canlı fiyat otomasyonu)
@@ -22,8 +24,10 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 DATA_DIR = os.path.join(BASE_DIR, "data")  # services.py ile aynı klasör
 os.makedirs(DATA_DIR, exist_ok=True)
 
-LIVE_STATE_PATH = os.path.join(DATA_DIR, "live_prices_state.json")
-LIVE_SNAPSHOT_PATH = os.path.join(DATA_DIR, "live_prices_snapshot.json")
+# state / snapshot storage katmanında (api/storage.py); dosya backend'inde eski yerleri:
+# data/live_prices_state.json, data/live_prices_snapshot.json
+LIVE_STATE_KEY = "live_prices_state"
+LIVE_SNAPSHOT_KEY = "live_prices_snapshot"
 LIVE_LOCK_PATH = os.path.join(DATA_DIR, "live_prices_lock.lock")
 
 _STATE_LOCK = threading.Lock()
@@ -54,31 +58,24 @@ def _is_after_0330(dt: datetime) -> bool:
 
 def _day_key_0330(dt: datetime) -> str:
     """
-    Gün anahtarı:
-      - 03:30 sonrası: bugün
-      - 03:30 öncesi: dün (bugünün canlı fiyat güncellemesi henüz başlamasın)
+    Gün anahtarı = fiyatı alınacak işlem günü (market_calendar):
+      - 03:30 sonrası: bir önceki işlem gününün kapanışı
+      - 03:30 öncesi: ondan da bir önceki
+    Hafta sonu / tatil sabahlarında anahtar değişmez -> Yahoo'ya tekrar gidilmez.
     """
-    if _is_after_0330(dt):
-        return dt.strftime("%Y-%m-%d")
-    return (dt.date() - timedelta(days=1)).strftime("%Y-%m-%d")
+    return daily_job_day(dt, run_after=dt_time(3, 30)).strftime("%Y-%m-%d")
 
 
 # ============================================================
-# ATOMIC JSON
+# STATE IO (storage katmanı)
 # ============================================================
 
-def _atomic_write_json(path: str, obj: Any) -> None:
-    tmp = path + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
-    os.replace(tmp, path)
+def _write_doc(key: str, obj: Dict[str, Any]) -> None:
+    get_storage().put_doc(key, obj)
 
-def _safe_read_json(path: str) -> Optional[Dict[str, Any]]:
-    if not os.path.exists(path):
-        return None
+def _read_doc(key: str) -> Optional[Dict[str, Any]]:
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return get_storage().get_doc(key)
     except Exception:
         return None
 
@@ -111,8 +108,8 @@ def _release_lock() -> None:
 # ============================================================
 
 def get_live_prices_state() -> Dict[str, Any]:
-    st = _safe_read_json(LIVE_STATE_PATH) or {}
-    snap = _safe_read_json(LIVE_SNAPSHOT_PATH) or {}
+    st = _read_doc(LIVE_STATE_KEY) or {}
+    snap = _read_doc(LIVE_SNAPSHOT_KEY) or {}
     return {
         "state": st,
         "snapshot": snap,
@@ -141,7 +138,7 @@ def _write_state(day: str, status: str, mode: str, started_at: Optional[str], fi
         "finished_at": finished_at,
         "updated_at": _fmt_dt(_now_tr()),
     }
-    _atomic_write_json(LIVE_STATE_PATH, obj)
+    _write_doc(LIVE_STATE_KEY, obj)
 
 def _write_snapshot(day: str, payload: Dict[str, Any]) -> None:
     obj = {
@@ -149,7 +146,7 @@ def _write_snapshot(day: str, payload: Dict[str, Any]) -> None:
         "asof": _fmt_dt(_now_tr()),
         "data": payload,
     }
-    _atomic_write_json(LIVE_SNAPSHOT_PATH, obj)
+    _write_doc(LIVE_SNAPSHOT_KEY, obj)
 
 
 # ============================================================
@@ -173,7 +170,7 @@ def maybe_start_daily_live_prices_after_0330(
     day_key = _day_key_0330(now)
 
     with _STATE_LOCK:
-        state = _safe_read_json(LIVE_STATE_PATH) or {}
+        state = _read_doc(LIVE_STATE_KEY) or {}
 
         # bugün done -> hiç dokunma
         if state.get("day") == day_key and state.get("status") == "done":
@@ -214,7 +211,7 @@ def _start_bg(runner: Callable[[], Dict[str, Any]], day_key: str, mode: str) ->
             result = runner() or {}
             _write_snapshot(day_key, result)
             with _STATE_LOCK:
-                st = _safe_read_json(LIVE_STATE_PATH) or {}
+                st = _read_doc(LIVE_STATE_KEY) or {}
                 started_at = str(st.get("started_at") or _fmt_dt(_now_tr()))
                 _write_state(
                     day=day_key,
@@ -0,0 +1,313 @@
+# api/market_calendar.py
+"""
+Borsa İstanbul / TEFAS piyasa takvimi (tek kaynak).
+
+  - İşlem günü: hafta içi ve resmi tatil değil. Sabit tatiller her yıl;
+    dini bayramlar (Ramazan / Kurban) RELIGIOUS_HOLIDAYS tablosundan.
+    Tablo dışı günler data/market_holidays.json ile eklenebilir:
+      {"holidays": ["2028-02-26", ...], "half_days": ["2028-02-25", ...]}
+  - Seans: SESSION_OPEN-SESSION_CLOSE (kapanış seansı dahil); arife
+    günleri (yarım gün) HALF_DAY_CLOSE'da biter.
+  - NAV günü: TEFAS fiyatları NAV_PUBLISH_TIME'dan sonra bir önceki işlem
+    gününün fiyatı olarak yayınlanır (T+1).
+
+Önbellek TTL'leri ve zamanlanmış işler buradan sorar: veri değişemeyecek
+aralıkta (gece, hafta sonu, tatil) upstream'e gidilmez.
+
+Fonksiyonlar tz'siz datetime'ı İstanbul duvar saati kabul eder.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time as _time
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional, Tuple
+
+try:
+    from zoneinfo import ZoneInfo
+    IST_TZ = ZoneInfo("Europe/Istanbul")
+except Exception:  # pragma: no cover
+    IST_TZ = None
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+HOLIDAYS_PATH = os.path.join(BASE_DIR, "data", "market_holidays.json")
+
+SESSION_OPEN = time(10, 0)
+SESSION_CLOSE = time(18, 10)
+HALF_DAY_CLOSE = time(12, 40)
+NAV_PUBLISH_TIME = time(9, 30)
+
+# Kapanıştan sonra son barların / kapanış fiyatlarının yerleşmesi için pay
+SETTLE_MINUTES = int(os.getenv("MARKET_SETTLE_MINUTES", "30"))
+
+# (ay, gün): her yıl kapalı
+FIXED_HOLIDAYS: Tuple[Tuple[int, int], ...] = (
+    (1, 1),    # Yılbaşı
+    (4, 23),   # Ulusal Egemenlik ve Çocuk Bayramı
+    (5, 1),    # Emek ve Dayanışma Günü
+    (5, 19),   # Atatürk'ü Anma, Gençlik ve Spor Bayramı
+    (7, 15),   # Demokrasi ve Milli Birlik Günü
+    (8, 30),   # Zafer Bayramı
+    (10, 29),  # Cumhuriyet Bayramı
+)
+FIXED_HALF_DAYS: Tuple[Tuple[int, int], ...] = (
+    (10, 28),  # Cumhuriyet Bayramı arifesi
+)
+
+# yıl -> (Ramazan Bayramı 1. gün, Kurban Bayramı 1. gün); arife bir önceki gün (yarım gün)
+RELIGIOUS_HOLIDAYS: Dict[int, Tuple[date, date]] = {
+    2024: (date(2024, 4, 10), date(2024, 6, 16)),
+    2025: (date(2025, 3, 30), date(2025, 6, 6)),
+    2026: (date(2026, 3, 20), date(2026, 5, 27)),
+    2027: (date(2027, 3, 9), date(2027, 5, 16)),
+}
+_RAMAZAN_DAYS = 3
+_KURBAN_DAYS = 4
+
+
+# ============================================================
+# TATİL TABLOSU
+# ============================================================
+def _extra_days() -> Tuple[FrozenSet[date], FrozenSet[date]]:
+    try:
+        with open(HOLIDAYS_PATH, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+    except Exception:
+        return frozenset(), frozenset()
+
+    def _dates(key: str) -> FrozenSet[date]:
+        out = set()
+        for s in raw.get(key, []) if isinstance(raw, dict) else []:
+            try:
+                out.add(date.fromisoformat(str(s)[:10]))
+            except Exception:
+                continue
+        return frozenset(out)
+
+    return _dates("holidays"), _dates("half_days")
+
+
+@lru_cache(maxsize=32)
+def _year_table(year: int) -> Tuple[FrozenSet[date], FrozenSet[date]]:
+    """(tatiller, yarım günler) — yıl başına bir kez hesaplanır."""
+    holidays = {date(year, m, d) for m, d in FIXED_HOLIDAYS}
+    half = {date(year, m, d) for m, d in FIXED_HALF_DAYS}
+
+    rel = RELIGIOUS_HOLIDAYS.get(year)
+    if rel is None:
+        print(f"⚠️ {year} için dini bayram tarihleri yok (market_calendar.RELIGIOUS_HOLIDAYS / {HOLIDAYS_PATH})")
+    else:
+        for first, n in zip(rel, (_RAMAZAN_DAYS, _KURBAN_DAYS)):
+            holidays.update(first + timedelta(days=i) for i in range(n))
+            half.add(first - timedelta(days=1))
+
+    extra_h, extra_half = _extra_days()
+    holidays.update(d for d in extra_h if d.year == year)
+    half.update(d for d in extra_half if d.year == year)
+    return frozenset(holidays), frozenset(half - holidays)
+
+
+def is_holiday(d: date) -> bool:
+    return d in _year_table(d.year)[0]
+
+
+def is_trading_day(d: date) -> bool:
+    return d.weekday() < 5 and not is_holiday(d)
+
+
+def is_half_day(d: date) -> bool:
+    return is_trading_day(d) and d in _year_table(d.year)[1]
+
+
+def prev_trading_day(d: date) -> date:
+    d -= timedelta(days=1)
+    while not is_trading_day(d):
+        d -= timedelta(days=1)
+    return d
+
+
+def next_trading_day(d: date) -> date:
+    d += timedelta(days=1)
+    while not is_trading_day(d):
+        d += timedelta(days=1)
+    return d
+
+
+# ============================================================
+# SEANS
+# ============================================================
+def now_tr() -> datetime:
+    if IST_TZ is not None:
+        return datetime.now(IST_TZ)
+    return datetime.now()
+
+
+def _as_tr(dt: Optional[datetime]) -> datetime:
+    if dt is None:
+        return now_tr()
+    if IST_TZ is None:
+        return dt
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=IST_TZ)
+    return dt.astimezone(IST_TZ)
+
+
+def session_bounds(d: date) -> Optional[Tuple[datetime, datetime]]:
+    """İşlem günü için (açılış, kapanış); değilse None."""
+    if not is_trading_day(d):
+        return None
+    close = HALF_DAY_CLOSE if is_half_day(d) else SESSION_CLOSE
+    return (
+        datetime.combine(d, SESSION_OPEN, tzinfo=IST_TZ),
+        datetime.combine(d, close, tzinfo=IST_TZ),
+    )
+
+
+def is_session_open(dt: Optional[datetime] = None, pad_minutes: int = 0) -> bool:
+    """pad_minutes: açılıştan önce / kapanıştan sonra tolerans."""
+    now = _as_tr(dt)
+    b = session_bounds(now.date())
+    if b is None:
+        return False
+    pad = timedelta(minutes=pad_minutes)
+    return b[0] - pad <= now <= b[1] + pad
+
+
+def session_state(dt: Optional[datetime] = None) -> str:
+    """holiday | weekend | pre_open | open | closed"""
+    now = _as_tr(dt)
+    d = now.date()
+    if d.weekday() >= 5:
+        return "weekend"
+    if is_holiday(d):
+        return "holiday"
+    b = session_bounds(d)
+    if now < b[0]:
+        return "pre_open"
+    if now <= b[1]:
+        return "open"
+    return "closed"
+
+
+def session_ratio(dt: Optional[datetime] = None) -> float:
+    """Seans ilerlemesi: açılışta 0.0, kapanışta 1.0; seans dışı 0/1'e kırpılır."""
+    now = _as_tr(dt)
+    b = session_bounds(now.date())
+    if b is None:
+        return 1.0
+    total = (b[1] - b[0]).total_seconds()
+    return max(0.0, min(1.0, (now - b[0]).total_seconds() / total))
+
+
+def next_open(dt: Optional[datetime] = None, pad_minutes: int = 0) -> datetime:
+    """Şu andan sonraki ilk açılış (pad kadar erken)."""
+    now = _as_tr(dt)
+    pad = timedelta(minutes=pad_minutes)
+    d = now.date()
+    if not is_trading_day(d):
+        d = next_trading_day(d)
+    while True:
+        start = session_bounds(d)[0] - pad
+        if start > now:
+            return start
+        d = next_trading_day(d)
+
+
+def next_close(dt: Optional[datetime] = None, pad_minutes: int = 0) -> datetime:
+    """Açık seansın kapanışı; seans dışındaysa bir sonraki seansın kapanışı."""
+    now = _as_tr(dt)
+    pad = timedelta(minutes=pad_minutes)
+    d = now.date()
+    if not is_trading_day(d):
+        d = next_trading_day(d)
+    while True:
+        end = session_bounds(d)[1] + pad
+        if end > now:
+            return end
+        d = next_trading_day(d)
+
+
+def seconds_until_open(dt: Optional[datetime] = None, pad_minutes: int = 0) -> float:
+    now = _as_tr(dt)
+    return max(1.0, (next_open(now, pad_minutes) - now).total_seconds())
+
+
+def last_closed_trading_day(dt: Optional[datetime] = None) -> date:
+    """Kapanışı (SETTLE_MINUTES dahil) geçmiş en son işlem günü."""
+    now = _as_tr(dt)
+    d = now.date()
+    b = session_bounds(d)
+    if b is not None and now >= b[1] + timedelta(minutes=SETTLE_MINUTES):
+        return d
+    return prev_trading_day(d)
+
+
+def data_may_change(since_ts: float, now_ts: Optional[float] = None) -> bool:
+    """
+    [since_ts, now_ts] aralığı bir seans penceresiyle (açılış .. kapanış +
+    SETTLE_MINUTES) kesişiyor mu? Kesişmiyorsa o aralıkta çekilmiş piyasa
+    verisi (mum, kapanış fiyatı) değişmiş olamaz.
+    """
+    now_ts = _time.time() if now_ts is None else now_ts
+    if since_ts >= now_ts:
+        return False
+    start = datetime.fromtimestamp(since_ts, IST_TZ)
+    end = datetime.fromtimestamp(now_ts, IST_TZ)
+    settle = timedelta(minutes=SETTLE_MINUTES)
+    # start'tan sonra biten ilk seans penceresi; o da end'den sonra başlıyorsa kesişim yok
+    b = session_bounds(start.date())
+    if b is None or b[1] + settle < start:
+        b = session_bounds(next_trading_day(start.date()))
+    return b[0] <= end
+
+
+# ============================================================
+# GÜN ANAHTARLARI
+# ============================================================
+def nav_effective_date(dt: Optional[datetime] = None) -> date:
+    """
+    TEFAS'ta beklenen son NAV günü (T+1):
+      - işlem günü, NAV_PUBLISH_TIME sonrası: bir önceki işlem günü
+      - işlem günü, öncesi: iki önceki işlem günü
+      - hafta sonu / tatil: iki önceki işlem günü (son işlem gününün fiyatı
+        ertesi işlem günü yayınlanır)
+    """
+    now = _as_tr(dt)
+    today = now.date()
+    if is_trading_day(today) and now.time() >= NAV_PUBLISH_TIME:
+        return prev_trading_day(today)
+    return prev_trading_day(prev_trading_day(today))
+
+
+def nav_publish_pending(dt: Optional[datetime] = None) -> bool:
+    """İşlem günü ve NAV henüz yayınlanmadı (NAV_PUBLISH_TIME öncesi)."""
+    now = _as_tr(dt)
+    return is_trading_day(now.date()) and now.time() < NAV_PUBLISH_TIME
+
+
+def daily_job_day(dt: Optional[datetime] = None, run_after: time = time(3, 0)) -> date:
+    """
+    Gece işleri (run_after sonrası bir önceki seansın verisini işler) için
+    veri günü: run_after'ı geçmiş en son takvim gününden önceki son işlem
+    günü. Hafta sonu / tatil sabahları yeni veri olmadığından anahtar
+    değişmez; iş aynı veri için ikinci kez çalışmaz.
+    """
+    now = _as_tr(dt)
+    ref = now.date() if now.time() >= run_after else now.date() - timedelta(days=1)
+    return prev_trading_day(ref)
+
+
+def calendar_info(dt: Optional[datetime] = None) -> Dict[str, object]:
+    now = _as_tr(dt)
+    return {
+        "now": now.replace(microsecond=0).isoformat(),
+        "state": session_state(now),
+        "trading_day": is_trading_day(now.date()),
+        "half_day": is_half_day(now.date()),
+        "next_open": next_open(now).isoformat(),
+        "next_close": next_close(now).isoformat(),
+        "last_closed_trading_day": last_closed_trading_day(now).isoformat(),
+        "nav_effective_date": nav_effective_date(now).isoformat(),
+    }
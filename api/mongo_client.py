@@ -0,0 +1,96 @@
+# api/mongo_client.py
+"""
+Paylaşılan MongoDB client'ı (tek pool) + sağlık takibi.
+
+- Tek MongoClient: pool boyutu ve connect / server selection / socket
+  timeout'ları açıkça verilir (varsayılan 30 sn beklemek yerine fail-fast).
+- MONGO_BREAKER: Mongo hataları üst üste gelirse açılır; açıkken okumalar
+  hiç beklemeden yerel yedeğe düşer, arka planda ping ile toparlanma
+  yoklanır (bkz. api/circuit_breaker.py).
+"""
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import pymongo
+
+from .circuit_breaker import CircuitBreaker
+
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+# Kimlik bilgisi koda gömülmez: MONGO_URI yoksa storage dosya backend'ine düşer
+MONGO_URI = os.getenv("MONGO_URI", "").strip()
+MONGO_DB = os.getenv("MONGO_DB", "borsa_db")
+
+MONGO_MAX_POOL = int(os.getenv("MONGO_MAX_POOL", "20"))
+MONGO_MIN_POOL = int(os.getenv("MONGO_MIN_POOL", "0"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "2000"))
+MONGO_SELECT_TIMEOUT_MS = int(os.getenv("MONGO_SELECT_TIMEOUT_MS", "2000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "10000"))
+
+MONGO_BREAKER_THRESHOLD = int(os.getenv("MONGO_BREAKER_THRESHOLD", "2"))
+MONGO_PROBE_INTERVAL_SEC = float(os.getenv("MONGO_PROBE_INTERVAL_SEC", "10"))
+
+
+# ============================================================
+# CLIENT (tek instance)
+# ============================================================
+
+_CLIENT: Optional[pymongo.MongoClient] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_mongo_client() -> pymongo.MongoClient:
+    """
+    MongoClient bağlantıyı tembel açar; burada ağ beklenmez.
+    MONGO_URI tanımlı değilse RuntimeError.
+    """
+    global _CLIENT
+    if not MONGO_URI:
+        raise RuntimeError("MONGO_URI tanımlı değil")
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                _CLIENT = pymongo.MongoClient(
+                    MONGO_URI,
+                    maxPoolSize=MONGO_MAX_POOL,
+                    minPoolSize=MONGO_MIN_POOL,
+                    connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                    serverSelectionTimeoutMS=MONGO_SELECT_TIMEOUT_MS,
+                    socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+                )
+    return _CLIENT
+
+
+def get_mongo_db(name: str = MONGO_DB):
+    return get_mongo_client()[name]
+
+
+def _ping() -> None:
+    get_mongo_client().admin.command("ping")
+
+
+MONGO_BREAKER = CircuitBreaker(
+    "mongo",
+    failure_threshold=MONGO_BREAKER_THRESHOLD,
+    probe=_ping,
+    probe_interval_sec=MONGO_PROBE_INTERVAL_SEC,
+)
+
+
+def mongo_health() -> Dict[str, Any]:
+    """/health/storage: breaker durumu + pool / timeout ayarları."""
+    out: Dict[str, Any] = MONGO_BREAKER.stats()
+    out.update({
+        "configured": bool(MONGO_URI),
+        "pool_max": MONGO_MAX_POOL,
+        "connect_timeout_ms": MONGO_CONNECT_TIMEOUT_MS,
+        "select_timeout_ms": MONGO_SELECT_TIMEOUT_MS,
+        "socket_timeout_ms": MONGO_SOCKET_TIMEOUT_MS,
+    })
+    return out
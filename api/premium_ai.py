@@ -10,6 +10,8 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional, Tuple
 
+from api import market_calendar
+
 
 # ============================================================
 # Premium AI (TEFAS runtime YOK)
@@ -24,9 +26,6 @@ _LOCK = threading.Lock()
 # fund_code -> {"date": "YYYY-MM-DD", "prediction": {...}}
 _FREEZE_CACHE: Dict[str, Dict[str, Any]] = {}
 
-# Default BIST session (Istanbul)
-_SESSION_OPEN_MIN = 9 * 60 + 40   # 09:40
-_SESSION_CLOSE_MIN = 18 * 60 + 10 # 18:10
 
 
 # ----------------------------
@@ -34,7 +33,8 @@ _SESSION_CLOSE_MIN = 18 * 60 + 10 # 18:10
 # ----------------------------
 
 def _now() -> datetime:
-    return datetime.now()
+    # İstanbul duvar saati (tz'siz; market_asof ile aynı düzlemde)
+    return market_calendar.now_tr().replace(tzinfo=None)
 
 def _today_str(dt: Optional[datetime] = None) -> str:
     d = dt or _now()
@@ -134,21 +134,14 @@ def normalize_fund_type(ft: Any) -> str:
 # ----------------------------
 
 def is_market_open(dt: Optional[datetime] = None) -> bool:
-    d = dt or _now()
-    if d.weekday() >= 5:  # 5=Saturday, 6=Sunday
-        return False
-    minutes = d.hour * 60 + d.minute
-    return (_SESSION_OPEN_MIN <= minutes <= _SESSION_CLOSE_MIN)
+    # market_calendar: tatil + yarım gün dahil
+    return market_calendar.is_session_open(dt or _now())
 
 def session_ratio(dt: Optional[datetime] = None) -> float:
     """
     0.0 at open, 1.0 at close. Outside session clamps to 0/1.
     """
-    d = dt or _now()
-    minutes = d.hour * 60 + d.minute
-    denom = float(_SESSION_CLOSE_MIN - _SESSION_OPEN_MIN) if (_SESSION_CLOSE_MIN > _SESSION_OPEN_MIN) else 1.0
-    r = (minutes - _SESSION_OPEN_MIN) / denom
-    return _clamp(r, 0.0, 1.0)
+    return market_calendar.session_ratio(dt or _now())
 
 
 # ----------------------------
@@ -0,0 +1,169 @@
+# api/quote_fetcher.py
+"""
+Çok kaynaklı, paralel canlı fiyat çekici.
+
+Her sembol için kaynaklar sırayla denenir (ör. doviz -> yahoo -> scanner);
+ilk dolu sonuç kazanır. Kaynak başına:
+  - max_concurrency : aynı anda en fazla kaç istek (semaphore)
+  - rate_per_sec    : saniyelik istek bütçesi (token bucket)
+  - breaker         : ardışık hatalarda kaynak bu koşunun geri kalanında atlanır
+  - stats           : hit / miss / error / skip sayıları ve gecikme
+
+Kaynak fonksiyonu: fn(symbol) -> dict | None
+  None      = kaynakta veri yok (miss)
+  exception = kaynak hatası (timeout, 5xx...) -> breaker'a yazılır
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .circuit_breaker import CircuitBreaker
+
+
+# ============================================================
+# RATE BUDGET (token bucket)
+# ============================================================
+
+class RateBudget:
+    def __init__(self, rate_per_sec: Optional[float], burst: Optional[int] = None):
+        self.rate = rate_per_sec
+        self.capacity = float(burst or max(1, int(rate_per_sec or 1)))
+        self._tokens = self.capacity
+        self._ts = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._ts) * self.rate)
+                self._ts = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# ============================================================
+# KAYNAK
+# ============================================================
+
+class QuoteSource:
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[str], Optional[Dict[str, Any]]],
+        max_concurrency: int = 4,
+        rate_per_sec: Optional[float] = None,
+        failure_threshold: int = 5,
+    ):
+        self.name = name
+        self.fn = fn
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.rate_per_sec = rate_per_sec
+        self.failure_threshold = failure_threshold
+        self.reset()
+
+    def reset(self) -> None:
+        """Breaker kapalı, sayaçlar sıfır. (Koşu başına yeni QuoteSource kurulur.)"""
+        self._sem = threading.Semaphore(self.max_concurrency)
+        self._budget = RateBudget(self.rate_per_sec)
+        # cooldown yok: açılan breaker koşu bitene kadar açık kalır
+        self.breaker = CircuitBreaker(f"quotes:{self.name}", failure_threshold=self.failure_threshold)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.skipped = 0
+        self._lat_ms: List[float] = []
+
+    def fetch(self, symbol: str) -> Optional[Dict[str, Any]]:
+        if not self.breaker.allow():
+            with self._lock:
+                self.skipped += 1
+            return None
+
+        with self._sem:
+            self._budget.acquire()
+            t0 = time.perf_counter()
+            try:
+                res = self.fn(symbol)
+            except Exception as e:
+                ms = (time.perf_counter() - t0) * 1000.0
+                self.breaker.record_failure(e)
+                with self._lock:
+                    self.calls += 1
+                    self.errors += 1
+                    self._lat_ms.append(ms)
+                return None
+
+        ms = (time.perf_counter() - t0) * 1000.0
+        self.breaker.record_success()
+        with self._lock:
+            self.calls += 1
+            self._lat_ms.append(ms)
+            if res:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return res or None
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            lat = sorted(self._lat_ms)
+            attempted = self.hits + self.misses + self.errors
+            return {
+                "calls": self.calls,
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "skipped": self.skipped,
+                "hit_rate": round(self.hits / attempted, 3) if attempted else None,
+                "avg_ms": round(sum(lat) / len(lat), 1) if lat else None,
+                "p95_ms": round(lat[min(len(lat) - 1, int(len(lat) * 0.95))], 1) if lat else None,
+                "breaker": self.breaker.state,
+            }
+
+
+# ============================================================
+# FETCHER
+# ============================================================
+
+class QuoteFetcher:
+    def __init__(self, sources: List[QuoteSource], workers: int = 16):
+        self.sources = sources
+        self.workers = max(1, int(workers))
+
+    def _fetch_one(self, symbol: str) -> Optional[Dict[str, Any]]:
+        for src in self.sources:
+            q = src.fetch(symbol)
+            if q:
+                return q
+        return None
+
+    def run(self, symbols: List[str]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Dönüş: (sonuçlar, rapor). Sonuç sırası symbols sırasıdır; bulunamayanlar atlanır.
+        """
+        t0 = time.perf_counter()
+        out: List[Dict[str, Any]] = []
+        if symbols:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(symbols))) as ex:
+                out = [q for q in ex.map(self._fetch_one, symbols) if q]
+
+        report = {
+            "symbols": len(symbols),
+            "found": len(out),
+            "elapsed_ms": round((time.perf_counter() - t0) * 1000.0, 1),
+            "workers": self.workers,
+            "sources": {src.name: src.report() for src in self.sources},
+            "asof": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        return out, report
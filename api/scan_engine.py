@@ -0,0 +1,435 @@
+# api/scan_engine.py
+"""
+Paralel temel analiz tarama motoru.
+
+  - Ağ (Yahoo ham tablolar): thread pool; eşzamanlılık AIMD limiti ile
+  - Ayrıştırma + skor (pandas / CPU): process pool
+    (SCAN_PROCESS_WORKERS=0 ise aynı thread'de)
+
+AIMD: her başarılı ve hızlı indirmede limit yavaşça artar (additive
+increase); 429 veya hedefi aşan gecikmede limit yarıya iner
+(multiplicative decrease). Böylece Yahoo'nun kaldırabildiği hıza oturur.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from temel_analiz.veri_saglayicilar.veri_saglayici import (
+    download_raw,
+    is_no_data_error,
+    is_rate_limit_error,
+)
+
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+SCAN_MIN_CONCURRENCY = int(os.getenv("SCAN_MIN_CONCURRENCY", "1"))
+SCAN_MAX_CONCURRENCY = int(os.getenv("SCAN_MAX_CONCURRENCY", "12"))
+SCAN_START_CONCURRENCY = int(os.getenv("SCAN_START_CONCURRENCY", "3"))
+SCAN_LATENCY_TARGET_SEC = float(os.getenv("SCAN_LATENCY_TARGET_SEC", "6"))
+SCAN_PROCESS_WORKERS = int(os.getenv("SCAN_PROCESS_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+SCAN_MAX_ATTEMPTS = 3
+SCAN_THROTTLE_BACKOFF_SEC = 5.0
+# Toplu (yahooquery) indirmede bir istekteki sembol sayısı; 0 = kapalı
+SCAN_BATCH_SIZE = int(os.getenv("SCAN_BATCH_SIZE", "25"))
+# Bir grup isteği tek sembolden uzun sürer; AIMD gecikme hedefi grup için bu
+SCAN_BATCH_LATENCY_TARGET_SEC = float(os.getenv("SCAN_BATCH_LATENCY_TARGET_SEC", "20"))
+
+# Artımlı tarama: tablolar bu kadar günden eskiyse her halükarda yeniden çek
+SCAN_MAX_AGE_DAYS = int(os.getenv("SCAN_MAX_AGE_DAYS", "30"))
+# Son çeyrek + 3 ay + bu kadar gün geçtiyse yeni bilanço beklenir (her gece denenir)
+SCAN_REPORT_LAG_DAYS = int(os.getenv("SCAN_REPORT_LAG_DAYS", "20"))
+
+
+# ============================================================
+# AIMD LİMİTER
+# ============================================================
+
+class AIMDLimiter:
+    def __init__(
+        self,
+        initial: int = SCAN_START_CONCURRENCY,
+        minimum: int = SCAN_MIN_CONCURRENCY,
+        maximum: int = SCAN_MAX_CONCURRENCY,
+        latency_target_sec: float = SCAN_LATENCY_TARGET_SEC,
+        decrease_factor: float = 0.5,
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(self.maximum, max(self.minimum, initial)))
+        self.latency_target_sec = latency_target_sec
+        self.decrease_factor = decrease_factor
+
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+        self.throttles = 0
+        self.slow = 0
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._in_flight >= int(self.limit):
+                self._cond.wait(timeout=1.0)
+            self._in_flight += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def _decrease(self, started_at: float) -> None:
+        # Aynı dalgadaki hatalar limiti üst üste ezmesin: son düşüşten
+        # önce başlamış isteklerin hataları yeni limite yazılmaz
+        if started_at < self._last_decrease:
+            return
+        self._last_decrease = time.monotonic()
+        self.limit = max(float(self.minimum), self.limit * self.decrease_factor)
+
+    def on_success(self, latency_sec: float, started_at: float = 0.0) -> None:
+        with self._cond:
+            if latency_sec > self.latency_target_sec:
+                self.slow += 1
+                self._decrease(started_at or time.monotonic())
+            else:
+                # limit kadar başarı ~ +1 (pencere başına additive increase)
+                self.limit = min(float(self.maximum), self.limit + 1.0 / max(1.0, self.limit))
+            self._cond.notify_all()
+
+    def on_throttle(self, started_at: float = 0.0) -> None:
+        with self._cond:
+            self.throttles += 1
+            self._decrease(started_at or time.monotonic())
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self._in_flight,
+            "throttles": self.throttles,
+            "slow": self.slow,
+        }
+
+
+# ============================================================
+# PROCESS POOL İŞİ (modül seviyesinde olmalı: pickle)
+# ============================================================
+
+def parse_and_score(raw: Dict[str, Any]) -> Dict[str, Any]:
+    from temel_analiz.hesaplayicilar.puan_karti import build_payload
+    from temel_analiz.veri_saglayicilar.veri_saglayici import parse_raw
+
+    t0 = time.perf_counter()
+    comp = parse_raw(raw)
+    parse_ms = (time.perf_counter() - t0) * 1000.0
+    if not comp:
+        return {}
+    payload = build_payload(comp)
+    if payload:
+        payload["parse_ms"] = round(parse_ms, 2)
+    return payload
+
+
+# ============================================================
+# ARTIMLI TARAMA: parmak izi + plan
+# ============================================================
+
+def _parse_day(s: Any) -> Optional[date]:
+    try:
+        return datetime.strptime(str(s)[:10], "%Y-%m-%d").date()
+    except Exception:
+        return None
+
+
+def full_fetch_reason(fp: Optional[Dict[str, Any]], today: date) -> Optional[str]:
+    """
+    None -> tablolar güncel, sadece fiyat yenilenir.
+    "new" / "stale" / "due" -> tam indirme gerekir.
+    """
+    if not fp or not fp.get("subscores"):
+        return "new"
+    fetched = _parse_day(fp.get("fetched_at"))
+    if fetched is None or (today - fetched).days >= SCAN_MAX_AGE_DAYS:
+        return "stale"
+    if statements_due(fp.get("mrq_date"), today):
+        return "due"
+    return None
+
+
+def statements_due(mrq_date: Any, today: date) -> bool:
+    """Son çeyrekten sonraki bilanço yayımlanmış olabilir mi? (mrq + 3 ay + SCAN_REPORT_LAG_DAYS)"""
+    mrq = _parse_day(mrq_date)
+    return mrq is None or today >= mrq + timedelta(days=91 + SCAN_REPORT_LAG_DAYS)
+
+
+def plan_scan(
+    symbols: List[str],
+    fingerprints: Dict[str, Dict[str, Any]],
+    today: Optional[date] = None,
+    force_full: bool = False,
+) -> Tuple[List[str], List[str], Dict[str, int]]:
+    """Dönüş: (tam indirilecekler, sadece fiyatı yenilenecekler, neden sayıları)."""
+    today = today or date.today()
+    full: List[str] = []
+    reprice: List[str] = []
+    reasons: Dict[str, int] = {}
+    for sym in symbols:
+        why = "forced" if force_full else full_fetch_reason(fingerprints.get(sym), today)
+        if why:
+            full.append(sym)
+            reasons[why] = reasons.get(why, 0) + 1
+        else:
+            reprice.append(sym)
+    return full, reprice, reasons
+
+
+def make_fingerprint(payload: Dict[str, Any], raw_hash: Optional[str]) -> Dict[str, Any]:
+    """Fiyat değişince skoru yeniden kurmaya yetecek, fiyattan bağımsız özet."""
+    return {
+        "mrq_date": payload.get("mrq_date"),
+        "raw_hash": raw_hash,
+        "fetched_at": time.strftime("%Y-%m-%d"),
+        "sector": payload.get("sector"),
+        "subscores": payload.get("subscores"),
+        "fair_value": (payload.get("valuation") or {}).get("fair_value"),
+        "parse_ms": payload.get("parse_ms"),
+    }
+
+
+# ============================================================
+# MOTOR
+# ============================================================
+
+class ScanEngine:
+    """
+    run(symbols, on_result) -> rapor
+    on_result(sym, payload|None, raw|None) her sembol bittiğinde (thread'den) çağrılır.
+
+    download_batch verilirse semboller batch_size'lık gruplar halinde tek
+    çağrıda indirilir; grupta bulunamayanlar sembol başına download'a düşer.
+    meter (RequestMeter) verilirse rapora HTTP istek / byte sayıları eklenir.
+    """
+
+    def __init__(
+        self,
+        limiter: Optional[AIMDLimiter] = None,
+        process_workers: int = SCAN_PROCESS_WORKERS,
+        download: Callable[[str], Dict[str, Any]] = download_raw,
+        parse: Callable[[Dict[str, Any]], Dict[str, Any]] = parse_and_score,
+        should_stop: Callable[[], bool] = lambda: False,
+        download_batch: Optional[Callable[[List[str]], Dict[str, Dict[str, Any]]]] = None,
+        batch_size: int = SCAN_BATCH_SIZE,
+        meter: Any = None,
+    ):
+        self.limiter = limiter or AIMDLimiter()
+        self.process_workers = process_workers
+        self.download = download
+        self.parse = parse
+        self.should_stop = should_stop
+        self.download_batch = download_batch if batch_size > 0 else None
+        self.batch_size = max(1, batch_size)
+        self.meter = meter
+
+        self._lock = threading.Lock()
+        self.total = 0
+        self.completed = 0
+        self.ok = 0
+        self.no_data = 0
+        self.errors = 0
+        self.batched = 0
+        self.fallback = 0
+        self.current = ""
+        self.started_at = 0.0
+        self._parse_ms: List[float] = []
+        self._slowest_parse: Tuple[float, str] = (0.0, "")
+
+    # ---- ağ kısmı (AIMD altında) ----
+    def _limited(self, fn: Callable[[], Any], label: str, latency_target_sec: Optional[float] = None) -> Any:
+        """
+        fn'i AIMD limiti altında, 429 / geçici hatalarda tekrar deneyerek çalıştırır.
+        latency_target_sec verilirse gecikme limiterın hedefine ölçeklenir.
+        """
+        scale = (self.limiter.latency_target_sec / latency_target_sec) if latency_target_sec else 1.0
+        for attempt in range(SCAN_MAX_ATTEMPTS):
+            if self.should_stop():
+                return None
+            self.limiter.acquire()
+            t0 = time.monotonic()
+            try:
+                res = fn()
+            except Exception as e:
+                self.limiter.release()
+                if is_rate_limit_error(e):
+                    self.limiter.on_throttle(t0)
+                    time.sleep(SCAN_THROTTLE_BACKOFF_SEC)
+                    continue
+                if is_no_data_error(e):
+                    return None
+                if attempt == SCAN_MAX_ATTEMPTS - 1:
+                    print(f"❌  HATA ({label}): {e}")
+                    raise
+                time.sleep(1)
+                continue
+            self.limiter.release()
+            self.limiter.on_success((time.monotonic() - t0) * scale, t0)
+            return res
+        raise RuntimeError(f"hız sınırı aşılamadı ({label})")
+
+    def _download(self, sym: str) -> Optional[Dict[str, Any]]:
+        return self._limited(lambda: self.download(sym), sym)
+
+    # ---- ayrıştır + skorla (process pool varsa orada) ----
+    def _submit_parse(self, raw: Dict[str, Any], pool: Optional[ProcessPoolExecutor]) -> Callable[[], Dict[str, Any]]:
+        if pool is not None:
+            fut = pool.submit(self.parse, raw)
+            return fut.result
+        return lambda: self.parse(raw)
+
+    def _finish(self, sym: str, payload: Optional[Dict[str, Any]], raw: Optional[Dict[str, Any]], status: str, on_result) -> None:
+        with self._lock:
+            self.completed += 1
+            self.current = sym
+            pm = (payload or {}).get("parse_ms")
+            if pm is not None:
+                self._parse_ms.append(pm)
+                if pm > self._slowest_parse[0]:
+                    self._slowest_parse = (pm, sym)
+            if status == "ok":
+                self.ok += 1
+            elif status == "error":
+                self.errors += 1
+            else:
+                self.no_data += 1
+
+        try:
+            on_result(sym, payload, raw)
+        except Exception as e:
+            print(f"⚠️ Tarama sonucu işlenemedi ({sym}): {e}")
+
+    # ---- tek sembol: indir -> (process) ayrıştır + skorla ----
+    def _one(self, sym: str, pool: Optional[ProcessPoolExecutor], on_result) -> None:
+        payload: Optional[Dict[str, Any]] = None
+        raw: Optional[Dict[str, Any]] = None
+        status = "no_data"
+        try:
+            raw = self._download(sym)
+            if raw is not None:
+                payload = self._submit_parse(raw, pool)()
+                status = "ok" if payload else "no_data"
+        except Exception:
+            status = "error"
+        self._finish(sym, payload, raw, status, on_result)
+
+    # ---- grup: tek toplu indirme, bulunamayanlar sembol başına ----
+    def _batch(self, syms: List[str], pool: Optional[ProcessPoolExecutor], on_result) -> None:
+        try:
+            raws = self._limited(
+                lambda: self.download_batch(syms),
+                f"{len(syms)} sembollük grup",
+                latency_target_sec=SCAN_BATCH_LATENCY_TARGET_SEC,
+            ) or {}
+        except Exception:
+            raws = {}
+
+        pending = [(sym, raws[sym], self._submit_parse(raws[sym], pool)) for sym in syms if sym in raws]
+        rest = [sym for sym in syms if sym not in raws]
+        with self._lock:
+            self.batched += len(pending)
+            self.fallback += len(rest)
+
+        for sym, raw, result in pending:
+            try:
+                payload = result()
+                self._finish(sym, payload, raw, "ok" if payload else "no_data", on_result)
+            except Exception:
+                self._finish(sym, None, raw, "error", on_result)
+        for sym in rest:
+            if self.should_stop():
+                break
+            self._one(sym, pool, on_result)
+
+    def _make_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.process_workers <= 0:
+            return None
+        try:
+            # spawn: çok thread'li server process'inden fork etmeyelim
+            return ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        except Exception as e:
+            print(f"⚠️ Process pool açılamadı, ayrıştırma thread'de yapılacak: {e}")
+            return None
+
+    def run(
+        self,
+        symbols: List[str],
+        on_result: Callable[[str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]], None],
+    ) -> Dict[str, Any]:
+        self.total = len(symbols)
+        self.started_at = time.time()
+
+        pool = self._make_pool()
+        try:
+            # Thread sayısı: AIMD üst limiti + process'te bekleyenler için pay
+            n_threads = self.limiter.maximum + max(0, self.process_workers)
+            with ThreadPoolExecutor(max_workers=max(1, n_threads)) as ex:
+                futures = []
+                if self.download_batch is not None:
+                    for i in range(0, len(symbols), self.batch_size):
+                        if self.should_stop():
+                            break
+                        futures.append(ex.submit(self._batch, symbols[i:i + self.batch_size], pool, on_result))
+                else:
+                    for sym in symbols:
+                        if self.should_stop():
+                            break
+                        futures.append(ex.submit(self._one, sym, pool, on_result))
+                for f in futures:
+                    f.result()
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+        return self.progress()
+
+    def progress(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = max(1e-6, time.time() - self.started_at) if self.started_at else 0.0
+            rate = (self.completed / elapsed) if elapsed else 0.0
+            remaining = max(0, self.total - self.completed)
+            return {
+                "total": self.total,
+                "completed": self.completed,
+                "ok": self.ok,
+                "no_data": self.no_data,
+                "errors": self.errors,
+                "current": self.current,
+                "elapsed_sec": round(elapsed, 1),
+                "throughput_per_min": round(rate * 60.0, 1),
+                "eta_sec": round(remaining / rate, 0) if rate > 0 else None,
+                "concurrency": self.limiter.snapshot(),
+                "parse_ms": self._parse_stats(),
+                "batched": self.batched,
+                "fallback": self.fallback,
+                "http": self.meter.snapshot(self.completed) if self.meter is not None else None,
+            }
+
+    def _parse_stats(self) -> Optional[Dict[str, Any]]:
+        # _lock altında çağrılır
+        if not self._parse_ms:
+            return None
+        lat = sorted(self._parse_ms)
+        return {
+            "avg": round(sum(lat) / len(lat), 2),
+            "p95": round(lat[min(len(lat) - 1, int(len(lat) * 0.95))], 2),
+            "max": self._slowest_parse[0],
+            "slowest": self._slowest_parse[1],
+        }
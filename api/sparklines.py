@@ -0,0 +1,264 @@
+# api/sparklines.py
+"""
+İzleme listeleri için toplu sparkline (/sparklines).
+
+Kaynaklar (upstream'e gidilmez):
+  - hisse / endeks: mum önbelleği (get_candle_entry(cache_only=True): bellek +
+    depo; whitelist ısıtıcı ile sıcak). Hiç çekilmemiş seri "missing"e düşer,
+    süresi dolmuş seri olduğu gibi kullanılır (yenileme ısıtıcının işi).
+  - fon: tefas_batch_scrape'in yazdığı NAV geçmişi (storage'da ilk harfe göre
+    parçalı "fund_nav_history_X"); yalnızca istenen kodların parçaları okunur
+
+Her seri sabit en fazla `points` noktaya indirgenir:
+  lttb    Largest-Triangle-Three-Buckets (şekli koruyan seçim)
+  minmax  kova başına min ve max (zaman sırasıyla; ani sıçramalar kaybolmaz)
+Kısa seriler (points'ten az nokta) olduğu gibi döner; enterpolasyon yok.
+
+Kod başına sonuç, son barın / son NAV gününün sürümüyle bellekte tutulur:
+yeni bar ya da yeni NAV günü gelmedikçe yeniden hesaplanmaz.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .candle_store import ByteLRU
+from .fund_nav_history import nav_history_key
+from .instrument_registry import get_instrument
+from .market_calendar import IST_TZ
+from .technical_services import get_candle_entry
+
+SPARK_MAX_CODES = 300
+SPARK_DEFAULT_POINTS = 30
+SPARK_MAX_POINTS = 120
+SPARK_METHODS = {"lttb", "minmax"}
+
+# span -> (mum çözünürlüğü, bar sayısı | None = son seans), fon için işlem günü sayısı
+SPARK_SPANS: Dict[str, Tuple[str, Optional[int], int]] = {
+    "1d": ("15m", None, 2),
+    "1w": ("1h", 45, 5),
+    "1m": ("1d", 22, 22),
+    "3m": ("1d", 66, 66),
+    "1y": ("1d", 252, 252),
+}
+
+NAV_HISTORY_RELOAD_SEC = 600
+
+SPARK_MEM = ByteLRU(int(float(os.getenv("SPARK_MEM_MB", "8")) * 1024 * 1024))
+
+# parça anahtarı -> {"ts", "asof", "data": {kod: (günler, nav)}}
+_NAV_SHARDS: Dict[str, Dict[str, Any]] = {}
+_NAV_LOCK = threading.Lock()
+
+
+# ============================================================
+# İNDİRGEME
+# ============================================================
+def lttb_indices(x: np.ndarray, y: np.ndarray, n: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: ilk ve son nokta sabit, arada n-2 kova."""
+    L = len(y)
+    if n >= L:
+        return np.arange(L)
+    if n < 3:
+        return np.array([0, L - 1])[:max(n, 1)]
+
+    every = (L - 2) / (n - 2)
+    out = np.empty(n, dtype=np.int64)
+    out[0], out[-1] = 0, L - 1
+    a = 0
+    for i in range(n - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        nend = min(int((i + 2) * every) + 1, L)
+        # sonraki kovanın ortalaması (son kovada son nokta)
+        avg_x = x[end:nend].mean() if nend > end else x[L - 1]
+        avg_y = y[end:nend].mean() if nend > end else y[L - 1]
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y: np.ndarray, n: int) -> np.ndarray:
+    """n/2 kova; her kovadan min ve max (zaman sırasıyla)."""
+    L = len(y)
+    if n >= L:
+        return np.arange(L)
+    buckets = max(1, n // 2)
+    edges = np.linspace(0, L, buckets + 1).astype(np.int64)
+    idx: List[int] = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi <= lo:
+            continue
+        seg = y[lo:hi]
+        i_min, i_max = lo + int(np.argmin(seg)), lo + int(np.argmax(seg))
+        idx.extend(sorted({i_min, i_max}))
+    return np.asarray(idx, dtype=np.int64)
+
+
+def _downsample(x: np.ndarray, y: np.ndarray, points: int, method: str) -> np.ndarray:
+    if method == "minmax":
+        return minmax_indices(y, points)
+    return lttb_indices(x.astype(np.float64), y, points)
+
+
+def _spark(x: np.ndarray, y: np.ndarray, points: int, method: str) -> Dict[str, Any]:
+    idx = _downsample(x, y, points, method)
+    first, last = float(y[0]), float(y[-1])
+    return {
+        "v": [round(float(v), 4) for v in y[idx]],
+        "last": round(last, 4),
+        "chg": round((last / first - 1.0) * 100.0, 2) if first > 0 else None,
+        "t0": int(x[0]),
+        "t1": int(x[-1]),
+    }
+
+
+# ============================================================
+# KAYNAKLAR
+# ============================================================
+def _stock_spark(code: str, span: str, points: int, method: str) -> Optional[Dict[str, Any]]:
+    tf, n_bars, _ = SPARK_SPANS[span]
+    res = get_candle_entry(code, tf, cache_only=True)
+    if res.get("status") != "success":
+        return None
+    bars = res["entry"]["bars"]
+    t, c = bars["t"], bars["c"]
+    if len(t) == 0:
+        return None
+
+    # son bar (yeni bar / güncellenen kapanış) değişmedikçe önbellekten
+    version = (int(t[-1]), float(c[-1]), len(t))
+    key = ("stock", res["code"], span, points, method)
+    hit = SPARK_MEM.get(key)
+    if hit is not None and hit[0] == version:
+        return hit[1]
+
+    if n_bars is None:
+        # son seans: son barın İstanbul günü
+        day = datetime.fromtimestamp(int(t[-1]), IST_TZ).date()
+        day_start = int(datetime.combine(day, datetime.min.time(), tzinfo=IST_TZ).timestamp())
+        lo = int(np.searchsorted(t, day_start))
+    else:
+        lo = max(0, len(t) - n_bars)
+    out = _spark(t[lo:], c[lo:], points, method)
+    SPARK_MEM.put(key, (version, out), 64 + 12 * len(out["v"]))
+    return out
+
+
+def _nav_shard(key: str) -> Dict[str, Any]:
+    """storage'daki NAV geçmişi parçası; en fazla NAV_HISTORY_RELOAD_SEC'te bir okunur."""
+    shard = _NAV_SHARDS.get(key)
+    if shard is not None and time.time() - shard["ts"] < NAV_HISTORY_RELOAD_SEC:
+        return shard
+    with _NAV_LOCK:
+        shard = _NAV_SHARDS.get(key)
+        if shard is not None and time.time() - shard["ts"] < NAV_HISTORY_RELOAD_SEC:
+            return shard
+        if shard is None:
+            shard = {"ts": 0.0, "asof": None, "data": {}}
+        try:
+            from .storage import get_storage
+            doc = get_storage().get_doc(key) or {}
+        except Exception as e:
+            print(f"⚠️ NAV geçmişi okunamadı ({key}): {e}")
+            doc = None
+        if doc is not None and doc.get("asof") != shard["asof"]:
+            data = {}
+            for code, rec in (doc.get("data") or {}).items():
+                try:
+                    d = np.asarray(rec.get("d") or [], dtype=np.int64)
+                    v = np.asarray(rec.get("v") or [], dtype=np.float64)
+                except Exception:
+                    continue
+                if len(d) and len(d) == len(v):
+                    data[str(code).upper()] = (d, v)
+            shard = {"ts": 0.0, "asof": doc.get("asof"), "data": data}
+        # okuyucular kilitsiz: kayıt yerinde değiştirilmez, yenisi konur
+        shard = {**shard, "ts": time.time()}
+        _NAV_SHARDS[key] = shard
+        return shard
+
+
+def _fund_spark(code: str, span: str, points: int, method: str) -> Optional[Dict[str, Any]]:
+    hist = _nav_shard(nav_history_key(code))
+    rec = hist["data"].get(code)
+    if rec is None:
+        return None
+    days, navs = rec
+
+    version = (hist["asof"], int(days[-1]))
+    key = ("fund", code, span, points, method)
+    hit = SPARK_MEM.get(key)
+    if hit is not None and hit[0] == version:
+        return hit[1]
+
+    n_days = SPARK_SPANS[span][2]
+    lo = max(0, len(days) - n_days)
+    # x: gün sırası (işlem günleri eşit aralıklı çizilir); t0/t1 YYYYMMDD
+    x = np.arange(len(days) - lo, dtype=np.float64)
+    out = _spark(x, navs[lo:], points, method)
+    out["t0"], out["t1"] = int(days[lo]), int(days[-1])
+    SPARK_MEM.put(key, (version, out), 64 + 12 * len(out["v"]))
+    return out
+
+
+# ============================================================
+# GİRİŞ
+# ============================================================
+def get_sparklines(
+    codes: List[str],
+    span: str = "1m",
+    points: int = SPARK_DEFAULT_POINTS,
+    method: str = "lttb",
+) -> Dict[str, Any]:
+    span = (span or "").strip().lower()
+    method = (method or "").strip().lower()
+    if span not in SPARK_SPANS:
+        return {"status": "error", "error": "bad_span", "message": "|".join(SPARK_SPANS)}
+    if method not in SPARK_METHODS:
+        return {"status": "error", "error": "bad_method", "message": "|".join(sorted(SPARK_METHODS))}
+
+    seen: Dict[str, None] = {}
+    for c in codes:
+        c = str(c or "").strip().upper()
+        if c:
+            seen.setdefault(c, None)
+    wanted = list(seen)
+    if not wanted:
+        return {"status": "error", "error": "no_codes"}
+    if len(wanted) > SPARK_MAX_CODES:
+        return {"status": "error", "error": "too_many_codes", "message": f"max {SPARK_MAX_CODES}"}
+    points = max(3, min(int(points), SPARK_MAX_POINTS))
+
+    data: Dict[str, Any] = {}
+    missing: List[str] = []
+    for code in wanted:
+        it = get_instrument(code)
+        out = None
+        try:
+            if it is not None and it["kind"] == "fund":
+                out = _fund_spark(it["code"], span, points, method)
+            elif it is not None and it["technical"]:
+                out = _stock_spark(it["code"], span, points, method)
+        except Exception as e:
+            print(f"⚠️ Sparkline hatası ({code}): {e}")
+        if out is None:
+            missing.append(code)
+        else:
+            data[code] = out
+
+    return {
+        "status": "success",
+        "span": span,
+        "points": points,
+        "method": method,
+        "count": len(data),
+        "data": data,
+        "missing": missing,
+    }
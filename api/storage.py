@@ -0,0 +1,806 @@
+# api/storage.py
+"""
+Kalıcı durum için tek depolama katmanı.
+
+Backend'ler (STORAGE_BACKEND ortam değişkeni ile seçilir):
+  - mongo  (varsayılan): MongoDB + JSON dosya yedeği (eski davranış);
+             MONGO_URI tanımlı değilse file'a düşer
+  - sqlite : tek node için gömülü SQLite (WAL, index'li tablolar)
+  - file   : sadece JSON dosyaları
+
+Veri setleri:
+  - scanner           : temel analiz tarama sonuçları (sembol başına kayıt)
+  - live_prices       : BIST canlı fiyat snapshot'ı (liste)
+  - radar_cache       : hedef fiyat radarı snapshot'ı (liste)
+  - doc(key)          : tekil belgeler (tarama state'leri, fon fiyat cache'i)
+
+Sorgular (scanner / radar) her backend'de filtre + sıralama + limit'i
+kendi içinde yapar; keyset cursor çözümlemesi services.py'dedir.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pymongo
+
+from .circuit_breaker import CircuitBreaker
+from temel_analiz.veri_saglayicilar.sektor_verisi import BIST_SECTOR_MAP
+
+
+# ============================================================
+# CONFIG / PATHS
+# ============================================================
+
+API_DIR = Path(__file__).resolve().parent                 # .../api
+ROOT_DIR = API_DIR.parent                                 # proje kökü
+API_DATA_DIR = API_DIR / "data"
+ROOT_DATA_DIR = ROOT_DIR / "data"
+STATE_DIR = ROOT_DIR / "state"
+FUNDS_CACHE_DIR = Path(os.getenv("CACHE_ROOT", str(ROOT_DIR))) / "funds_cache"
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo").strip().lower()  # mongo | sqlite | file
+SQLITE_PATH = Path(os.getenv("SQLITE_PATH", str(STATE_DIR / "winningwave.db")))
+
+# live_prices / radar_cache Mongo'da paketli tek belge olarak da tutulabilir
+SNAPSHOT_STORAGE = os.getenv("SNAPSHOT_STORAGE", "docs").strip().lower()  # docs | packed
+SNAPSHOT_SLOTS = 2
+SNAPSHOT_CODEC = "zlib+json"
+
+# Liste veri setlerinin dosya karşılıkları (eski yerleri korunur)
+ROW_PATHS: Dict[str, Path] = {
+    "scanner": API_DATA_DIR / "piyasa_verisi.json",
+    "live_prices": API_DATA_DIR / "live_prices.json",
+    "radar_cache": API_DATA_DIR / "radar_cache.json",
+}
+
+# Tekil belgelerin dosya karşılıkları (eski yerleri korunur)
+DOC_PATHS: Dict[str, Path] = {
+    "daily_scan_state": STATE_DIR / "scan_state.json",
+    "scanner_state": ROOT_DATA_DIR / "scanner_state.json",
+    "scanner_snapshot": ROOT_DATA_DIR / "scanner_snapshot.json",
+    "live_prices_state": ROOT_DATA_DIR / "live_prices_state.json",
+    "live_prices_snapshot": ROOT_DATA_DIR / "live_prices_snapshot.json",
+    "fund_prices": FUNDS_CACHE_DIR / "live_prices.json",
+}
+
+
+def doc_path(key: str) -> Path:
+    return DOC_PATHS.get(key) or (STATE_DIR / f"{key}.json")
+
+
+# ============================================================
+# ORTAK YARDIMCILAR
+# ============================================================
+
+def _atomic_write_json(path: Path, obj: Any) -> None:
+    """tmp -> replace (yarım/bozuk JSON oluşmasın)."""
+    try:
+        tmp = Path(str(path) + ".tmp")
+        tmp.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(obj, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, path)
+    except Exception:
+        # API çökmesin
+        pass
+
+
+def _safe_read_json(path: Path, default: Any) -> Any:
+    try:
+        if not path.exists():
+            return default
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return default
+
+
+def record_sector(x: Dict[str, Any]) -> str:
+    """Eski kayıtlarda 'sector' yok: BIST_SECTOR_MAP'e düşülür."""
+    sec = x.get("sector")
+    if sec:
+        return str(sec).upper()
+    return BIST_SECTOR_MAP.get(str(x.get("symbol") or "").upper(), "")
+
+
+def scanner_sort_key(x: Dict[str, Any]) -> Tuple[Any, ...]:
+    # date_sortable DESC, score DESC, symbol ASC
+    return (-(x.get("date_sortable") or 0), -float(x.get("score") or 0), str(x.get("symbol") or ""))
+
+
+def radar_sort_key(x: Dict[str, Any]) -> Tuple[Any, ...]:
+    # potential DESC, symbol ASC
+    return (-float(x.get("potential") or 0), str(x.get("symbol") or ""))
+
+
+def _is_radar_candidate(x: Dict[str, Any], min_score: float) -> bool:
+    return (
+        isinstance(x, dict)
+        and x.get("status") == "success"
+        and float(x.get("score") or 0) >= min_score
+        and x.get("target") is not None
+    )
+
+
+# ============================================================
+# BACKEND ARAYÜZÜ
+# ============================================================
+
+class StorageBackend(ABC):
+    """
+    Varsayılan sorgu implementasyonları load_*() üzerinden Python'da çalışır;
+    index'li backend'ler (mongo / sqlite) bunları override eder.
+    """
+
+    name = "base"
+
+    # --- scanner ---
+    @abstractmethod
+    def load_scanner(self) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def save_scanner(self, rows: List[Dict[str, Any]]) -> None:
+        ...
+
+    def query_scanner(
+        self,
+        min_score: float,
+        sector: Optional[str],
+        limit: Optional[int],
+        after: Optional[List[Any]],
+    ) -> List[Dict[str, Any]]:
+        """limit verilirse en fazla limit+1 kayıt döner (devam var mı anlaşılsın)."""
+        sec = (sector or "").strip().upper()
+        rows = [
+            x for x in self.load_scanner()
+            if isinstance(x, dict)
+            and x.get("status") == "success"
+            and float(x.get("score") or 0) >= min_score
+            and (not sec or record_sector(x) == sec)
+        ]
+        rows.sort(key=scanner_sort_key)
+        if after and len(after) == 3:
+            ak = scanner_sort_key({"date_sortable": after[0], "score": after[1], "symbol": after[2]})
+            rows = [x for x in rows if scanner_sort_key(x) > ak]
+        return rows if limit is None else rows[: limit + 1]
+
+    def radar_candidates(self, min_score: float) -> List[Dict[str, Any]]:
+        return [x for x in self.load_scanner() if _is_radar_candidate(x, min_score)]
+
+    # --- live_prices / radar_cache ---
+    @abstractmethod
+    def load_rows(self, name: str) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def save_rows(self, name: str, rows: List[Dict[str, Any]]) -> None:
+        ...
+
+    def query_radar(
+        self,
+        min_score: float,
+        sector: Optional[str],
+        limit: Optional[int],
+        after: Optional[List[Any]],
+    ) -> List[Dict[str, Any]]:
+        sec = (sector or "").strip().upper()
+        rows = [
+            x for x in self.load_rows("radar_cache")
+            if isinstance(x, dict)
+            and float(x.get("score") or 0) >= min_score
+            and (not sec or record_sector(x) == sec)
+        ]
+        rows.sort(key=radar_sort_key)
+        if after and len(after) == 2:
+            ak = radar_sort_key({"potential": after[0], "symbol": after[1]})
+            rows = [x for x in rows if radar_sort_key(x) > ak]
+        return rows if limit is None else rows[: limit + 1]
+
+    def rollback_rows(self, name: str) -> Optional[int]:
+        """Versiyonlu snapshot tutmayan backend'lerde rollback yok."""
+        return None
+
+    # --- tekil belgeler ---
+    @abstractmethod
+    def get_doc(self, key: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def put_doc(self, key: str, doc: Dict[str, Any]) -> None:
+        ...
+
+    def health(self) -> Dict[str, Any]:
+        return {"name": self.name, "state": "closed"}
+
+
+# ============================================================
+# FILE BACKEND
+# ============================================================
+
+class FileBackend(StorageBackend):
+    name = "file"
+
+    def load_scanner(self) -> List[Dict[str, Any]]:
+        return self.load_rows("scanner")
+
+    def save_scanner(self, rows: List[Dict[str, Any]]) -> None:
+        self.save_rows("scanner", rows)
+
+    def load_rows(self, name: str) -> List[Dict[str, Any]]:
+        data = _safe_read_json(ROW_PATHS[name], [])
+        return data if isinstance(data, list) else []
+
+    def save_rows(self, name: str, rows: List[Dict[str, Any]]) -> None:
+        _atomic_write_json(ROW_PATHS[name], rows)
+
+    def get_doc(self, key: str) -> Optional[Dict[str, Any]]:
+        data = _safe_read_json(doc_path(key), None)
+        return data if isinstance(data, dict) else None
+
+    def put_doc(self, key: str, doc: Dict[str, Any]) -> None:
+        _atomic_write_json(doc_path(key), doc)
+
+
+# ============================================================
+# MONGO BACKEND (+ dosya yedeği)
+# ============================================================
+
+class MongoBackend(StorageBackend):
+    """
+    Okuma: önce Mongo, hata olursa dosya yedeği.
+    Yazma: Mongo + dosya yedeği (mirror=None ise sadece Mongo).
+
+    Her Mongo çağrısı breaker'dan geçer: Mongo sağlıksızken (breaker open)
+    okumalar timeout beklemeden yedeğe düşer, yazmalar sadece yedeğe gider.
+    Toparlanma arka planda ping ile yoklanır (bkz. api/mongo_client.py).
+    """
+
+    name = "mongo"
+
+    def __init__(self, db=None, mirror: Optional[FileBackend] = None, breaker: Optional[CircuitBreaker] = None):
+        self.mirror = mirror
+        self.col_scanner = None
+        self.col_live = None
+        self.col_radar = None
+        self.col_snapshots = None
+        self.col_state = None
+        self._indexes_ready = False
+        self._snapshot_versions: Dict[str, int] = {}
+        self._snapshot_lock = threading.Lock()
+
+        if breaker is None:
+            if db is None:
+                from .mongo_client import MONGO_BREAKER
+                breaker = MONGO_BREAKER
+            else:
+                # Dışarıdan verilen db (benchmark / yerel stand-in): kendi breaker'ı
+                breaker = CircuitBreaker("mongo-local", failure_threshold=2, cooldown_sec=5.0)
+        self.breaker = breaker
+
+        try:
+            if db is None:
+                from .mongo_client import get_mongo_db
+                db = get_mongo_db()
+            self.col_scanner = db["scanner_data"]
+            self.col_live = db["live_prices"]
+            self.col_radar = db["radar_cache"]
+            self.col_snapshots = db["snapshots"]
+            self.col_state = db["app_state"]
+            print("✅ MongoDB client hazır (storage.py)")
+        except Exception as e:
+            print(f"❌ MongoDB Bağlantı Hatası: {e}")
+
+    def _row_col(self, name: str):
+        return {"scanner": self.col_scanner, "live_prices": self.col_live, "radar_cache": self.col_radar}[name]
+
+    def _fallback(self) -> FileBackend:
+        return self.mirror or FileBackend()
+
+    def _call(self, op, fallback=None, label: str = ""):
+        """
+        Mongo çağrısı breaker üzerinden: open ise op hiç çalışmaz.
+        Hata / red durumunda fallback() (verilmişse) döner.
+        """
+        if not self.breaker.allow():
+            return fallback() if fallback else None
+        try:
+            res = op()
+        except Exception as e:
+            self.breaker.record_failure(e)
+            if label:
+                print(f"MongoDB Hatası ({label}): {e}")
+            return fallback() if fallback else None
+        self.breaker.record_success()
+        return res
+
+    def ensure_indexes(self) -> None:
+        """
+        Scanner / radar sorguları filtre + sıralama + limit'i Mongo'ya yaptırır.
+        Gereken index'ler ilk başarılı denemede bir kez (idempotent) oluşturulur.
+        """
+        if self._indexes_ready or not self.breaker.allow():
+            return
+
+        try:
+            if self.col_scanner is not None:
+                self.col_scanner.create_index([("symbol", pymongo.ASCENDING)], name="symbol_1")
+                self.col_scanner.create_index([("score", pymongo.DESCENDING)], name="score_-1")
+                self.col_scanner.create_index([("sector", pymongo.ASCENDING)], name="sector_1")
+                self.col_scanner.create_index(
+                    [
+                        ("status", pymongo.ASCENDING),
+                        ("date_sortable", pymongo.DESCENDING),
+                        ("score", pymongo.DESCENDING),
+                        ("symbol", pymongo.ASCENDING),
+                    ],
+                    name="status_date_score_symbol",
+                )
+            if self.col_radar is not None:
+                self.col_radar.create_index([("symbol", pymongo.ASCENDING)], name="symbol_1")
+                self.col_radar.create_index([("score", pymongo.DESCENDING)], name="score_-1")
+                self.col_radar.create_index(
+                    [("potential", pymongo.DESCENDING), ("symbol", pymongo.ASCENDING)],
+                    name="potential_symbol",
+                )
+            if self.col_snapshots is not None:
+                self.col_snapshots.create_index(
+                    [("name", pymongo.ASCENDING), ("version", pymongo.DESCENDING)],
+                    name="name_version",
+                )
+            self._indexes_ready = True
+            self.breaker.record_success()
+        except Exception as e:
+            self.breaker.record_failure(e)
+            print(f"⚠️ MongoDB index oluşturulamadı: {e}")
+
+    # --- sector filtresi (eski kayıtlar için harita yedeği) ---
+    @staticmethod
+    def _sector_clause(sector: Optional[str]) -> Optional[Dict[str, Any]]:
+        sec = (sector or "").strip().upper()
+        if not sec:
+            return None
+        return {
+            "$or": [
+                {"sector": sec},
+                # record_sector ile aynı: alan yok / null / "" -> harita ($in null eksik alanı da tutar)
+                {"sector": {"$in": [None, ""]}, "symbol": {"$in": [s for s, v in BIST_SECTOR_MAP.items() if v == sec]}},
+            ]
+        }
+
+    # --- scanner ---
+    def load_scanner(self) -> List[Dict[str, Any]]:
+        return self.load_rows("scanner")
+
+    def save_scanner(self, rows: List[Dict[str, Any]]) -> None:
+        self.save_rows("scanner", rows)
+
+    def query_scanner(self, min_score, sector, limit, after):
+        fallback = lambda: self._fallback().query_scanner(min_score, sector, limit, after)
+        if self.col_scanner is None:
+            return fallback()
+
+        clauses: List[Dict[str, Any]] = [{"status": "success"}, {"score": {"$gte": float(min_score)}}]
+        sec_c = self._sector_clause(sector)
+        if sec_c:
+            clauses.append(sec_c)
+        if after and len(after) == 3:
+            d, sc, sym = after
+            clauses.append({
+                "$or": [
+                    {"date_sortable": {"$lt": d}},
+                    {"date_sortable": d, "score": {"$lt": sc}},
+                    {"date_sortable": d, "score": sc, "symbol": {"$gt": sym}},
+                ]
+            })
+
+        def op():
+            cur = self.col_scanner.find({"$and": clauses}, {"_id": 0}).sort([
+                ("date_sortable", pymongo.DESCENDING),
+                ("score", pymongo.DESCENDING),
+                ("symbol", pymongo.ASCENDING),
+            ])
+            if limit is not None:
+                cur = cur.limit(limit + 1)
+            return list(cur)
+
+        self.ensure_indexes()
+        return self._call(op, fallback)
+
+    def radar_candidates(self, min_score: float) -> List[Dict[str, Any]]:
+        fallback = lambda: self._fallback().radar_candidates(min_score)
+        if self.col_scanner is None:
+            return fallback()
+        projection = {"_id": 0, "symbol": 1, "sector": 1, "status": 1, "date_str": 1,
+                      "score": 1, "target": 1, "price": 1, "band": 1}
+        return self._call(
+            lambda: list(self.col_scanner.find(
+                {"status": "success", "score": {"$gte": float(min_score)}, "target": {"$ne": None}},
+                projection,
+            )),
+            fallback,
+        )
+
+    # --- live_prices / radar_cache ---
+    def _packed(self, name: str) -> bool:
+        return SNAPSHOT_STORAGE == "packed" and name in ("live_prices", "radar_cache")
+
+    def load_rows(self, name: str) -> List[Dict[str, Any]]:
+        fallback = lambda: self._fallback().load_rows(name)
+        if self._packed(name):
+            rows = self.load_packed(name)
+            return rows if rows is not None else fallback()
+        col = self._row_col(name)
+        if col is None:
+            return fallback()
+        # _id:0 -> MongoDB'nin özel ID'si Flutter'ı bozmasın
+        return self._call(lambda: list(col.find({}, {"_id": 0})), fallback)
+
+    def save_rows(self, name: str, rows: List[Dict[str, Any]]) -> None:
+        if rows:
+            if self._packed(name):
+                self.save_packed(name, rows)
+            else:
+                col = self._row_col(name)
+                if col is not None:
+                    def op():
+                        col.delete_many({})
+                        # insert_many dict'lere _id ekler; dosya yedeği bozulmasın diye kopya
+                        col.insert_many([dict(x) for x in rows])
+                    self._call(op, label=f"yazma {name}")
+        if self.mirror is not None:
+            self.mirror.save_rows(name, rows)
+
+    def query_radar(self, min_score, sector, limit, after):
+        # packed modda radar tek belge: filtre/sıralama açılan liste üzerinde
+        if self.col_radar is None or self._packed("radar_cache"):
+            return super().query_radar(min_score, sector, limit, after)
+
+        clauses: List[Dict[str, Any]] = [{"score": {"$gte": float(min_score)}}]
+        sec_c = self._sector_clause(sector)
+        if sec_c:
+            clauses.append(sec_c)
+        if after and len(after) == 2:
+            pot, sym = after
+            clauses.append({"$or": [{"potential": {"$lt": pot}}, {"potential": pot, "symbol": {"$gt": sym}}]})
+
+        def op():
+            cur = self.col_radar.find({"$and": clauses}, {"_id": 0}).sort([
+                ("potential", pymongo.DESCENDING),
+                ("symbol", pymongo.ASCENDING),
+            ])
+            if limit is not None:
+                cur = cur.limit(limit + 1)
+            return list(cur)
+
+        self.ensure_indexes()
+        return self._call(op, lambda: self._fallback().query_radar(min_score, sector, limit, after))
+
+    # --- paketli snapshot: {name, version, asof, codec, count, payload=zlib(JSON)} ---
+    # Okuma = tek find_one, yazma = tek replace_one. Versiyonlar SNAPSHOT_SLOTS
+    # slot'a döner (ring): bir önceki versiyon diğer slot'ta durur.
+    def _latest_snapshot_doc(self, name: str, projection: Optional[Dict[str, int]] = None):
+        return self.col_snapshots.find_one({"name": name}, projection, sort=[("version", pymongo.DESCENDING)])
+
+    def save_packed(self, name: str, rows: List[Dict[str, Any]]) -> Optional[int]:
+        if self.col_snapshots is None:
+            return None
+        self.ensure_indexes()
+
+        def op():
+            # en yüksek versiyon her yazımda DB'den (index'li find_one): başka bir
+            # worker / script yazmış olabilir; _snapshot_versions yalnızca bilgi
+            doc = self._latest_snapshot_doc(name, {"version": 1})
+            version = (int(doc["version"]) if doc else 0) + 1
+            slot_id = f"{name}:{version % SNAPSHOT_SLOTS}"
+            raw = json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            self.col_snapshots.replace_one(
+                {"_id": slot_id},
+                {
+                    "_id": slot_id,
+                    "name": name,
+                    "version": version,
+                    "asof": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "codec": SNAPSHOT_CODEC,
+                    "count": len(rows),
+                    "payload": zlib.compress(raw, 6),
+                },
+                upsert=True,
+            )
+            self._snapshot_versions[name] = version
+            return version
+
+        with self._snapshot_lock:
+            return self._call(op, label=f"snapshot yazma {name}")
+
+    def load_packed(self, name: str) -> Optional[List[Dict[str, Any]]]:
+        if self.col_snapshots is None:
+            return None
+
+        def op():
+            doc = self._latest_snapshot_doc(name)
+            if not doc:
+                return None
+            self._snapshot_versions[name] = int(doc.get("version") or 0)
+            data = json.loads(zlib.decompress(bytes(doc["payload"])).decode("utf-8"))
+            return data if isinstance(data, list) else []
+
+        return self._call(op)
+
+    def rollback_rows(self, name: str) -> Optional[int]:
+        """En yeni versiyonu siler; bir önceki versiyon tekrar 'en yeni' olur."""
+        if self.col_snapshots is None:
+            return None
+
+        def op():
+            doc = self._latest_snapshot_doc(name, {"version": 1})
+            if not doc:
+                return None
+            self.col_snapshots.delete_one({"_id": doc["_id"]})
+            prev = self._latest_snapshot_doc(name, {"version": 1})
+            if prev:
+                self._snapshot_versions[name] = int(prev["version"])
+                return int(prev["version"])
+            self._snapshot_versions.pop(name, None)
+            return None
+
+        with self._snapshot_lock:
+            return self._call(op, label=f"snapshot rollback {name}")
+
+    # --- tekil belgeler (app_state koleksiyonu) ---
+    def get_doc(self, key: str) -> Optional[Dict[str, Any]]:
+        fallback = lambda: self._fallback().get_doc(key)
+        if self.col_state is None:
+            return fallback()
+        doc = self._call(lambda: self.col_state.find_one({"_id": key}))
+        if doc:
+            doc.pop("_id", None)
+            return doc
+        return fallback()
+
+    def put_doc(self, key: str, doc: Dict[str, Any]) -> None:
+        if self.col_state is not None:
+            body = dict(doc)
+            body["_id"] = key
+            self._call(lambda: self.col_state.replace_one({"_id": key}, body, upsert=True), label=f"state {key}")
+        if self.mirror is not None:
+            self.mirror.put_doc(key, doc)
+
+    def health(self) -> Dict[str, Any]:
+        from .mongo_client import MONGO_BREAKER, mongo_health
+        if self.breaker is MONGO_BREAKER:
+            return mongo_health()
+        return self.breaker.stats()
+
+
+# ============================================================
+# SQLITE BACKEND (tek node, ağ yok)
+# ============================================================
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scanner (
+    symbol        TEXT PRIMARY KEY,
+    status        TEXT,
+    sector        TEXT,
+    score         REAL,
+    date_sortable INTEGER,
+    has_target    INTEGER NOT NULL DEFAULT 0,
+    doc           TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scanner_status_date_score
+    ON scanner(status, date_sortable DESC, score DESC, symbol);
+CREATE INDEX IF NOT EXISTS scanner_score ON scanner(score);
+CREATE INDEX IF NOT EXISTS scanner_sector ON scanner(sector);
+
+CREATE TABLE IF NOT EXISTS snapshot_rows (
+    name      TEXT NOT NULL,
+    pos       INTEGER NOT NULL,
+    symbol    TEXT,
+    sector    TEXT,
+    score     REAL,
+    potential REAL,
+    doc       TEXT NOT NULL,
+    PRIMARY KEY (name, pos)
+);
+CREATE INDEX IF NOT EXISTS snapshot_rows_potential
+    ON snapshot_rows(name, potential DESC, symbol);
+CREATE INDEX IF NOT EXISTS snapshot_rows_symbol ON snapshot_rows(name, symbol);
+
+CREATE TABLE IF NOT EXISTS docs (
+    key        TEXT PRIMARY KEY,
+    doc        TEXT NOT NULL,
+    updated_at REAL
+);
+"""
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Thread başına bağlantı; WAL modunda okuyucular yazarı beklemez.
+    JSON gövde 'doc' kolonunda, filtre/sıralama kolonları index'li.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: Path = SQLITE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(_SQLITE_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _docs(cur) -> List[Dict[str, Any]]:
+        return [json.loads(r[0]) for r in cur.fetchall()]
+
+    # --- scanner ---
+    def load_scanner(self) -> List[Dict[str, Any]]:
+        return self._docs(self._conn().execute("SELECT doc FROM scanner"))
+
+    def save_scanner(self, rows: List[Dict[str, Any]]) -> None:
+        params = []
+        for x in rows:
+            if not isinstance(x, dict) or not x.get("symbol"):
+                continue
+            params.append((
+                str(x["symbol"]),
+                x.get("status"),
+                record_sector(x),
+                float(x["score"]) if x.get("score") is not None else None,
+                x.get("date_sortable"),
+                1 if x.get("target") is not None else 0,
+                json.dumps(x, ensure_ascii=False),
+            ))
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM scanner")
+            conn.executemany(
+                "INSERT OR REPLACE INTO scanner(symbol, status, sector, score, date_sortable, has_target, doc) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                params,
+            )
+
+    def query_scanner(self, min_score, sector, limit, after):
+        sql = "SELECT doc FROM scanner WHERE status = 'success' AND score >= ?"
+        args: List[Any] = [float(min_score)]
+        sec = (sector or "").strip().upper()
+        if sec:
+            sql += " AND sector = ?"
+            args.append(sec)
+        if after and len(after) == 3:
+            d, sc, sym = after
+            sql += (" AND (date_sortable < ? OR (date_sortable = ? AND score < ?)"
+                    " OR (date_sortable = ? AND score = ? AND symbol > ?))")
+            args += [d, d, sc, d, sc, sym]
+        sql += " ORDER BY date_sortable DESC, score DESC, symbol ASC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit + 1)
+        return self._docs(self._conn().execute(sql, args))
+
+    def radar_candidates(self, min_score: float) -> List[Dict[str, Any]]:
+        return self._docs(self._conn().execute(
+            "SELECT doc FROM scanner WHERE status = 'success' AND score >= ? AND has_target = 1",
+            (float(min_score),),
+        ))
+
+    # --- live_prices / radar_cache ---
+    def load_rows(self, name: str) -> List[Dict[str, Any]]:
+        if name == "scanner":
+            return self.load_scanner()
+        return self._docs(self._conn().execute(
+            "SELECT doc FROM snapshot_rows WHERE name = ? ORDER BY pos", (name,)
+        ))
+
+    def save_rows(self, name: str, rows: List[Dict[str, Any]]) -> None:
+        if name == "scanner":
+            self.save_scanner(rows)
+            return
+        params = []
+        for i, x in enumerate(rows):
+            if not isinstance(x, dict):
+                continue
+            params.append((
+                name,
+                i,
+                str(x.get("symbol") or ""),
+                record_sector(x),
+                float(x["score"]) if x.get("score") is not None else None,
+                float(x["potential"]) if x.get("potential") is not None else None,
+                json.dumps(x, ensure_ascii=False),
+            ))
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM snapshot_rows WHERE name = ?", (name,))
+            conn.executemany(
+                "INSERT INTO snapshot_rows(name, pos, symbol, sector, score, potential, doc) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                params,
+            )
+
+    def query_radar(self, min_score, sector, limit, after):
+        sql = "SELECT doc FROM snapshot_rows WHERE name = 'radar_cache' AND score >= ?"
+        args: List[Any] = [float(min_score)]
+        sec = (sector or "").strip().upper()
+        if sec:
+            sql += " AND sector = ?"
+            args.append(sec)
+        if after and len(after) == 2:
+            pot, sym = after
+            sql += " AND (potential < ? OR (potential = ? AND symbol > ?))"
+            args += [pot, pot, sym]
+        sql += " ORDER BY potential DESC, symbol ASC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit + 1)
+        return self._docs(self._conn().execute(sql, args))
+
+    # --- tekil belgeler ---
+    def get_doc(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT doc FROM docs WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return None
+        data = json.loads(row[0])
+        return data if isinstance(data, dict) else None
+
+    def put_doc(self, key: str, doc: Dict[str, Any]) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO docs(key, doc, updated_at) VALUES (?, ?, ?)",
+                (key, json.dumps(doc, ensure_ascii=False), time.time()),
+            )
+
+
+# ============================================================
+# SEÇİM (tek instance)
+# ============================================================
+
+_STORAGE: Optional[StorageBackend] = None
+_STORAGE_LOCK = threading.Lock()
+
+
+def _build_storage(kind: str) -> StorageBackend:
+    if kind == "sqlite":
+        return SQLiteBackend(SQLITE_PATH)
+    if kind == "file":
+        return FileBackend()
+    from .mongo_client import MONGO_URI
+    if not MONGO_URI:
+        print("⚠️ MONGO_URI tanımlı değil: dosya backend'i kullanılıyor")
+        return FileBackend()
+    return MongoBackend(mirror=FileBackend())
+
+
+def get_storage() -> StorageBackend:
+    global _STORAGE
+    if _STORAGE is None:
+        with _STORAGE_LOCK:
+            if _STORAGE is None:
+                _STORAGE = _build_storage(STORAGE_BACKEND)
+                print(f"🗄️ Storage backend: {_STORAGE.name}")
+    return _STORAGE
+
+
+def set_storage(backend: StorageBackend) -> None:
+    """Benchmark / yerel deneme için backend'i değiştirir."""
+    global _STORAGE
+    with _STORAGE_LOCK:
+        _STORAGE = backend
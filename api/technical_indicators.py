@@ -0,0 +1,372 @@
+# api/technical_indicators.py
+"""
+Teknik göstergeler (NumPy / pandas ewm) + memo.
+
+/technical/indicators?symbol=&tf=&set=rsi14,ema20,ema50,macd,bb20,atr14,vwap
+
+Girdi: get_candle_entry'nin bellek kaydındaki bar dizileri (son
+MAX_CANDLES_RETURN bar). Sonuç (symbol, tf, set) başına saklanır:
+  - bar dizileri aynı nesne ise (seri yenilenmedi) hazır JSON byte'ları döner
+  - seri yenilendiyse eski ve yeni barların ortak öneki bulunur; özyinelemeli
+    göstergeler (EMA/MACD/RSI/ATR/VWAP) önekin son durumundan yalnızca
+    değişen/yeni barlar için ilerletilir, pencereli olanlar (BB) yalnızca
+    kuyrukta yeniden hesaplanır.
+  - pencere kaydıysa (ilk bar değişti) tam hesap: tohumlar pencerenin ilk
+    barlarına bağlı, eski pencereden sürdürmek memo'suz sonuçtan farklı olurdu.
+
+Tanımlar (TradingView ile aynı):
+  ema{n}           SMA(n) ile tohumlanan üstel ortalama, alpha=2/(n+1)
+  rsi{n}           Wilder (RMA, alpha=1/n) ortalama kazanç/kayıp
+  atr{n}           Wilder TR ortalaması; ilk TR = h-l
+  macd[f_s_g]      EMA(f)-EMA(s), sinyal EMA(g); varsayılan 12_26_9
+  bb{n}[_k]        SMA(n) ± k·std (ddof=0); varsayılan k=2
+  vwap             intraday'de İstanbul günü başında sıfırlanır; 1d/1w'de
+                   serinin başından birikimli
+Isınma bölgesi (yeterli bar yok) None döner.
+"""
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .candle_store import ByteLRU, bucket_keys
+from .technical_services import IST_TZ, get_candle_entry
+
+DEFAULT_INDICATOR_SET = "rsi14,ema20,ema50,macd,bb20,atr14,vwap"
+MAX_INDICATORS = 12
+INDICATOR_MEM_MAX_BYTES = 16 * 1024 * 1024
+
+_TOKEN = re.compile(r"^(rsi|ema|atr|macd|bb|vwap)(\d+(?:_\d+)*)?$")
+_INTRADAY_TF = {"15m", "30m", "1h", "4h"}
+
+INDICATOR_MEM = ByteLRU(INDICATOR_MEM_MAX_BYTES)
+
+
+# ============================================================
+# ORTAK
+# ============================================================
+def _smoothed(x: np.ndarray, n: int, alpha: float, first: int = 0) -> np.ndarray:
+    """
+    x[first:]'in ilk n değerinin ortalamasıyla tohumlanan üstel ortalama
+    (adjust=False özyinelemesi). Tohumdan öncesi NaN.
+    """
+    out = np.full(len(x), np.nan)
+    seed = first + n - 1
+    if len(x) <= seed:
+        return out
+    y = np.array(x[seed:], dtype=np.float64)
+    y[0] = x[first:seed + 1].mean()
+    out[seed:] = pd.Series(y).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return out
+
+
+def _extend_smoothed(old: np.ndarray, x: np.ndarray, k: int, alpha: float) -> Optional[np.ndarray]:
+    """old[:k] korunur, k.. için özyineleme old[k-1]'den sürer. Isınmadaysa None."""
+    prev = float(old[k - 1])
+    if prev != prev:
+        return None
+    out = np.empty(len(x))
+    out[:k] = old[:k]
+    for i in range(k, len(x)):
+        prev += alpha * (x[i] - prev)
+        out[i] = prev
+    return out
+
+
+def _first_valid(x: np.ndarray) -> int:
+    idx = np.flatnonzero(~np.isnan(x))
+    return int(idx[0]) if len(idx) else len(x)
+
+
+# ============================================================
+# GÖSTERGELER
+# ============================================================
+# Her gösterge: full(bars) -> durum dizileri, extend(durum[:k], bars, k) -> durum
+# (None: tam hesap gerekir), output(durum) -> dizi ya da {ad: dizi}.
+
+class _EMA:
+    def __init__(self, n: int):
+        self.n = n
+        self.alpha = 2.0 / (n + 1)
+
+    def full(self, b: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        return {"ema": _smoothed(b["c"], self.n, self.alpha)}
+
+    def extend(self, st: Dict[str, np.ndarray], b: Dict[str, np.ndarray], k: int) -> Optional[Dict[str, np.ndarray]]:
+        ema = _extend_smoothed(st["ema"], b["c"], k, self.alpha)
+        return None if ema is None else {"ema": ema}
+
+    def output(self, st: Dict[str, np.ndarray]) -> Any:
+        return st["ema"]
+
+
+class _RSI:
+    def __init__(self, n: int):
+        self.n = n
+        self.alpha = 1.0 / n
+
+    @staticmethod
+    def _gain_loss(c: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        d = np.diff(c, prepend=np.nan)
+        return np.where(d > 0, d, 0.0), np.where(d < 0, -d, 0.0)
+
+    def full(self, b: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        g, l = self._gain_loss(b["c"])
+        return {"ag": _smoothed(g, self.n, self.alpha, first=1), "al": _smoothed(l, self.n, self.alpha, first=1)}
+
+    def extend(self, st: Dict[str, np.ndarray], b: Dict[str, np.ndarray], k: int) -> Optional[Dict[str, np.ndarray]]:
+        g, l = self._gain_loss(b["c"])
+        ag = _extend_smoothed(st["ag"], g, k, self.alpha)
+        al = _extend_smoothed(st["al"], l, k, self.alpha)
+        return None if ag is None or al is None else {"ag": ag, "al": al}
+
+    def output(self, st: Dict[str, np.ndarray]) -> Any:
+        ag, al = st["ag"], st["al"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100.0 - 100.0 / (1.0 + ag / al)
+        rsi = np.where(al == 0, np.where(ag == 0, 50.0, 100.0), rsi)
+        return np.where(np.isnan(ag), np.nan, rsi)
+
+
+class _ATR:
+    def __init__(self, n: int):
+        self.n = n
+        self.alpha = 1.0 / n
+
+    @staticmethod
+    def _tr(b: Dict[str, np.ndarray]) -> np.ndarray:
+        h, l, c = b["h"], b["l"], b["c"]
+        pc = np.concatenate(([np.nan], c[:-1]))
+        tr = np.fmax(h - l, np.fmax(np.abs(h - pc), np.abs(l - pc)))
+        return tr
+
+    def full(self, b: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        return {"atr": _smoothed(self._tr(b), self.n, self.alpha)}
+
+    def extend(self, st: Dict[str, np.ndarray], b: Dict[str, np.ndarray], k: int) -> Optional[Dict[str, np.ndarray]]:
+        atr = _extend_smoothed(st["atr"], self._tr(b), k, self.alpha)
+        return None if atr is None else {"atr": atr}
+
+    def output(self, st: Dict[str, np.ndarray]) -> Any:
+        return st["atr"]
+
+
+class _MACD:
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast, self.slow, self.signal = fast, slow, signal
+        self.af, self.as_, self.ag = 2.0 / (fast + 1), 2.0 / (slow + 1), 2.0 / (signal + 1)
+
+    def full(self, b: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        ef = _smoothed(b["c"], self.fast, self.af)
+        es = _smoothed(b["c"], self.slow, self.as_)
+        macd = ef - es
+        sig = _smoothed(macd, self.signal, self.ag, first=_first_valid(macd))
+        return {"ef": ef, "es": es, "sig": sig}
+
+    def extend(self, st: Dict[str, np.ndarray], b: Dict[str, np.ndarray], k: int) -> Optional[Dict[str, np.ndarray]]:
+        ef = _extend_smoothed(st["ef"], b["c"], k, self.af)
+        es = _extend_smoothed(st["es"], b["c"], k, self.as_)
+        if ef is None or es is None:
+            return None
+        sig = _extend_smoothed(st["sig"], ef - es, k, self.ag)
+        return None if sig is None else {"ef": ef, "es": es, "sig": sig}
+
+    def output(self, st: Dict[str, np.ndarray]) -> Any:
+        macd = st["ef"] - st["es"]
+        return {"macd": macd, "signal": st["sig"], "hist": macd - st["sig"]}
+
+
+class _BB:
+    def __init__(self, n: int = 20, k: float = 2.0):
+        self.n, self.k = n, k
+
+    def _window(self, c: np.ndarray, start: int) -> Tuple[np.ndarray, np.ndarray]:
+        # start.. için pencere istatistikleri
+        lo = max(0, start - self.n + 1)
+        seg = c[lo:]
+        mid = np.full(len(c) - start, np.nan)
+        std = np.full(len(c) - start, np.nan)
+        if len(seg) >= self.n:
+            w = np.lib.stride_tricks.sliding_window_view(seg, self.n)
+            first = start - lo - (self.n - 1)  # w[j] -> seg[j + n - 1]
+            skip = max(0, -first)
+            rows = w[max(0, first):]
+            mid[skip:] = rows.mean(axis=1)
+            std[skip:] = rows.std(axis=1)
+        return mid, std
+
+    def full(self, b: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        mid, std = self._window(b["c"], 0)
+        return {"mid": mid, "std": std}
+
+    def extend(self, st: Dict[str, np.ndarray], b: Dict[str, np.ndarray], k: int) -> Optional[Dict[str, np.ndarray]]:
+        mid, std = self._window(b["c"], k)
+        return {"mid": np.concatenate((st["mid"][:k], mid)), "std": np.concatenate((st["std"][:k], std))}
+
+    def output(self, st: Dict[str, np.ndarray]) -> Any:
+        return {"mid": st["mid"], "upper": st["mid"] + self.k * st["std"], "lower": st["mid"] - self.k * st["std"]}
+
+
+class _VWAP:
+    def __init__(self, intraday: bool):
+        self.intraday = intraday
+
+    def _keys(self, t: np.ndarray) -> np.ndarray:
+        if self.intraday:
+            return bucket_keys(t, "1D", IST_TZ)
+        return np.zeros(len(t), dtype=np.int64)
+
+    def full(self, b: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        pv = (b["h"] + b["l"] + b["c"]) / 3.0 * b["v"]
+        v = b["v"].astype(np.float64)
+        keys = self._keys(b["t"])
+        cpv, cv = np.cumsum(pv), np.cumsum(v)
+        if len(keys):
+            # seans başında sıfırla: her elemandan kendi seansının öncesindeki birikimi çıkar
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            grp = np.cumsum(np.r_[True, keys[1:] != keys[:-1]]) - 1
+            cpv = cpv - (cpv - pv)[starts][grp]
+            cv = cv - (cv - v)[starts][grp]
+        return {"cpv": cpv, "cv": cv, "key": keys}
+
+    def extend(self, st: Dict[str, np.ndarray], b: Dict[str, np.ndarray], k: int) -> Optional[Dict[str, np.ndarray]]:
+        n = len(b["t"])
+        keys = np.concatenate((st["key"][:k], self._keys(b["t"][k:])))
+        cpv = np.empty(n)
+        cv = np.empty(n)
+        cpv[:k], cv[:k] = st["cpv"][:k], st["cv"][:k]
+        h, l, c, v = b["h"], b["l"], b["c"], b["v"]
+        for i in range(k, n):
+            pv = (h[i] + l[i] + c[i]) / 3.0 * v[i]
+            same = keys[i] == keys[i - 1]
+            cpv[i] = (cpv[i - 1] if same else 0.0) + pv
+            cv[i] = (cv[i - 1] if same else 0.0) + v[i]
+        return {"cpv": cpv, "cv": cv, "key": keys}
+
+    def output(self, st: Dict[str, np.ndarray]) -> Any:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(st["cv"] > 0, st["cpv"] / st["cv"], np.nan)
+
+
+def _make(token: str, tf: str) -> Any:
+    m = _TOKEN.match(token)
+    if not m:
+        raise ValueError(token)
+    name, params = m.group(1), [int(p) for p in (m.group(2) or "").split("_") if p]
+    if any(p <= 0 or p > 500 for p in params):
+        raise ValueError(token)
+    if name == "ema":
+        return _EMA(*(params[:1] or [20]))
+    if name == "rsi":
+        return _RSI(*(params[:1] or [14]))
+    if name == "atr":
+        return _ATR(*(params[:1] or [14]))
+    if name == "macd":
+        if params and len(params) != 3:
+            raise ValueError(token)
+        return _MACD(*params) if params else _MACD()
+    if name == "bb":
+        return _BB(*(params[:1] or [20]), *(map(float, params[1:2])))
+    return _VWAP(intraday=tf in _INTRADAY_TF)
+
+
+def parse_indicator_set(spec: str) -> List[str]:
+    tokens = [t.strip().lower() for t in (spec or DEFAULT_INDICATOR_SET).split(",") if t.strip()]
+    return list(dict.fromkeys(tokens))
+
+
+# ============================================================
+# HESAP + MEMO
+# ============================================================
+def _common_prefix(old: Dict[str, np.ndarray], new: Dict[str, np.ndarray]) -> Tuple[int, int]:
+    """
+    (j0, k): new["t"][0] == old["t"][j0] ve new[:k] == old[j0:j0+k] (tüm kolonlar).
+    Örtüşme yoksa (-1, 0).
+    """
+    ot, nt = old["t"], new["t"]
+    if len(ot) == 0 or len(nt) == 0:
+        return -1, 0
+    j0 = int(np.searchsorted(ot, nt[0]))
+    if j0 >= len(ot) or ot[j0] != nt[0]:
+        return -1, 0
+    m = min(len(ot) - j0, len(nt))
+    same = np.ones(m, dtype=bool)
+    for name in ("t", "o", "h", "l", "c", "v"):
+        same &= old[name][j0:j0 + m] == new[name][:m]
+    k = m if same.all() else int(np.argmin(same))
+    return j0, k
+
+
+def _round_list(x: np.ndarray) -> List[Optional[float]]:
+    return [None if v != v else round(v, 4) for v in np.asarray(x, dtype=np.float64).tolist()]
+
+
+def _compute(tf: str, tokens: List[str], bars: Dict[str, np.ndarray], prev: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], str]:
+    """Dönüş: (durumlar, mod: full | incremental)."""
+    j0, k = _common_prefix(prev["bars"], bars) if prev else (-1, 0)
+    if j0 != 0:
+        # pencere kaydı: artımlı sonuç full() ile aynı olmaz (ısınma/tohum farkı)
+        k = 0
+    states: Dict[str, Any] = {}
+    for tok in tokens:
+        ind = _make(tok, tf)
+        st = None
+        if k > 0:
+            old = {name: arr[:k] for name, arr in prev["states"][tok].items()}
+            st = ind.extend(old, bars, k) if k < len(bars["t"]) else old
+        if st is None:
+            # önek yok ya da gösterge hâlâ ısınmada
+            st = ind.full(bars)
+        states[tok] = st
+    return states, ("incremental" if k > 0 else "full")
+
+
+def get_indicators(symbol: str, tf: str, spec: str = DEFAULT_INDICATOR_SET) -> Dict[str, Any]:
+    """
+    Dönüş: {"status": "success", "data": payload, "body": JSON byte'ları, "cache": hit|incremental|full}
+    """
+    tokens = parse_indicator_set(spec)
+    if not tokens or len(tokens) > MAX_INDICATORS:
+        return {"status": "error", "error": "bad_indicator_set"}
+    tf_norm = (tf or "").strip().lower()
+    try:
+        for tok in tokens:
+            _make(tok, tf_norm)
+    except ValueError as e:
+        return {"status": "error", "error": "unsupported_indicator", "message": str(e)}
+
+    res = get_candle_entry(symbol, tf_norm)
+    if res.get("status") != "success":
+        return res
+    code, bars = res["code"], res["entry"]["bars"]
+
+    key = (code, res["tf"], tuple(tokens))
+    prev = INDICATOR_MEM.get(key)
+    if prev is not None and prev["bars"] is bars:
+        return {"status": "success", "data": prev["payload"], "body": prev["body"], "cache": "hit"}
+
+    states, mode = _compute(res["tf"], tokens, bars, prev)
+
+    values: Dict[str, Any] = {}
+    for tok in tokens:
+        out = _make(tok, res["tf"]).output(states[tok])
+        values[tok] = {k: _round_list(v) for k, v in out.items()} if isinstance(out, dict) else _round_list(out)
+
+    payload = {
+        "symbol": code,
+        "timeframe": res["tf"],
+        "last_t": int(bars["t"][-1]) if len(bars["t"]) else None,
+        "t": bars["t"].tolist(),
+        "indicators": values,
+    }
+    if res["stale"]:
+        payload["_stale"] = True
+    body = json.dumps({"status": "success", "data": payload}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    size = len(body) + sum(a.nbytes for st in states.values() for a in st.values())
+    INDICATOR_MEM.put(key, {"bars": bars, "states": states, "payload": payload, "body": body}, size)
+    return {"status": "success", "data": payload, "body": body, "cache": mode}
@@ -1,9 +1,25 @@
 # api/technical_routes.py
 from __future__ import annotations
 
-from fastapi import APIRouter, Query
+import json
+import time
+from typing import Optional
 
-from .technical_services import list_symbols, get_candles, ALLOWED_TF
+from fastapi import APIRouter, Query, Response
+
+from .technical_services import (
+    ALLOWED_TF,
+    _ensure_candle_warmer,
+    candle_cache_stats,
+    get_candles,
+    list_symbols,
+    record_candle_response,
+)
+from .instrument_registry import registry_stats
+from .market_calendar import calendar_info
+from .technical_indicators import DEFAULT_INDICATOR_SET, INDICATOR_MEM, get_indicators
+from .technical_screener import run_screener
+from .technical_warmer import get_warmer_state
 
 router = APIRouter()
 
@@ -17,9 +33,79 @@ def technical_symbols(q: str = Query(default="", description="Search by code or
 @router.get("/candles")
 def technical_candles(
     symbol: str = Query(..., description="Whitelist symbol code, e.g. GARAN or XU100"),
-    tf: str = Query("15m", description="15m|30m|1h|1d")
+    tf: str = Query("15m", description="15m|30m|1h|4h|1d|1w"),
+    since: Optional[int] = Query(None, description="Epoch seconds; only bars with t >= since (use last_t of the previous response)"),
+    fmt: str = Query("rows", alias="format", description="rows|columnar"),
+):
+    t0 = time.perf_counter()
+    res = get_candles(symbol=symbol, tf=tf, since=since, fmt=fmt)
+    if res.get("status") != "success":
+        return {"status": "error", "error": res.get("error", "unknown_error"), "message": res.get("message", "")}
+
+    # Hazır serileştirme: jsonable_encoder turu yok, byte/süre ölçülebilir
+    body = json.dumps(
+        {"status": "success", "data": res["data"], "allowed_tf": sorted(list(ALLOWED_TF))},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    ms = (time.perf_counter() - t0) * 1000.0
+    record_candle_response(res["data"].get("format", "rows"), since is not None, len(body), ms)
+    return Response(content=body, media_type="application/json", headers={"Server-Timing": f"candles;dur={ms:.2f}"})
+
+
+@router.get("/indicators")
+def technical_indicators(
+    symbol: str = Query(..., description="Whitelist symbol code, e.g. GARAN or XU100"),
+    tf: str = Query("15m", description="15m|30m|1h|4h|1d|1w"),
+    indicator_set: str = Query(DEFAULT_INDICATOR_SET, alias="set", description="Comma list: rsiN, emaN, macd[F_S_G], bbN[_K], atrN, vwap"),
 ):
-    res = get_candles(symbol=symbol, tf=tf)
+    t0 = time.perf_counter()
+    res = get_indicators(symbol=symbol, tf=tf, spec=indicator_set)
     if res.get("status") != "success":
         return {"status": "error", "error": res.get("error", "unknown_error"), "message": res.get("message", "")}
-    return {"status": "success", "data": res["data"], "allowed_tf": sorted(list(ALLOWED_TF))}
+    # memo hazır JSON byte'larını tutar; isabette serileştirme yok
+    ms = (time.perf_counter() - t0) * 1000.0
+    return Response(
+        content=res["body"],
+        media_type="application/json",
+        headers={"Server-Timing": f"indicators;desc={res['cache']};dur={ms:.3f}"},
+    )
+
+
+@router.get("/screener")
+def technical_screener(
+    tf: str = Query("1d", description="15m|30m|1h|4h|1d|1w"),
+    rsi_below: Optional[float] = Query(None, description="RSI(rsi_n) < value"),
+    rsi_above: Optional[float] = Query(None, description="RSI(rsi_n) > value"),
+    cross: Optional[str] = Query(None, description="golden|death: EMA fast/slow crossover within cross_within bars"),
+    cross_within: int = Query(5, ge=1, le=200),
+    vol_spike: Optional[float] = Query(None, description="Last bar volume > k x average of previous vol_n bars"),
+    new_high: bool = Query(False, description="Last bar high is the highest of the last high_n bars (252 on 1d ~ 52 weeks)"),
+    rs_min: Optional[float] = Query(None, description="Min relative strength vs XU100 over rs_n bars (%)"),
+    rsi_n: int = Query(14, ge=2, le=100),
+    ema_fast: int = Query(20, ge=2, le=200),
+    ema_slow: int = Query(50, ge=3, le=400),
+    vol_n: int = Query(20, ge=1, le=200),
+    high_n: int = Query(252, ge=2, le=600),
+    rs_n: int = Query(20, ge=1, le=400),
+    sort: str = Query("rs", description="rs|rsi|vol_ratio|change|code"),
+    asc: bool = Query(False),
+    limit: int = Query(50, ge=1, le=500),
+):
+    t0 = time.perf_counter()
+    res = run_screener(
+        tf=tf, rsi_below=rsi_below, rsi_above=rsi_above, cross=cross, cross_within=cross_within,
+        vol_spike=vol_spike, new_high=new_high, rs_min=rs_min, rsi_n=rsi_n, ema_fast=ema_fast,
+        ema_slow=ema_slow, vol_n=vol_n, high_n=high_n, rs_n=rs_n, sort=sort, asc=asc, limit=limit,
+    )
+    if res.get("status") != "success":
+        return {"status": "error", "error": res.get("error", "unknown_error"), "message": res.get("message", "")}
+    ms = (time.perf_counter() - t0) * 1000.0
+    body = json.dumps(res, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return Response(content=body, media_type="application/json", headers={"Server-Timing": f"screener;desc={res['cache']};dur={ms:.2f}"})
+
+
+@router.get("/cache-stats")
+def technical_cache_stats():
+    _ensure_candle_warmer()
+    return {"status": "success", "data": {**candle_cache_stats(), "indicators": INDICATOR_MEM.stats(), "warmer": get_warmer_state(), "registry": registry_stats(), "calendar": calendar_info()}}
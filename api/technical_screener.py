@@ -0,0 +1,301 @@
+# api/technical_screener.py
+"""
+Tüm whitelist üzerinde tek geçişte teknik tarama (/technical/screener).
+
+Her sembolün önbellekteki barları (get_candle_entry(cache_only=True):
+bellek + depo, istek yolunda yfinance yok; hiç çekilmemiş semboller
+"skipped" sayılır) ortak zaman eksenine hizalanıp sembol x bar
+matrislerine (close / high / volume) yığılır; metrikler matris üzerinde bir kez hesaplanır:
+  rsi        Wilder RSI(rsi_n) (ewm; tohum bölgesinde /indicators'tan
+             küçük fark olabilir, son barlarda aynıdır)
+  ema_fast / ema_slow ve son cross_within bar içindeki kesişim
+  vol_ratio  son bar hacmi / önceki vol_n barın ortalaması
+  at_high    son bar high'ı son high_n barın (1d'de 252 ≈ 52 hafta) zirvesi mi
+  rs         rs_n bardaki getiri / XU100 getirisi - 1 (%)
+  change     son bar değişimi (%)
+
+Metrik tablosu (tf, parametreler, bar dizilerinin kimliği) başına saklanır:
+bar kapanışı / yenileme olmadıkça filtreler yalnızca maske işlemidir.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .technical_services import ALLOWED_TF, get_candle_entry, load_symbols
+
+SCREENER_SORT_KEYS = {"rs", "rsi", "vol_ratio", "change", "code"}
+SCREENER_MAX_LOOKBACK = 600
+
+_METRICS_CACHE: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+_METRICS_LOCK = threading.Lock()
+_METRICS_CACHE_MAX = 16
+
+
+# ============================================================
+# MATRİS
+# ============================================================
+def _universe() -> Tuple[List[Dict[str, str]], Optional[str]]:
+    data = load_symbols()
+    xu = data.get("xu100") or {}
+    return list(data.get("stocks", [])), xu.get("code")
+
+
+def _stack(entries: List[Dict[str, np.ndarray]]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Ortak zaman ekseni (tüm t'lerin birleşimi) ve S x T matrisler.
+    Close ileri doldurulur (işlem görmeyen bar = değişim yok), hacim 0.
+    """
+    ts = np.unique(np.concatenate([b["t"] for b in entries])) if entries else np.zeros(0, dtype=np.int64)
+    S, T = len(entries), len(ts)
+    close = np.full((S, T), np.nan)
+    high = np.full((S, T), np.nan)
+    vol = np.zeros((S, T))
+    for i, b in enumerate(entries):
+        pos = np.searchsorted(ts, b["t"])
+        close[i, pos] = b["c"]
+        high[i, pos] = b["h"]
+        vol[i, pos] = b["v"]
+    close = pd.DataFrame(close.T).ffill().to_numpy().T
+    return ts, {"c": close, "h": high, "v": vol}
+
+
+def _ewm(x: np.ndarray, alpha: float) -> np.ndarray:
+    """S x T matrisin her satırı için adjust=False üstel ortalama (baştaki NaN'lar korunur)."""
+    return pd.DataFrame(x.T).ewm(alpha=alpha, adjust=False, ignore_na=True).mean().to_numpy().T
+
+
+def _last_cross(fast: np.ndarray, slow: np.ndarray, within: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Son `within` bardaki en yakın kesişim: (+1 golden / -1 death / 0 yok, kaç bar önce)."""
+    above = fast > slow
+    valid = ~(np.isnan(fast) | np.isnan(slow))
+    prev_above, cur_above = above[:, :-1], above[:, 1:]
+    ok = valid[:, :-1] & valid[:, 1:]
+    golden = (~prev_above & cur_above & ok)[:, -within:]
+    death = (prev_above & ~cur_above & ok)[:, -within:]
+    ev = np.where(golden, 1, np.where(death, -1, 0))
+    any_ev = ev != 0
+    # sağdan ilk olay
+    ago = np.argmax(any_ev[:, ::-1], axis=1)
+    has = any_ev.any(axis=1)
+    kind = np.where(has, ev[np.arange(len(ev)), ev.shape[1] - 1 - ago], 0)
+    return kind, np.where(has, ago, -1)
+
+
+def _metrics(
+    codes: List[str],
+    mats: Dict[str, np.ndarray],
+    base: Optional[np.ndarray],
+    p: Dict[str, int],
+) -> Dict[str, np.ndarray]:
+    c, h, v = mats["c"], mats["h"], mats["v"]
+    T = c.shape[1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d = np.diff(c, axis=1)
+        gain = np.where(np.isnan(d), np.nan, np.maximum(d, 0.0))
+        loss = np.where(np.isnan(d), np.nan, np.maximum(-d, 0.0))
+        ag = _ewm(gain, 1.0 / p["rsi_n"])[:, -1]
+        al = _ewm(loss, 1.0 / p["rsi_n"])[:, -1]
+        rsi = np.where(al == 0, np.where(ag == 0, 50.0, 100.0), 100.0 - 100.0 / (1.0 + ag / al))
+        rsi = np.where(np.isnan(ag) | (np.sum(~np.isnan(d), axis=1) < p["rsi_n"]), np.nan, rsi)
+
+        ema_f = _ewm(c, 2.0 / (p["ema_fast"] + 1))
+        ema_s = _ewm(c, 2.0 / (p["ema_slow"] + 1))
+        cross, cross_ago = _last_cross(ema_f, ema_s, max(1, min(p["cross_within"], T - 1)))
+
+        vol_n = min(p["vol_n"], T - 1)
+        avg_vol = v[:, T - 1 - vol_n:T - 1].mean(axis=1) if vol_n > 0 else np.full(len(v), np.nan)
+        vol_ratio = np.where(avg_vol > 0, v[:, -1] / avg_vol, np.nan)
+
+        window = h[:, -min(p["high_n"], T):]
+        hi = np.nanmax(np.where(np.isnan(window), -np.inf, window), axis=1)
+        at_high = np.isfinite(hi) & (h[:, -1] >= hi)
+        from_high = np.where(np.isfinite(hi) & (hi > 0), (c[:, -1] / hi - 1.0) * 100.0, np.nan)
+
+        change = (c[:, -1] / c[:, -2] - 1.0) * 100.0 if T >= 2 else np.full(len(c), np.nan)
+
+        rs = np.full(len(c), np.nan)
+        n = p["rs_n"]
+        if base is not None and T > n and base[-1 - n] > 0 and base[-1] > 0:
+            base_ret = base[-1] / base[-1 - n]
+            rs = ((c[:, -1] / c[:, -1 - n]) / base_ret - 1.0) * 100.0
+
+    return {
+        "code": np.array(codes, dtype=object),
+        "close": c[:, -1],
+        "change": change,
+        "rsi": rsi,
+        "ema_fast": ema_f[:, -1],
+        "ema_slow": ema_s[:, -1],
+        "cross": cross,
+        "cross_ago": cross_ago,
+        "vol_ratio": vol_ratio,
+        "at_high": at_high,
+        "from_high": from_high,
+        "rs": rs,
+    }
+
+
+def _metric_table(tf: str, p: Dict[str, int]) -> Dict[str, Any]:
+    stocks, xu_code = _universe()
+    codes: List[str] = []
+    names: Dict[str, str] = {}
+    bars: List[Dict[str, np.ndarray]] = []
+    skipped = 0
+    for s in stocks:
+        res = get_candle_entry(s["code"], tf, cache_only=True)
+        if res.get("status") != "success" or len(res["entry"]["bars"]["t"]) == 0:
+            skipped += 1
+            continue
+        codes.append(res["code"])
+        names[res["code"]] = s.get("name", "")
+        bars.append(res["entry"]["bars"])
+
+    base_bars = None
+    if xu_code:
+        res = get_candle_entry(xu_code, tf, cache_only=True)
+        if res.get("status") == "success" and len(res["entry"]["bars"]["t"]):
+            base_bars = res["entry"]["bars"]
+
+    # bar dizileri yenilenmedikçe (aynı nesneler) metrikler yeniden hesaplanmaz
+    key = (tf, tuple(sorted(p.items())), tuple(id(b) for b in bars), id(base_bars))
+    with _METRICS_LOCK:
+        hit = _METRICS_CACHE.get(key)
+    if hit is not None:
+        return {**hit, "skipped": skipped, "cache": "hit"}
+
+    ts, mats = _stack(bars + ([base_bars] if base_bars is not None else []))
+    base = None
+    if base_bars is not None:
+        base = mats["c"][-1]
+        mats = {k: m[:-1] for k, m in mats.items()}
+    if ts.size > SCREENER_MAX_LOOKBACK:
+        ts = ts[-SCREENER_MAX_LOOKBACK:]
+        mats = {k: m[:, -SCREENER_MAX_LOOKBACK:] for k, m in mats.items()}
+        base = base[-SCREENER_MAX_LOOKBACK:] if base is not None else None
+
+    table = {
+        "asof_t": int(ts[-1]) if ts.size else None,
+        "names": names,
+        "metrics": _metrics(codes, mats, base, p) if codes and ts.size >= 2 else None,
+        "refs": (bars, base_bars),  # id()'lerin geçerli kalması için referans
+    }
+    with _METRICS_LOCK:
+        if len(_METRICS_CACHE) >= _METRICS_CACHE_MAX:
+            _METRICS_CACHE.pop(next(iter(_METRICS_CACHE)))
+        _METRICS_CACHE[key] = table
+    return {**table, "skipped": skipped, "cache": "miss"}
+
+
+# ============================================================
+# GİRİŞ
+# ============================================================
+def _num(x: Any, nd: int = 2) -> Optional[float]:
+    try:
+        f = float(x)
+    except Exception:
+        return None
+    return None if f != f or f in (float("inf"), float("-inf")) else round(f, nd)
+
+
+def run_screener(
+    tf: str = "1d",
+    rsi_below: Optional[float] = None,
+    rsi_above: Optional[float] = None,
+    cross: Optional[str] = None,
+    cross_within: int = 5,
+    vol_spike: Optional[float] = None,
+    new_high: bool = False,
+    rs_min: Optional[float] = None,
+    rsi_n: int = 14,
+    ema_fast: int = 20,
+    ema_slow: int = 50,
+    vol_n: int = 20,
+    high_n: int = 252,
+    rs_n: int = 20,
+    sort: str = "rs",
+    asc: bool = False,
+    limit: int = 50,
+) -> Dict[str, Any]:
+    tf_norm = (tf or "").strip().lower()
+    if tf_norm not in ALLOWED_TF:
+        return {"status": "error", "error": "unsupported_timeframe"}
+    if cross not in (None, "", "golden", "death"):
+        return {"status": "error", "error": "bad_cross", "message": "golden|death"}
+    if sort not in SCREENER_SORT_KEYS:
+        return {"status": "error", "error": "bad_sort", "message": "|".join(sorted(SCREENER_SORT_KEYS))}
+
+    p = {
+        "rsi_n": max(2, int(rsi_n)),
+        "ema_fast": max(2, int(ema_fast)),
+        "ema_slow": max(3, int(ema_slow)),
+        "cross_within": max(1, int(cross_within)),
+        "vol_n": max(1, int(vol_n)),
+        "high_n": max(2, min(int(high_n), SCREENER_MAX_LOOKBACK)),
+        "rs_n": max(1, int(rs_n)),
+    }
+    table = _metric_table(tf_norm, p)
+    m = table["metrics"]
+    if m is None:
+        return {"status": "success", "tf": tf_norm, "asof_t": table["asof_t"], "universe": 0, "skipped": table["skipped"], "count": 0, "items": [], "cache": table["cache"]}
+
+    mask = np.ones(len(m["code"]), dtype=bool)
+    with np.errstate(invalid="ignore"):
+        if rsi_below is not None:
+            mask &= m["rsi"] < rsi_below
+        if rsi_above is not None:
+            mask &= m["rsi"] > rsi_above
+        if cross:
+            mask &= m["cross"] == (1 if cross == "golden" else -1)
+        if vol_spike is not None:
+            mask &= m["vol_ratio"] > vol_spike
+        if new_high:
+            mask &= m["at_high"]
+        if rs_min is not None:
+            mask &= m["rs"] >= rs_min
+
+    idx = np.flatnonzero(mask)
+    if sort == "code":
+        order = idx[np.argsort(m["code"][idx].astype(str))]
+    else:
+        vals = m[sort][idx].astype(np.float64)
+        # NaN'lar her iki yönde de sona
+        keyv = np.where(np.isnan(vals), np.inf, vals if asc else -vals)
+        order = idx[np.argsort(keyv, kind="stable")]
+    if sort == "code" and not asc:
+        order = order[::-1]
+    order = order[:max(1, int(limit))]
+
+    items = []
+    for i in order.tolist():
+        code = m["code"][i]
+        kind = int(m["cross"][i])
+        items.append({
+            "code": code,
+            "name": table["names"].get(code, ""),
+            "close": _num(m["close"][i], 4),
+            "change": _num(m["change"][i]),
+            "rsi": _num(m["rsi"][i]),
+            "ema_fast": _num(m["ema_fast"][i], 4),
+            "ema_slow": _num(m["ema_slow"][i], 4),
+            "cross": {1: "golden", -1: "death"}.get(kind),
+            "cross_bars_ago": int(m["cross_ago"][i]) if kind else None,
+            "vol_ratio": _num(m["vol_ratio"][i]),
+            "at_high": bool(m["at_high"][i]),
+            "from_high": _num(m["from_high"][i]),
+            "rs": _num(m["rs"][i]),
+        })
+
+    return {
+        "status": "success",
+        "tf": tf_norm,
+        "asof_t": table["asof_t"],
+        "universe": len(m["code"]),
+        "skipped": table["skipped"],
+        "count": int(mask.sum()),
+        "items": items,
+        "cache": table["cache"],
+    }
@@ -5,13 +5,19 @@ import os
 import json
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Tuple, Optional
 from zoneinfo import ZoneInfo
 
+import numpy as np
 import yfinance as yf
 
+from .candle_store import COLUMNS, ByteLRU, CandleStore, bars_from_frame, bucket_keys, empty_bars, resample
+from .instrument_registry import get_instrument, search_instruments, technical_symbols
+from .market_calendar import data_may_change
+
 
 # ============================================================
 # PATHS
@@ -19,24 +25,36 @@ import yfinance as yf
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 
-SYMBOLS_PATH = os.path.join(DATA_DIR, "technical_symbols.json")
-
 CACHE_DIR = os.path.join(BASE_DIR, "technical_cache")
-CANDLES_DIR = os.path.join(CACHE_DIR, "candles")  # 15m cache
-DAILY_DIR = os.path.join(CACHE_DIR, "daily")      # 1d cache
+STORE_DIR = os.path.join(CACHE_DIR, "store")      # sütunsal mum deposu (15m, 1d)
+# Eski JSON cache (ilk erişimde depoya aktarılıp silinir)
+CANDLES_DIR = os.path.join(CACHE_DIR, "candles")  # 15m
+DAILY_DIR = os.path.join(CACHE_DIR, "daily")      # 1d
 
 os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(CACHE_DIR, exist_ok=True)
-os.makedirs(CANDLES_DIR, exist_ok=True)
-os.makedirs(DAILY_DIR, exist_ok=True)
 
 # ============================================================
 # CONFIG
 # ============================================================
-ALLOWED_TF = {"15m", "30m", "1h", "1d"}
-
+ALLOWED_TF = {"15m", "30m", "1h", "4h", "1d", "1w"}
+
+# Türetilmiş çözünürlükler: tf -> (kaynak seri, kova kuralı).
+# Kaynak seri depoya yazıldığında (ingest) etkilenen kovalar yeniden
+# hesaplanıp depoya yazılır; istek anında yalnızca dilim okunur.
+# "1d-15m": günlük yfinance çekimi başarısız olursa kullanılan yedek.
+CANDLE_PYRAMID: Dict[str, Tuple[str, str]] = {
+    "30m": ("15m", "30min"),
+    "1h": ("15m", "1h"),
+    "4h": ("15m", "4h"),
+    "1d-15m": ("15m", "1D"),
+    "1w": ("1d", "1W"),
+}
+
+# Seans içi TTL'ler; seans dışında çekilmiş seri bir sonraki açılışa kadar taze (market_calendar)
 TTL_15M_SECONDS = 15 * 60     # 15 dakika
 TTL_1D_SECONDS = 6 * 60 * 60  # 6 saat (günlük veri için yeterli stabil)
+SERIES_TTL_SECONDS = {"15m": TTL_15M_SECONDS, "1d": TTL_1D_SECONDS}
 
 # yfinance intraday limitleri için güvenli period
 YF_15M_PERIOD = "60d"   # 15m için genelde 60gün limit; stabil
@@ -45,15 +63,34 @@ YF_1D_PERIOD = "2y"     # günlük için daha geniş
 # Grafikte çok ağır olmaması için max mum sayısı (mobilde render rahat)
 MAX_CANDLES_RETURN = 600
 
-IST_TZ = ZoneInfo("Europe/Istanbul")
+# /technical/candles yanıt düzenleri
+CANDLE_FORMATS = {"rows", "columnar"}
+
+# Depoda son bar bu kadar eskiyse artımlı değil tam period çekilir
+# (yfinance 15m için start en fazla ~60 gün geriye gidebilir)
+INCREMENTAL_MAX_AGE_SEC = {"15m": 55 * 24 * 3600, "1d": 365 * 24 * 3600}
+
+CANDLE_STORE = CandleStore(STORE_DIR)
+
+# Depo önünde bellek katmanı: (kod, seri) -> son MAX_CANDLES_RETURN bar + hazır candle listesi.
+# Taze isabet disk I/O yapmaz; süresi dolmuş kayıt hemen döner, yenileme arka planda (tek).
+CANDLE_MEM_MAX_BYTES = int(float(os.getenv("TECH_CANDLE_MEM_MB", "64")) * 1024 * 1024)
+CANDLE_MEM = ByteLRU(CANDLE_MEM_MAX_BYTES)
+_CANDLE_DICT_BYTES = 480  # candle dict + ISO string için yaklaşık bellek
+_REFRESH_POOL = ThreadPoolExecutor(max_workers=int(os.getenv("TECH_REFRESH_WORKERS", "4")), thread_name_prefix="candles")
+_REFRESHING: set = set()
+_REFRESHING_GUARD = threading.Lock()
+# Arka plan yenilemesi hata verirse aynı seri bu süre boyunca tekrar denenmez
+REFRESH_RETRY_SEC = 60
+_REFRESH_FAILED_AT: Dict[str, float] = {}
 
-# Sembol RAM cache
-_SYMBOLS_LOCK = threading.Lock()
-_SYMBOLS_CACHE: Optional[Dict[str, Any]] = None
-_SYMBOLS_CACHE_TS = 0.0
+_RESPONSE_STATS: Dict[str, Dict[str, Any]] = {}
+_RESPONSE_STATS_LOCK = threading.Lock()
+
+IST_TZ = ZoneInfo("Europe/Istanbul")
 
 # Aynı anda aynı sembole çoklu istek gelince tek fetch olsun
-_FETCH_LOCKS: Dict[str, threading.Lock] = {}
+_FETCH_LOCKS: Dict[str, threading.RLock] = {}
 _FETCH_LOCKS_GUARD = threading.Lock()
 
 
@@ -114,197 +151,172 @@ def _write_json_atomic(path: str, obj: Dict[str, Any]) -> None:
     os.replace(tmp, path)
 
 
-def _get_lock(key: str) -> threading.Lock:
+def _get_lock(key: str) -> threading.RLock:
     with _FETCH_LOCKS_GUARD:
         if key not in _FETCH_LOCKS:
-            _FETCH_LOCKS[key] = threading.Lock()
+            _FETCH_LOCKS[key] = threading.RLock()
         return _FETCH_LOCKS[key]
 
 
 def load_symbols() -> Dict[str, Any]:
     """
-    technical_symbols.json dosyasını RAM'e alır.
+    Teknik whitelist (technical_symbols.json), enstrüman kaydından.
+    Kayıt yalnızca kaynak dosyalar değişince yeniden kurulur.
     """
-    global _SYMBOLS_CACHE, _SYMBOLS_CACHE_TS
-    with _SYMBOLS_LOCK:
-        # 60 saniyede bir dosya değişikliği varsayımıyla refresh (geliştirme kolaylığı)
-        if _SYMBOLS_CACHE is not None and (_now_ts() - _SYMBOLS_CACHE_TS) < 60:
-            return _SYMBOLS_CACHE
-
-        data = _read_json(SYMBOLS_PATH)
-        if not data:
-            # dosya yoksa veya bozuksa boş whitelist
-            data = {"xu100": None, "stocks": []}
-
-        # normalize
-        xu = data.get("xu100")
-        stocks = data.get("stocks") or []
-        if xu and "code" in xu:
-            xu["code"] = str(xu["code"]).strip().upper()
-
-        cleaned_stocks = []
-        for s in stocks:
-            try:
-                code = str(s.get("code", "")).strip().upper()
-                yf_code = str(s.get("yf", "")).strip()
-                name = str(s.get("name", "")).strip()
-                stype = str(s.get("type", "stock")).strip()
-                if code and yf_code:
-                    cleaned_stocks.append({"code": code, "yf": yf_code, "name": name, "type": stype})
-            except Exception:
-                continue
-
-        data = {"xu100": xu, "stocks": cleaned_stocks}
-        _SYMBOLS_CACHE = data
-        _SYMBOLS_CACHE_TS = _now_ts()
-        return data
+    return technical_symbols()
 
 
 def resolve_symbol(symbol: str) -> Optional[Dict[str, str]]:
     """
-    Mobilin gönderdiği symbol (GARAN, XU100) -> yf ticker.
+    Mobilin gönderdiği symbol (GARAN, XU100, GARAN.IS, BIST100) -> yf ticker.
     Whitelist dışıysa None döner.
     """
-    sym = (symbol or "").strip().upper()
-    if not sym:
+    it = get_instrument(symbol)
+    if it is None or not it["technical"]:
         return None
-
-    data = load_symbols()
-    xu = data.get("xu100")
-    if xu and xu.get("code") == sym:
-        return {"code": xu["code"], "yf": xu["yf"], "name": xu.get("name", ""), "type": xu.get("type", "index")}
-
-    for s in data.get("stocks", []):
-        if s.get("code") == sym:
-            return {"code": s["code"], "yf": s["yf"], "name": s.get("name", ""), "type": s.get("type", "stock")}
-
-    return None
+    return {"code": it["code"], "yf": it["yf"], "name": it["name"], "type": it["type"]}
 
 
 def list_symbols(q: str = "") -> List[Dict[str, str]]:
     """
-    /technical/symbols için: arama destekli liste.
+    /technical/symbols için: arama destekli liste (kod / ad kelimesi öneki,
+    Türkçe karakter duyarsız).
     """
-    query = (q or "").strip().lower()
-    data = load_symbols()
-
-    out: List[Dict[str, str]] = []
-    xu = data.get("xu100")
-    if xu:
-        out.append({"code": xu["code"], "name": xu.get("name", ""), "type": xu.get("type", "index")})
-
-    for s in data.get("stocks", []):
-        out.append({"code": s["code"], "name": s.get("name", ""), "type": s.get("type", "stock")})
-
-    if not query:
-        return out
-
-    filtered = []
-    for item in out:
-        if query in item["code"].lower() or query in (item.get("name", "").lower()):
-            filtered.append(item)
-    return filtered
-
+    return [
+        {"code": it["code"], "name": it["name"], "type": it["type"], "sector": it["sector"]}
+        for it in search_instruments(q, technical_only=True)
+    ]
 
-def _cache_path_15m(symbol_code: str) -> str:
-    return os.path.join(CANDLES_DIR, f"{symbol_code}_15m.json")
 
-
-def _cache_path_1d(symbol_code: str) -> str:
-    return os.path.join(DAILY_DIR, f"{symbol_code}_1d.json")
+def _legacy_json_path(symbol_code: str, tf: str) -> str:
+    if tf == "1d":
+        return os.path.join(DAILY_DIR, f"{symbol_code}_1d.json")
+    return os.path.join(CANDLES_DIR, f"{symbol_code}_{tf}.json")
 
 
 def _is_cache_fresh(cache_obj: Dict[str, Any], ttl_seconds: int) -> bool:
+    """
+    TTL dolmamışsa ya da çekimden bu yana hiç seans penceresi geçmemişse
+    (gece, hafta sonu, tatil: market_calendar) taze; yeni bar oluşamaz.
+    """
     try:
-        ts = float(cache_obj.get("_cached_at", 0))
-        return (_now_ts() - ts) < ttl_seconds
+        ts = float(cache_obj.get("_cached_at", cache_obj.get("fetched_at", 0)))
+        now = _now_ts()
+        return (now - ts) < ttl_seconds or (ts > 0 and not data_may_change(ts, now))
     except Exception:
         return False
 
 
-def _df_to_candles(df) -> List[Dict[str, Any]]:
+def _bars_to_candles(bars: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
-    yfinance dataframe -> candle list
+    Kolon dizileri -> API'nin candle listesi (t: Istanbul ISO).
+    """
+    t = bars["t"].tolist()
+    if not t:
+        return []
+    return [
+        {
+            "t": datetime.fromtimestamp(ts, IST_TZ).isoformat(),
+            "o": o,
+            "h": h,
+            "l": l,
+            "c": c,
+            "v": v,
+        }
+        for ts, o, h, l, c, v in zip(
+            t,
+            bars["o"].tolist(),
+            bars["h"].tolist(),
+            bars["l"].tolist(),
+            bars["c"].tolist(),
+            bars["v"].tolist(),
+        )
+    ]
+
+
+def _import_legacy_json(symbol_code: str, tf: str) -> None:
+    """
+    Eski JSON cache varsa (ve depo boşsa) tek seferlik depoya aktarır;
+    böylece ilk yenileme de artımlı olur.
+    """
+    path = _legacy_json_path(symbol_code, tf)
+    if not os.path.exists(path):
+        return
+    cached = _read_json(path)
+    try:
+        if cached and CANDLE_STORE.count(symbol_code, tf) == 0:
+            rows = []
+            for c in cached.get("candles") or []:
+                dt_obj = _parse_iso(c.get("t", ""))
+                if dt_obj:
+                    rows.append((int(dt_obj.timestamp()), _safe_float(c.get("o")), _safe_float(c.get("h")),
+                                 _safe_float(c.get("l")), _safe_float(c.get("c")), _safe_int(c.get("v"))))
+            if rows:
+                cols = list(zip(*rows))
+                CANDLE_STORE.merge(symbol_code, tf, {
+                    "t": np.array(cols[0], dtype=np.int64),
+                    "o": np.array(cols[1], dtype=np.float64),
+                    "h": np.array(cols[2], dtype=np.float64),
+                    "l": np.array(cols[3], dtype=np.float64),
+                    "c": np.array(cols[4], dtype=np.float64),
+                    "v": np.array(cols[5], dtype=np.int64),
+                })
+                CANDLE_STORE.set_meta(
+                    symbol_code, tf,
+                    fetched_at=float(cached.get("_cached_at", 0) or 0),
+                    last_update=cached.get("last_update"),
+                    source=cached.get("source", "yfinance"),
+                )
+                _build_pyramid(symbol_code, tf, None)
+        os.remove(path)
+    except Exception as e:
+        print(f"⚠️ Eski mum cache aktarılamadı ({symbol_code} {tf}): {e}")
+
+
+def download_candles(tickers: Any, tf: str, since_ts: Optional[int] = None, **extra: Any):
+    """
+    yfinance.download sarmalayıcısı (tek ticker ya da liste).
+    since_ts verilirse yalnızca o bardan (dahil; yarım mum güncellensin)
+    sonrası istenir, yoksa tam period.
     """
-    candles: List[Dict[str, Any]] = []
-    if df is None or len(df) == 0:
-        return candles
-
-    # Index datetime olabilir
-    # yfinance bazen tz-aware bazen naive döner
-    for idx, row in df.iterrows():
-        try:
-            dt_obj = idx.to_pydatetime() if hasattr(idx, "to_pydatetime") else idx
-            if isinstance(dt_obj, datetime):
-                if dt_obj.tzinfo is None:
-                    # Yahoo çoğu zaman UTC varsayımı ile gelir
-                    dt_obj = dt_obj.replace(tzinfo=timezone.utc)
-            else:
-                continue
-
-            o = _safe_float(row.get("Open"))
-            h = _safe_float(row.get("High"))
-            l = _safe_float(row.get("Low"))
-            c = _safe_float(row.get("Close"))
-            v = _safe_int(row.get("Volume"))
-
-            # boş/NaN filtre
-            if o == 0.0 and h == 0.0 and l == 0.0 and c == 0.0:
-                continue
-
-            candles.append({
-                "t": _iso_istanbul(dt_obj),
-                "o": o,
-                "h": h,
-                "l": l,
-                "c": c,
-                "v": v
-            })
-        except Exception:
-            continue
-
-    # sırala + limit
-    candles.sort(key=lambda x: x["t"])
-    if len(candles) > MAX_CANDLES_RETURN:
-        candles = candles[-MAX_CANDLES_RETURN:]
-    return candles
-
-
-def _fetch_yfinance_15m(yf_symbol: str):
     # auto_adjust=False: OHLC daha stabil; prepost=False: standart
-    return yf.download(
-        tickers=yf_symbol,
-        period=YF_15M_PERIOD,
-        interval="15m",
+    kwargs: Dict[str, Any] = dict(
+        tickers=tickers,
+        interval=tf,
         auto_adjust=False,
         prepost=False,
         progress=False,
         threads=False,
     )
+    kwargs.update(extra)
+    if since_ts is not None and (_now_ts() - since_ts) < INCREMENTAL_MAX_AGE_SEC[tf]:
+        kwargs["start"] = datetime.fromtimestamp(since_ts, timezone.utc)
+    else:
+        kwargs["period"] = YF_15M_PERIOD if tf == "15m" else YF_1D_PERIOD
+    return yf.download(**kwargs)
 
 
-def _fetch_yfinance_1d(yf_symbol: str):
-    return yf.download(
-        tickers=yf_symbol,
-        period=YF_1D_PERIOD,
-        interval="1d",
-        auto_adjust=False,
-        prepost=False,
-        progress=False,
-        threads=False,
-    )
+def _ensure_candle_warmer() -> None:
+    """Isıtıcı thread'i yoksa (ilk istek / beklenmedik çıkış) başlatır."""
+    # technical_warmer bu modülü import eder: döngüsel import olmasın diye burada
+    from .technical_warmer import start_candle_warmer
+    start_candle_warmer()
 
 
-def get_candles(symbol: str, tf: str) -> Dict[str, Any]:
+def get_candle_entry(symbol: str, tf: str, cache_only: bool = False) -> Dict[str, Any]:
     """
-    Dış dünya için tek giriş:
-    - 15m: yfinance + disk cache
-    - 30m/1h: 15m'den aggregation
-    - 1d: yfinance + disk cache (fallback: 15m daily agg)
+    Sembol + tf için bellek kaydı (bars dizileri + candle listesi + meta).
+    - 15m: yfinance + mum deposu (artımlı)
+    - 30m/1h/4h: 15m ingest'inde türetilip depoda tutulan seriler
+    - 1d: yfinance + mum deposu (fallback: 15m'den türetilmiş günlük)
+    - 1w: 1d'den türetilmiş
+    cache_only: yalnızca bellek + depo; senkron çekim ve arka plan yenilemesi
+    yok, seri hiç yoksa "not_cached" (toplu uçlar: sparkline, tarayıcı).
+    Dönüş: {"status": "success", "code", "tf", "entry", "stale"} ya da hata.
+    Kayıt paylaşılır; çağıranlar dizileri değiştirmemeli.
     """
+    _ensure_candle_warmer()
     tf_norm = (tf or "").strip().lower()
-    if tf_norm == "1d":
-        tf_norm = "1d"
     if tf_norm not in ALLOWED_TF:
         return {"status": "error", "error": "unsupported_timeframe"}
 
@@ -315,35 +327,63 @@ def get_candles(symbol: str, tf: str) -> Dict[str, Any]:
     code = sym["code"]
     yf_code = sym["yf"]
 
-    if tf_norm == "15m":
-        return {"status": "success", "data": _get_15m_cached(code, yf_code)}
-
-    if tf_norm in ("30m", "1h"):
-        base = _get_15m_cached(code, yf_code)
-        if base.get("status") == "error":
-            return {"status": "error", "error": base.get("error", "fetch_failed")}
-        candles = base["candles"]
-        mult = 2 if tf_norm == "30m" else 4
-        agg = _aggregate(candles, tf_norm, mult)
-        payload = _wrap_payload(code, tf_norm, agg, source="derived", delayed=True, last_update=base.get("last_update"))
-        return {"status": "success", "data": payload}
-
-    # 1d
-    daily = _get_1d_cached(code, yf_code)
-    if daily.get("status") != "error":
-        payload = _wrap_payload(code, "1d", daily["candles"], source="yfinance", delayed=True, last_update=daily.get("last_update"))
-        return {"status": "success", "data": payload}
-
-    # fallback: 15m'den daily üret
-    base = _get_15m_cached(code, yf_code)
-    if base.get("status") == "error":
-        return {"status": "error", "error": "fetch_failed"}
-    candles = base["candles"]
-    agg = _aggregate_daily(candles)
-    payload = _wrap_payload(code, "1d", agg, source="derived", delayed=True, last_update=base.get("last_update"))
+    if tf_norm in CANDLE_PYRAMID:
+        # 30m/1h/4h (15m'den), 1w (1d'den): kaynak tazelenir, türetilmiş seri dilimlenir
+        src = CANDLE_PYRAMID[tf_norm][0]
+        base, info = _series_entry(code, yf_code, src, cache_only)
+        if base is None:
+            return {"status": "error", "error": info.get("error", "fetch_failed")}
+        entry = _derived_entry(code, tf_norm, base)
+    else:
+        entry, info = _series_entry(code, yf_code, tf_norm, cache_only)
+        if entry is None and tf_norm == "1d":
+            # fallback: 15m'den türetilmiş günlük
+            base, info = _series_entry(code, yf_code, "15m", cache_only)
+            if base is None:
+                return {"status": "error", "error": info.get("error", "fetch_failed")}
+            entry = _derived_entry(code, "1d-15m", base)
+        if entry is None:
+            return {"status": "error", "error": info.get("error", "fetch_failed"), "message": info.get("message", "")}
+
+    return {"status": "success", "code": code, "tf": tf_norm, "entry": entry, "stale": bool(info.get("stale"))}
+
+
+def get_candles(
+    symbol: str,
+    tf: str,
+    since: Optional[int] = None,
+    fmt: str = "rows",
+) -> Dict[str, Any]:
+    """
+    Dış dünya için tek giriş (bkz. get_candle_entry).
+    since (epoch sn): yalnızca t >= since barlar (son bar güncellenmiş olabilir).
+    fmt: "rows" (candle dict listesi) | "columnar" (t[], o[], h[], l[], c[], v[]).
+    """
+    fmt_norm = (fmt or "rows").strip().lower()
+    if fmt_norm not in CANDLE_FORMATS:
+        return {"status": "error", "error": "unsupported_format"}
+
+    res = get_candle_entry(symbol, tf)
+    if res.get("status") != "success":
+        return res
+
+    payload = _entry_payload(res["code"], res["tf"], res["entry"], since=since, fmt=fmt_norm)
+    if res["stale"]:
+        payload["_stale"] = True
     return {"status": "success", "data": payload}
 
 
+def _derived_entry(symbol_code: str, series: str, base: Dict[str, Any]) -> Dict[str, Any]:
+    entry = CANDLE_MEM.get((symbol_code, series))
+    # kaynak seri yenilendiyse (fetched_at değişti) türetilmiş kayıt da yenilenir
+    if entry is None or entry["meta"].get("fetched_at") != base["meta"].get("fetched_at"):
+        entry = _load_entry(symbol_code, series)
+    if entry is None:
+        meta = {**base["meta"], "source": "derived"}
+        entry = {"bars": empty_bars(), "candles": [], "meta": meta}
+    return entry
+
+
 def _wrap_payload(symbol_code: str, tf: str, candles: List[Dict[str, Any]], source: str, delayed: bool, last_update: Optional[str]) -> Dict[str, Any]:
     return {
         "symbol": symbol_code,
@@ -355,196 +395,201 @@ def _wrap_payload(symbol_code: str, tf: str, candles: List[Dict[str, Any]], sour
     }
 
 
-def _get_15m_cached(symbol_code: str, yf_symbol: str) -> Dict[str, Any]:
+def _load_entry(symbol_code: str, series: str) -> Optional[Dict[str, Any]]:
     """
-    15m cache oku. Taze değilse yfinance çekip cache yaz.
-    Aynı sembole aynı anda istek gelirse lock ile tek fetch.
+    Depodan son MAX_CANDLES_RETURN bar -> bellek katmanı.
+    Seri hiç çekilmemişse None.
     """
-    path = _cache_path_15m(symbol_code)
-
-    lock = _get_lock(f"{symbol_code}_15m")
-    with lock:
-        cached = _read_json(path)
-        if cached and _is_cache_fresh(cached, TTL_15M_SECONDS):
-            return cached
-
-        # yfinance fetch
-        try:
-            df = _fetch_yfinance_15m(yf_symbol)
-            candles = _df_to_candles(df)
-
-            payload = _wrap_payload(symbol_code, "15m", candles, source="yfinance", delayed=True, last_update=datetime.now(IST_TZ).replace(microsecond=0).isoformat())
-            payload["_cached_at"] = _now_ts()
-
-            _write_json_atomic(path, payload)
-            return payload
-        except Exception as e:
-            # cache varsa eskiyi döndür (hata anında bile servis kesilmesin)
-            if cached:
-                cached["_stale"] = True
-                return cached
-            return {"status": "error", "error": "yfinance_fetch_failed", "message": str(e)}
-
-
-def _get_1d_cached(symbol_code: str, yf_symbol: str) -> Dict[str, Any]:
-    path = _cache_path_1d(symbol_code)
-
-    lock = _get_lock(f"{symbol_code}_1d")
-    with lock:
-        cached = _read_json(path)
-        if cached and _is_cache_fresh(cached, TTL_1D_SECONDS):
-            return cached
-
-        try:
-            df = _fetch_yfinance_1d(yf_symbol)
-            candles = _df_to_candles(df)
-            payload = _wrap_payload(symbol_code, "1d", candles, source="yfinance", delayed=True, last_update=datetime.now(IST_TZ).replace(microsecond=0).isoformat())
-            payload["_cached_at"] = _now_ts()
-            _write_json_atomic(path, payload)
-            return payload
-        except Exception as e:
-            if cached:
-                cached["_stale"] = True
-                return cached
-            return {"status": "error", "error": "yfinance_fetch_failed", "message": str(e)}
-
-
-def _parse_iso(t: str) -> Optional[datetime]:
-    try:
-        # isoformat içinde timezone offset var (+03:00)
-        return datetime.fromisoformat(t)
-    except Exception:
+    meta = CANDLE_STORE.meta(symbol_code, series)
+    bars = CANDLE_STORE.tail(symbol_code, series, MAX_CANDLES_RETURN)
+    if not meta and len(bars["t"]) == 0:
         return None
-
-
-def _aggregate(candles: List[Dict[str, Any]], tf: str, mult: int) -> List[Dict[str, Any]]:
+    candles = _bars_to_candles(bars)
+    entry = {"bars": bars, "candles": candles, "meta": meta}
+    size = sum(a.nbytes for a in bars.values()) + len(candles) * _CANDLE_DICT_BYTES
+    CANDLE_MEM.put((symbol_code, series), entry, size)
+    return entry
+
+
+def _entry_payload(
+    symbol_code: str,
+    tf: str,
+    entry: Dict[str, Any],
+    since: Optional[int] = None,
+    fmt: str = "rows",
+) -> Dict[str, Any]:
+    meta = entry["meta"]
+    bars = entry["bars"]
+    # bellek kaydı son MAX_CANDLES_RETURN bar; since daha eskiyse hepsi döner
+    i = int(np.searchsorted(bars["t"], since, side="left")) if since is not None else 0
+
+    payload = _wrap_payload(symbol_code, tf, entry["candles"][i:] if i else entry["candles"], source=meta.get("source", "yfinance"), delayed=True, last_update=meta.get("last_update"))
+    if fmt == "columnar":
+        del payload["candles"]
+        payload["format"] = "columnar"
+        payload["columns"] = {name: bars[name][i:].tolist() for name, _ in COLUMNS}
+    payload["last_t"] = int(bars["t"][-1]) if len(bars["t"]) else None
+    if since is not None:
+        payload["since"] = int(since)
+    payload["_cached_at"] = meta.get("fetched_at", 0)
+    return payload
+
+
+def _ingest(symbol_code: str, tf: str, bars: Dict[str, np.ndarray]) -> Optional[Dict[str, Any]]:
     """
-    15m candles -> 30m (mult=2) veya 1h (mult=4).
-    Sürekli pair/group yapar; zaman hizası sorunlarını tolere eder.
+    Yeni barları depoya ekler; meta, türetilmiş seriler ve bellek kaydı
+    güncellenir. Seri lock'u çağıranda olmalı.
     """
-    if not candles:
-        return []
+    CANDLE_STORE.merge(symbol_code, tf, bars)
+    CANDLE_STORE.set_meta(
+        symbol_code, tf,
+        fetched_at=_now_ts(),
+        last_update=datetime.now(IST_TZ).replace(microsecond=0).isoformat(),
+        source="yfinance",
+    )
+    _build_pyramid(symbol_code, tf, int(bars["t"][0]) if len(bars["t"]) else None)
+    return _load_entry(symbol_code, tf)
 
-    # parse + sort
-    parsed: List[Tuple[datetime, Dict[str, Any]]] = []
-    for c in candles:
-        dt_obj = _parse_iso(c.get("t", ""))
-        if not dt_obj:
-            continue
-        parsed.append((dt_obj, c))
-    parsed.sort(key=lambda x: x[0])
-
-    out: List[Dict[str, Any]] = []
-
-    # Grup anahtarı: tf'ye göre floor
-    def key_for(dt_obj: datetime) -> datetime:
-        if tf == "30m":
-            m = (dt_obj.minute // 30) * 30
-            return dt_obj.replace(minute=m, second=0, microsecond=0)
-        # 1h
-        return dt_obj.replace(minute=0, second=0, microsecond=0)
-
-    current_key: Optional[datetime] = None
-    bucket: List[Dict[str, Any]] = []
-
-    for dt_obj, c in parsed:
-        k = key_for(dt_obj)
-        if current_key is None:
-            current_key = k
-            bucket = [c]
-            continue
 
-        if k != current_key:
-            out.append(_bucket_to_candle(current_key, bucket))
-            current_key = k
-            bucket = [c]
-        else:
-            bucket.append(c)
+def series_is_fresh(symbol_code: str, tf: str) -> bool:
+    return _is_cache_fresh(CANDLE_STORE.meta(symbol_code, tf), SERIES_TTL_SECONDS[tf])
 
-    if current_key is not None and bucket:
-        out.append(_bucket_to_candle(current_key, bucket))
 
-    # limit
-    out.sort(key=lambda x: x["t"])
-    if len(out) > MAX_CANDLES_RETURN:
-        out = out[-MAX_CANDLES_RETURN:]
-    return out
+def ingest_candles(symbol_code: str, tf: str, bars: Dict[str, np.ndarray]) -> Optional[Dict[str, Any]]:
+    """Dışarıda (toplu) çekilmiş barlar için giriş (bkz. technical_warmer)."""
+    with _get_lock(f"{symbol_code}_{tf}"):
+        return _ingest(symbol_code, tf, bars)
 
 
-def _aggregate_daily(candles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def _refresh_series(symbol_code: str, yf_symbol: str, tf: str) -> Optional[Dict[str, Any]]:
     """
-    15m -> 1d fallback aggregation (gün kırılımı Istanbul TZ’ye göre).
+    Yalnızca son bardan sonrası yfinance'ten çekilip depoya eklenir.
+    Seri başına lock: aynı anda tek fetch.
     """
-    if not candles:
-        return []
+    with _get_lock(f"{symbol_code}_{tf}"):
+        df = download_candles(yf_symbol, tf, CANDLE_STORE.last_ts(symbol_code, tf))
+        return _ingest(symbol_code, tf, bars_from_frame(df))
 
-    parsed: List[Tuple[datetime, Dict[str, Any]]] = []
-    for c in candles:
-        dt_obj = _parse_iso(c.get("t", ""))
-        if not dt_obj:
-            continue
-        parsed.append((dt_obj, c))
-    parsed.sort(key=lambda x: x[0])
-
-    out: List[Dict[str, Any]] = []
-
-    def day_key(dt_obj: datetime) -> datetime:
-        # Istanbul'a göre gün başlangıcı
-        local = dt_obj.astimezone(IST_TZ)
-        return local.replace(hour=0, minute=0, second=0, microsecond=0)
-
-    current_key: Optional[datetime] = None
-    bucket: List[Dict[str, Any]] = []
-
-    for dt_obj, c in parsed:
-        k = day_key(dt_obj)
-        if current_key is None:
-            current_key = k
-            bucket = [c]
-            continue
-
-        if k != current_key:
-            out.append(_bucket_to_candle(current_key, bucket))
-            current_key = k
-            bucket = [c]
-        else:
-            bucket.append(c)
 
-    if current_key is not None and bucket:
-        out.append(_bucket_to_candle(current_key, bucket))
+def _refresh_in_background(symbol_code: str, yf_symbol: str, tf: str) -> bool:
+    """Aynı seri için zaten yenileme varsa yenisini başlatmaz."""
+    key = f"{symbol_code}_{tf}"
+    with _REFRESHING_GUARD:
+        if key in _REFRESHING or (_now_ts() - _REFRESH_FAILED_AT.get(key, 0.0)) < REFRESH_RETRY_SEC:
+            return False
+        _REFRESHING.add(key)
 
-    out.sort(key=lambda x: x["t"])
-    if len(out) > MAX_CANDLES_RETURN:
-        out = out[-MAX_CANDLES_RETURN:]
-    return out
-
-
-def _bucket_to_candle(bucket_key: datetime, bucket: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _job() -> None:
+        try:
+            _refresh_series(symbol_code, yf_symbol, tf)
+            _REFRESH_FAILED_AT.pop(key, None)
+        except Exception as e:
+            _REFRESH_FAILED_AT[key] = _now_ts()
+            print(f"⚠️ Mum yenileme hatası ({key}): {e}")
+        finally:
+            with _REFRESHING_GUARD:
+                _REFRESHING.discard(key)
+
+    _REFRESH_POOL.submit(_job)
+    return True
+
+
+def _series_entry(
+    symbol_code: str,
+    yf_symbol: str,
+    tf: str,
+    cache_only: bool = False,
+) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
     """
-    OHLC merge standardı:
-    O=first, H=max, L=min, C=last, V=sum
+    Bellek -> depo -> yfinance. Dönüş: (kayıt, bilgi); kayıt None ise bilgi hata içerir.
+    - taze: bellekten (I/O yok)
+    - süresi dolmuş: eski kayıt hemen döner (stale), yenileme arka planda tek iş
+    - hiç veri yok: senkron çekim (seri lock'u ile tek fetch)
+    cache_only: yfinance'e hiç gidilmez (ne senkron ne arka planda).
     """
-    if not bucket:
-        return {"t": _iso_istanbul(bucket_key), "o": 0.0, "h": 0.0, "l": 0.0, "c": 0.0, "v": 0}
-
-    # bucket sırası zaten zaman sırası olmalı; garanti için t ile sort
-    bucket_sorted = sorted(bucket, key=lambda x: x.get("t", ""))
-    o = _safe_float(bucket_sorted[0].get("o"))
-    c = _safe_float(bucket_sorted[-1].get("c"))
+    entry = CANDLE_MEM.get((symbol_code, tf)) or _load_entry(symbol_code, tf)
+
+    if entry is None:
+        with _get_lock(f"{symbol_code}_{tf}"):
+            _import_legacy_json(symbol_code, tf)
+            entry = CANDLE_MEM.get((symbol_code, tf)) or _load_entry(symbol_code, tf)
+            if entry is None and cache_only:
+                return None, {"status": "error", "error": "not_cached"}
+            if entry is None:
+                try:
+                    entry = _refresh_series(symbol_code, yf_symbol, tf)
+                except Exception as e:
+                    return None, {"status": "error", "error": "yfinance_fetch_failed", "message": str(e)}
+            if entry is None:
+                return None, {"status": "error", "error": "yfinance_fetch_failed", "message": "empty"}
+
+    if not _is_cache_fresh(entry["meta"], SERIES_TTL_SECONDS[tf]):
+        if not cache_only:
+            _refresh_in_background(symbol_code, yf_symbol, tf)
+        return entry, {"stale": True}
+    return entry, {}
+
+
+def record_candle_response(fmt: str, delta: bool, nbytes: int, ms: float) -> None:
+    """/technical/candles yanıt ölçümü: düzen (+since) başına byte ve süre."""
+    key = f"{fmt}+since" if delta else fmt
+    with _RESPONSE_STATS_LOCK:
+        st = _RESPONSE_STATS.setdefault(key, {"count": 0, "bytes": 0, "ms": 0.0, "max_bytes": 0})
+        st["count"] += 1
+        st["bytes"] += int(nbytes)
+        st["ms"] += float(ms)
+        st["max_bytes"] = max(st["max_bytes"], int(nbytes))
+
+
+def candle_cache_stats() -> Dict[str, Any]:
+    with _REFRESHING_GUARD:
+        refreshing = len(_REFRESHING)
+    with _RESPONSE_STATS_LOCK:
+        responses = {
+            k: {
+                "count": v["count"],
+                "avg_bytes": round(v["bytes"] / v["count"]) if v["count"] else None,
+                "max_bytes": v["max_bytes"],
+                "avg_ms": round(v["ms"] / v["count"], 3) if v["count"] else None,
+            }
+            for k, v in _RESPONSE_STATS.items()
+        }
+    return {**CANDLE_MEM.stats(), "refreshing": refreshing, "responses": responses}
+
+
+def _build_pyramid(symbol_code: str, source_tf: str, first_ts: Optional[int]) -> None:
+    """
+    source_tf serisinden türeyen çözünürlükleri günceller. first_ts: bu
+    ingest'te yazılan ilk bar; yalnızca onun kovasından itibaren yeniden
+    hesaplanır (türetilmiş seri boşsa tamamı).
+    """
+    src_meta = CANDLE_STORE.meta(symbol_code, source_tf)
+    for tf, (src, rule) in CANDLE_PYRAMID.items():
+        if src != source_tf:
+            continue
+        since: Optional[int] = None
+        if CANDLE_STORE.count(symbol_code, tf) > 0:
+            if first_ts is None:
+                continue
+            since = int(bucket_keys(np.array([first_ts]), rule, IST_TZ)[0])
 
-    highs = [_safe_float(x.get("h")) for x in bucket_sorted]
-    lows = [_safe_float(x.get("l")) for x in bucket_sorted]
-    vols = [_safe_int(x.get("v")) for x in bucket_sorted]
+        derived = resample(CANDLE_STORE.tail(symbol_code, src, since=since), rule, IST_TZ)
+        if len(derived["t"]) == 0:
+            continue
+        CANDLE_STORE.merge(symbol_code, tf, derived)
+        CANDLE_STORE.set_meta(
+            symbol_code, tf,
+            fetched_at=src_meta.get("fetched_at", 0),
+            last_update=src_meta.get("last_update"),
+            source="derived",
+        )
+        # türetilmişten türeyenler (örn. ileride 1w -> 1M)
+        _build_pyramid(symbol_code, tf, int(derived["t"][0]))
 
-    h = max(highs) if highs else 0.0
-    l = min(lows) if lows else 0.0
-    v = sum(vols) if vols else 0
 
-    return {
-        "t": _iso_istanbul(bucket_key),
-        "o": o,
-        "h": h,
-        "l": l,
-        "c": c,
-        "v": v
-    }
+def _parse_iso(t: str) -> Optional[datetime]:
+    try:
+        # isoformat içinde timezone offset var (+03:00)
+        return datetime.fromisoformat(t)
+    except Exception:
+        return None
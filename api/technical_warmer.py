@@ -0,0 +1,210 @@
+# api/technical_warmer.py
+"""
+Teknik mum önbelleği ısıtıcısı.
+
+technical_symbols.json'daki tüm whitelist (XU100 + hisseler) için mumlar
+çok sembollü yf.download(tickers=[...], group_by="ticker") istekleriyle
+toplu çekilip mum deposuna yazılır (ingest: depo + türetilmiş seriler +
+bellek katmanı). Böylece kullanıcı istekleri soğuk önbellekte yfinance'i
+beklemez.
+
+Zamanlama (market_calendar; hafta sonu ve tatiller atlanır):
+  - açılışta bir kez (seans dışında da; önbellek boş kalmasın)
+  - seans içinde her 15 dakikalık bar kapanışından WARM_DELAY_SEC sonra
+  - seans kapanınca son bir tur (kapanış barları), sonra ertesi seansa kadar uyku
+15m seans içinde her turda; 1d ve seans dışı turlar yalnızca bayat seriler
+(son çekimden bu yana veri değişmiş olabiliyorsa).
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .candle_store import bars_from_frame
+from .market_calendar import is_session_open, seconds_until_open
+from .technical_services import (
+    CANDLE_STORE,
+    IST_TZ,
+    download_candles,
+    ingest_candles,
+    load_symbols,
+    series_is_fresh,
+)
+
+WARM_ENABLED = os.getenv("TECH_WARMER_ENABLED", "1") == "1"
+WARM_CHUNK = int(os.getenv("TECH_WARM_CHUNK", "50"))
+WARM_INTERVAL_SEC = 15 * 60
+WARM_DELAY_SEC = int(os.getenv("TECH_WARM_DELAY_SEC", "20"))  # bar kapanışından sonra Yahoo'nun yazması için
+WARM_SESSION_PAD_MIN = 5
+
+WARM_STATE: Dict[str, Any] = {
+    "running": False,
+    "thread_running": False,
+    "last_start": None,
+    "last_report": None,
+    "last_error": None,
+}
+_WARM_LOCK = threading.Lock()
+
+
+# ============================================================
+# TOPLU ÇEKİM
+# ============================================================
+def _whitelist() -> List[Tuple[str, str]]:
+    data = load_symbols()
+    out: List[Tuple[str, str]] = []
+    xu = data.get("xu100")
+    if xu and xu.get("code") and xu.get("yf"):
+        out.append((xu["code"], xu["yf"]))
+    out.extend((s["code"], s["yf"]) for s in data.get("stocks", []))
+    return out
+
+
+def _frame_for(df: Any, yf_symbol: str, single: bool) -> Optional[pd.DataFrame]:
+    if df is None or len(df) == 0:
+        return None
+    if isinstance(df.columns, pd.MultiIndex):
+        if yf_symbol not in set(df.columns.get_level_values(0)):
+            return None
+        return df[yf_symbol]
+    return df if single else None
+
+
+def _warm_series(symbols: List[Tuple[str, str]], tf: str, only_stale: bool) -> Dict[str, Any]:
+    """
+    Depoda verisi olanlar son bardan itibaren (grup için en eski son bar),
+    olmayanlar tam period ile; WARM_CHUNK'lık gruplar halinde.
+    """
+    incremental: List[Tuple[str, str, int]] = []
+    cold: List[Tuple[str, str]] = []
+    skipped = 0
+    for code, ysym in symbols:
+        if only_stale and series_is_fresh(code, tf):
+            skipped += 1
+            continue
+        last = CANDLE_STORE.last_ts(code, tf)
+        if last is None:
+            cold.append((code, ysym))
+        else:
+            incremental.append((code, ysym, last))
+
+    # yakın son barlar aynı grupta olsun (start en eskiye göre seçilir)
+    incremental.sort(key=lambda x: x[2])
+    groups: List[Tuple[List[Tuple[str, str]], Optional[int]]] = []
+    for i in range(0, len(incremental), WARM_CHUNK):
+        chunk = incremental[i:i + WARM_CHUNK]
+        groups.append(([(c, y) for c, y, _ in chunk], chunk[0][2]))
+    for i in range(0, len(cold), WARM_CHUNK):
+        groups.append((cold[i:i + WARM_CHUNK], None))
+
+    ok, missing, errors, requests, new_bars = 0, 0, 0, 0, 0
+    for chunk, since in groups:
+        tickers = [y for _, y in chunk]
+        try:
+            requests += 1
+            df = download_candles(tickers, tf, since, group_by="ticker", threads=True)
+        except Exception as e:
+            errors += len(chunk)
+            WARM_STATE["last_error"] = f"{tf}: {repr(e)[:200]}"
+            continue
+        for code, ysym in chunk:
+            frame = _frame_for(df, ysym, single=len(chunk) == 1)
+            if frame is None:
+                missing += 1
+                continue
+            try:
+                bars = bars_from_frame(frame)
+                before = CANDLE_STORE.count(code, tf)
+                ingest_candles(code, tf, bars)
+                new_bars += max(0, CANDLE_STORE.count(code, tf) - before)
+                ok += 1
+            except Exception as e:
+                errors += 1
+                WARM_STATE["last_error"] = f"{code} {tf}: {repr(e)[:200]}"
+
+    return {
+        "ok": ok,
+        "missing": missing,
+        "errors": errors,
+        "skipped_fresh": skipped,
+        "requests": requests,
+        "new_bars": new_bars,
+    }
+
+
+def warm_candles(tfs: Tuple[str, ...] = ("15m", "1d")) -> Dict[str, Any]:
+    """Tek tur; aynı anda ikinci tur başlamaz."""
+    with _WARM_LOCK:
+        if WARM_STATE["running"]:
+            return {"status": "busy"}
+        WARM_STATE["running"] = True
+        WARM_STATE["last_start"] = datetime.now(IST_TZ).replace(microsecond=0).isoformat()
+
+    t0 = time.perf_counter()
+    try:
+        symbols = _whitelist()
+        report: Dict[str, Any] = {"symbols": len(symbols)}
+        in_session = is_session_open(pad_minutes=WARM_SESSION_PAD_MIN)
+        for tf in tfs:
+            # 15m seans içinde her turda; 1d TTL'i (6 saat) dolmadıkça, seans dışında
+            # ise son çekimden sonra seans penceresi geçmedikçe çekilmez
+            report[tf] = _warm_series(symbols, tf, only_stale=(tf != "15m" or not in_session))
+        report["elapsed_ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+        WARM_STATE["last_report"] = report
+        print(f"🔥 Mum ısıtma: {report}")
+        return {"status": "success", **report}
+    finally:
+        WARM_STATE["running"] = False
+
+
+# ============================================================
+# ZAMANLAYICI
+# ============================================================
+def _seconds_until_next_bar(now: Optional[float] = None) -> float:
+    now = time.time() if now is None else now
+    nxt = (int(now) // WARM_INTERVAL_SEC + 1) * WARM_INTERVAL_SEC + WARM_DELAY_SEC
+    return max(1.0, nxt - now)
+
+
+def _warmer_loop() -> None:
+    try:
+        # Soğuk başlangıç: seans dışında da bir kez doldur
+        time.sleep(5)
+        warm_candles()
+
+        while True:
+            # seans içi: bir sonraki 15m bar kapanışı; seans kapanışından sonraki
+            # tur kapanış barlarını alır, ardından ertesi açılışa kadar uyunur
+            if is_session_open(pad_minutes=WARM_SESSION_PAD_MIN):
+                time.sleep(_seconds_until_next_bar())
+            else:
+                time.sleep(seconds_until_open(pad_minutes=WARM_SESSION_PAD_MIN))
+            warm_candles()
+    except Exception as e:
+        WARM_STATE["last_error"] = repr(e)[:200]
+    finally:
+        # Beklenmedik hata: bir sonraki get_candle_entry / cache-stats isteği
+        # (technical_services._ensure_candle_warmer) thread'i yeniden başlatır
+        WARM_STATE["thread_running"] = False
+
+
+def start_candle_warmer() -> bool:
+    """Uygulama açılışında (main.py startup) ve _ensure_candle_warmer'dan çağrılır."""
+    if not WARM_ENABLED or WARM_STATE["thread_running"]:
+        return False
+    with _WARM_LOCK:
+        if WARM_STATE["thread_running"]:
+            return False
+        WARM_STATE["thread_running"] = True
+    th = threading.Thread(target=_warmer_loop, daemon=True, name="candle-warmer")
+    th.start()
+    return True
+
+
+def get_warmer_state() -> Dict[str, Any]:
+    return dict(WARM_STATE)
@@ -22,6 +22,22 @@ import urllib3
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Script tek başına (paket dışı) çalıştırılırsa dosyaya yazmaya devam eder
+try:
+    from api.storage import get_storage
+except Exception:
+    get_storage = None
+
+try:
+    from api.market_calendar import prev_trading_day
+except Exception:
+    prev_trading_day = None
+
+try:
+    from api.fund_nav_history import nav_history_key
+except Exception:
+    from fund_nav_history import nav_history_key
+
 # ============================================================
 # GLOBAL KİLİT – AYNI ANDA SADECE 1 SCRAPE
 # ============================================================
@@ -38,6 +54,11 @@ DATA_DIR = os.path.join(BASE_DIR, "data")
 FUNDS_MASTER_PATH = os.path.join(DATA_DIR, "funds_master.json")
 LIVE_PRICES_PATH = os.path.join(CACHE_DIR, "live_prices.json")
 
+# NAV geçmişi (sparkline): her çalıştırmada çekilen ~35 gün mevcut geçmişle
+# birleştirilir; fon başına son NAV_HISTORY_MAX_DAYS işlem günü tutulur.
+# Parça anahtarları / format: fund_nav_history.py
+NAV_HISTORY_MAX_DAYS = 260
+
 os.makedirs(CACHE_DIR, exist_ok=True)
 os.makedirs(DATA_DIR, exist_ok=True)
 
@@ -126,11 +147,16 @@ def _parse_tefas_date(v: Any) -> Optional[datetime]:
 def _get_previous_business_day(dt: datetime = None) -> datetime:
     """
     Bir önceki iş gününü bul
-    Türkiye'de hafta sonu: Cumartesi (5), Pazar (6)
+    Türkiye'de hafta sonu: Cumartesi (5), Pazar (6); takvim varsa resmi tatiller de
     """
     if dt is None:
         dt = datetime.now()
-    
+
+    if prev_trading_day is not None:
+        # Hafta sonu + resmi tatiller (api/market_calendar.py)
+        d = prev_trading_day(dt.date())
+        return dt.replace(year=d.year, month=d.month, day=d.day)
+
     one_day = timedelta(days=1)
     current = dt - one_day
     
@@ -231,6 +257,68 @@ def _get_prices_from_rows(rows: List[dict]) -> Optional[Tuple[str, float, str, f
     log(f"Veri bulundu: {day_t1} -> {day_t}", "SUCCESS")
     return (day_t, nav_t, day_t1, nav_t1)
 
+def _nav_series_from_rows(rows: List[dict]) -> Dict[int, float]:
+    """rows -> {YYYYMMDD: nav} (geçerli fiyatlar)"""
+    out: Dict[int, float] = {}
+    for row in rows:
+        dt = _parse_tefas_date(row.get("TARIH"))
+        nav = _parse_float(row.get("FIYAT"))
+        if dt and nav > 0:
+            out[int(dt.strftime("%Y%m%d"))] = round(nav, 6)
+    return out
+
+def _load_nav_history(key: str) -> Dict[str, Any]:
+    try:
+        if get_storage is not None:
+            return get_storage().get_doc(key) or {}
+        path = os.path.join(CACHE_DIR, f"{key}.json")
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f) or {}
+    except Exception as e:
+        log(f"NAV geçmişi okunamadı ({key}): {e}", "WARNING")
+    return {}
+
+def _save_nav_history(fresh: Dict[str, Dict[int, float]]) -> int:
+    """
+    Yeni çekilen serileri mevcut geçmişle birleştirip yazar; fon sayısını döner.
+    Yalnızca içeriği değişen parçalar yazılır.
+    """
+    if not fresh:
+        return 0
+    groups: Dict[str, Dict[str, Dict[int, float]]] = {}
+    for code, series in fresh.items():
+        groups.setdefault(nav_history_key(code), {})[code] = series
+
+    asof = now_str()
+    for key, part in groups.items():
+        doc = _load_nav_history(key)
+        data = doc.get("data") if isinstance(doc.get("data"), dict) else {}
+        changed = False
+
+        for code, series in part.items():
+            old = data.get(code) or {}
+            merged = dict(zip(old.get("d") or [], old.get("v") or []))
+            merged.update(series)
+            days = sorted(merged)[-NAV_HISTORY_MAX_DAYS:]
+            rec = {"d": days, "v": [merged[d] for d in days]}
+            if rec != old:
+                data[code] = rec
+                changed = True
+
+        if not changed:
+            continue
+        out = {"asof": asof, "data": data}
+        if get_storage is not None:
+            get_storage().put_doc(key, out)
+        else:
+            path = os.path.join(CACHE_DIR, f"{key}.json")
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(out, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, path)
+    return len(fresh)
+
 # ============================================================
 # TEK FON – FON GEÇMİŞİ ÇEK
 # ============================================================
@@ -303,6 +391,7 @@ def fetch_fund_history(session: requests.Session, fund_code: str,
             daily = ((nav_t - nav_t1) / nav_t1) * 100.0
             
             return {
+                "_history": _nav_series_from_rows(rows),  # run_batch_scrape ayırır, kayda girmez
                 "nav": round(nav_t, 6),
                 "daily_return_pct": round(daily, 4),
                 "last_update": f"{day_t} 18:30:00",
@@ -377,6 +466,7 @@ def run_batch_scrape(codes: Optional[List[str]] = None,
         success_count = 0
         failed_codes = []
         results: Dict[str, Any] = {}
+        histories: Dict[str, Dict[int, float]] = {}
         
         log(f"Başlangıç: {total} fon çekilecek", "INFO")
         log(f"Tarih aralığı: Son iş günü baz alınacak (T+1 sistemi)", "INFO")
@@ -412,6 +502,7 @@ def run_batch_scrape(codes: Optional[List[str]] = None,
                 try:
                     data = fetch_fund_history(session, code)
                     if data:
+                        histories[code] = data.pop("_history", None) or {}
                         results[code] = data
                         success_count += 1
                         status = "✓"
@@ -450,11 +541,21 @@ def run_batch_scrape(codes: Optional[List[str]] = None,
             "data": results
         }
         
-        # Atomik yazım
-        tmp_path = LIVE_PRICES_PATH + ".tmp"
-        with open(tmp_path, "w", encoding="utf-8") as f:
-            json.dump(output_data, f, ensure_ascii=False, indent=2)
-        os.replace(tmp_path, LIVE_PRICES_PATH)
+        # Storage katmanı (Mongo / SQLite / dosya); yoksa atomik dosya yazımı
+        if get_storage is not None:
+            get_storage().put_doc("fund_prices", output_data)
+        else:
+            tmp_path = LIVE_PRICES_PATH + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(output_data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, LIVE_PRICES_PATH)
+
+        # NAV geçmişi (sparkline kaynağı); hata fiyat çıktısını bozmasın
+        try:
+            n_hist = _save_nav_history(histories)
+            log(f"NAV geçmişi güncellendi: {n_hist} fon", "INFO")
+        except Exception as e:
+            log(f"NAV geçmişi yazılamadı: {e}", "WARNING")
         
         elapsed_total = time.time() - start_time
         log(f"\n{'='*50}", "INFO")
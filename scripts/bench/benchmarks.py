@@ -0,0 +1,601 @@
+# scripts/bench/benchmarks.py
+"""
+Yerel performans ölçümleri (deploy edilen api paketinin dışında, elle çalıştırılır).
+
+Kullanım (repo kökünden):
+    python scripts/bench/benchmarks.py scanner
+    python scripts/bench/benchmarks.py snapshots
+    python scripts/bench/benchmarks.py storage
+    python scripts/bench/benchmarks.py radar
+    python scripts/bench/benchmarks.py quotes -n 200
+    python scripts/bench/benchmarks.py breaker -n 20
+    python scripts/bench/benchmarks.py scan -n 200
+    python scripts/bench/benchmarks.py scorer -n 500
+    python scripts/bench/benchmarks.py parse -n 200
+    python scripts/bench/benchmarks.py candles -n 600
+
+Eşdeğerlik iddiaları (toplu skor, tablo ayrıştırma, artımlı göstergeler)
+tests/ altında test edilir: python -m pytest -q tests
+
+Mongo gerektiren ölçümler için yerel stand-in olarak `mongomock`
+kullanılır (pip install mongomock). Gerçek cluster'a dokunulmaz.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+# repo kökü: api / temel_analiz paketleri buradan import edilir
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+
+# ============================================================
+# HELPERS
+# ============================================================
+
+def _timeit(fn: Callable[[], Any], repeat: int = 20) -> float:
+    """En iyi koşunun süresi (ms)."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+
+def _mongomock_db():
+    try:
+        import mongomock
+    except ImportError:
+        raise SystemExit("❌ mongomock kurulu değil: pip install mongomock")
+    return mongomock.MongoClient()["borsa_db"]
+
+
+def _synthetic_scanner(n: int, seed: int = 42) -> List[Dict[str, Any]]:
+    rnd = random.Random(seed)
+    sectors = ["BANK", "INDUSTRY", "ENERGY", "RETAIL", "HOLDING", "TECH"]
+    dates = ["2025-03-31", "2025-06-30", "2025-09-30"]
+    out = []
+    for i in range(n):
+        ds = rnd.choice(dates)
+        price = round(rnd.uniform(5, 500), 2)
+        target = round(price * rnd.uniform(0.6, 3.0), 2)
+        out.append({
+            "symbol": f"S{i:04d}",
+            "sector": rnd.choice(sectors),
+            "status": "success",
+            "last_check_time": "2025-12-11",
+            "date_str": ds,
+            "date_sortable": int(ds.replace("-", "")),
+            "score": round(rnd.uniform(20, 95), 2),
+            "target": target,
+            "price": price,
+            "band": [target * 0.85, target * 1.15],
+        })
+    return out
+
+
+# ============================================================
+# SCANNER / RADAR SORGULARI
+# ============================================================
+
+def _mongomock_storage():
+    from api.storage import MongoBackend, set_storage
+
+    # mirror=None: benchmark repo'daki JSON yedeklerine dokunmasın
+    backend = MongoBackend(db=_mongomock_db(), mirror=None)
+    set_storage(backend)
+    return backend
+
+
+def bench_scanner(n: int = 500) -> None:
+    from api import services
+
+    backend = _mongomock_storage()
+    rows = _synthetic_scanner(n)
+    backend.col_scanner.insert_many([dict(x) for x in rows])
+    backend.col_radar.insert_many(services._build_radar_from_local_only())
+    backend.ensure_indexes()
+
+    def old_scanner():
+        data = list(backend.col_scanner.find({}, {"_id": 0}))
+        out = [x for x in data if x.get("status") == "success" and float(x.get("score") or 0) >= 50]
+        out.sort(key=lambda x: (x.get("date_sortable", 0), x.get("score", 0)), reverse=True)
+        return out[:50]
+
+    def old_radar():
+        data = list(backend.col_radar.find({}, {"_id": 0}))
+        data.sort(key=lambda x: x["potential"], reverse=True)
+        return data[:50]
+
+    print(f"📊 scanner/radar sorguları (n={n}, mongomock)")
+    print(f"  scanner eski (tümü + python filtre) : {_timeit(old_scanner):8.2f} ms")
+    print(f"  scanner yeni (limit=50)             : {_timeit(lambda: services.query_scanner(limit=50)):8.2f} ms")
+    print(f"  scanner yeni (sector=BANK, limit=50): {_timeit(lambda: services.query_scanner(sector='BANK', limit=50)):8.2f} ms")
+    print(f"  radar eski (tümü + python sort)     : {_timeit(old_radar):8.2f} ms")
+    print(f"  radar yeni (limit=50)               : {_timeit(lambda: services.query_radar(limit=50)):8.2f} ms")
+
+
+# ============================================================
+# SNAPSHOT DEPOLAMA: belge başına sembol vs paketli tek belge
+# ============================================================
+
+def _synthetic_live(n: int) -> List[Dict[str, Any]]:
+    rnd = random.Random(7)
+    return [
+        {"symbol": f"S{i:04d}", "price": round(rnd.uniform(5, 500), 2),
+         "prev": round(rnd.uniform(5, 500), 2), "chgPct": round(rnd.uniform(-5, 5), 2)}
+        for i in range(n)
+    ]
+
+
+def _synthetic_radar(n: int) -> List[Dict[str, Any]]:
+    return [
+        dict(x, potential=round((x["target"] - x["price"]) / x["price"] * 100, 2))
+        for x in _synthetic_scanner(n)
+    ]
+
+
+def bench_snapshots(n: int = 500) -> None:
+    from api import storage
+
+    backend = _mongomock_storage()
+    backend.ensure_indexes()
+    live = _synthetic_live(n)
+    radar = _synthetic_radar(n)
+
+    print(f"📊 snapshot depolama (n={n}, mongomock)")
+    for name, rows in (("live_prices", live), ("radar_cache", radar)):
+        storage.SNAPSHOT_STORAGE = "docs"
+        save_docs = _timeit(lambda: backend.save_rows(name, rows), repeat=5)
+        load_docs = _timeit(lambda: backend.load_rows(name), repeat=10)
+        storage.SNAPSHOT_STORAGE = "packed"
+        save_packed = _timeit(lambda: backend.save_rows(name, rows), repeat=5)
+        load_packed = _timeit(lambda: backend.load_rows(name), repeat=10)
+        doc = backend._latest_snapshot_doc(name)
+        size = len(doc["payload"]) if doc else 0
+        print(f"  {name:12s} docs   save {save_docs:8.2f} ms | load {load_docs:8.2f} ms")
+        print(f"  {name:12s} packed save {save_packed:8.2f} ms | load {load_packed:8.2f} ms | payload {size / 1024:.1f} KiB")
+    storage.SNAPSHOT_STORAGE = "docs"
+
+
+# ============================================================
+# STORAGE BACKEND'LERİ: mongo (mongomock) vs sqlite
+# ============================================================
+
+def bench_storage(n: int = 500) -> None:
+    import tempfile
+    from pathlib import Path
+
+    from api.storage import SQLiteBackend
+
+    rows = _synthetic_scanner(n)
+    radar = _synthetic_radar(n)
+    live = _synthetic_live(n)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = [_mongomock_storage(), SQLiteBackend(Path(tmp) / "bench.db")]
+        print(f"📊 storage backend'leri (n={n}; mongo=mongomock, sqlite=WAL)")
+        for b in backends:
+            t_save = _timeit(lambda: b.save_scanner(rows), repeat=3)
+            b.save_rows("radar_cache", radar)
+            b.save_rows("live_prices", live)
+            t_q = _timeit(lambda: b.query_scanner(50.0, None, 50, None))
+            t_qs = _timeit(lambda: b.query_scanner(50.0, "BANK", 50, None))
+            t_r = _timeit(lambda: b.query_radar(50.0, None, 50, None))
+            t_live = _timeit(lambda: b.load_rows("live_prices"), repeat=10)
+            t_doc = _timeit(lambda: b.put_doc("daily_scan_state", {"last_run_day": "2025-12-11"}))
+            print(f"  {b.name:6s} scanner save {t_save:8.2f} ms | scanner q {t_q:6.2f} ms | "
+                  f"sector q {t_qs:6.2f} ms | radar q {t_r:6.2f} ms | live load {t_live:6.2f} ms | "
+                  f"state put {t_doc:6.2f} ms")
+
+
+# ============================================================
+# RADAR YENİDEN KURMA: sembol başına snapshot okuma vs tek geçiş
+# ============================================================
+
+def bench_radar(n: int = 500) -> None:
+    from api import services
+
+    backend = _mongomock_storage()
+    rows = _synthetic_scanner(n)
+    backend.col_scanner.insert_many([dict(x) for x in rows])
+    # tüm semboller snapshot'ta: ağa çıkılmaz
+    backend.col_live.insert_many([dict(x) for x in _synthetic_live(n)])
+    # save_radar_cache mongomock'a yazar (mirror yok)
+
+    def old_refresh():
+        out = []
+        for x in services._radar_candidates():
+            cached_map = {str(it.get("symbol") or "").upper(): it for it in services.load_live_price_json()}
+            cl = cached_map.get(x["symbol"].upper())
+            price_f = float(cl["price"])
+            out.append((float(x["target"]) - price_f) / price_f * 100)
+        return out
+
+    def new_refresh():
+        services.RADAR_STATE["refresh_running"] = True
+        services._radar_refresh_thread()
+
+    t_old = _timeit(old_refresh, repeat=2)
+    t_new = _timeit(new_refresh, repeat=5)
+    sleep_ms = len(services._radar_candidates()) * 120.0
+    print(f"📊 radar yeniden kurma (n={n}, mongomock, tüm fiyatlar snapshot'ta)")
+    print(f"  eski (sembol başına snapshot okuma): {t_old:10.2f} ms (+ ~{sleep_ms / 1000:.0f} s sembol başı uyku)")
+    print(f"  yeni (tek geçiş + numpy)           : {t_new:10.2f} ms")
+
+
+# ============================================================
+# CANLI FİYAT: sıralı vs paralel quote fetcher (stand-in kaynaklar)
+# ============================================================
+
+def bench_quotes(n: int = 200) -> None:
+    from api.quote_fetcher import QuoteFetcher, QuoteSource
+
+    def down(sym):
+        time.sleep(0.05)                       # timeout taklidi (gerçekte 3 s)
+        raise ConnectionError("doviz down")
+
+    def slow_ok(sym):
+        time.sleep(0.02)
+        return {"symbol": sym, "price": 1.0, "prev": 1.0, "chgPct": 0.0}
+
+    symbols = [f"S{i:04d}" for i in range(n)]
+
+    def sequential():
+        out = []
+        for s in symbols:
+            for fn in (down, slow_ok):
+                try:
+                    q = fn(s)
+                except Exception:
+                    continue
+                if q:
+                    out.append(q)
+                    break
+        return out
+
+    t0 = time.perf_counter()
+    sequential()
+    t_seq = (time.perf_counter() - t0) * 1000.0
+
+    fetcher = QuoteFetcher([QuoteSource("doviz", down, 6, None, 5), QuoteSource("yahoo", slow_ok, 8, None, 5)], workers=16)
+    out, report = fetcher.run(symbols)
+    print(f"📊 canlı fiyat (n={n}; doviz kapalı, yahoo 20 ms stand-in)")
+    print(f"  sıralı (eski, uykusuz)  : {t_seq:9.1f} ms")
+    print(f"  paralel + breaker (yeni): {report['elapsed_ms']:9.1f} ms | bulunan {len(out)}")
+    for name, r in report["sources"].items():
+        print(f"    {name:6s} {r}")
+
+
+# ============================================================
+# MONGO ERİŞİLEMEZKEN: breaker ile fail-fast
+# ============================================================
+
+class _UnreachableDB:
+    """Her çağrıda server selection timeout'u taklit eden yerel stand-in."""
+
+    def __init__(self, delay_sec: float):
+        self.delay_sec = delay_sec
+
+    def __getitem__(self, name: str) -> "_UnreachableDB":
+        return self
+
+    def __getattr__(self, name: str):
+        def _op(*args, **kwargs):
+            time.sleep(self.delay_sec)
+            raise ConnectionError("server selection timeout (stand-in)")
+        return _op
+
+
+def bench_breaker(n: int = 20) -> None:
+    from api.circuit_breaker import CircuitBreaker
+    from api.storage import FileBackend, MongoBackend
+
+    delay = 0.2
+    # okumalar repo'daki JSON yedeğinden gelir (yazma yok)
+    no_breaker = MongoBackend(db=_UnreachableDB(delay), mirror=FileBackend(),
+                              breaker=CircuitBreaker("none", failure_threshold=10 ** 9))
+    with_breaker = MongoBackend(db=_UnreachableDB(delay), mirror=FileBackend(),
+                                breaker=CircuitBreaker("mongo-bench", failure_threshold=2, cooldown_sec=60))
+
+    print(f"📊 Mongo erişilemez ({delay * 1000:.0f} ms timeout stand-in), {n} okuma")
+    for label, b in (("breaker yok", no_breaker), ("breaker var", with_breaker)):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            b.load_scanner()
+        total = (time.perf_counter() - t0) * 1000.0
+        print(f"  {label}: toplam {total:8.1f} ms | okuma başı {total / n:7.2f} ms | {b.health()['state']}")
+
+
+# ============================================================
+# TEMEL TARAMA: sıralı vs AIMD paralel
+# ============================================================
+
+def bench_scan(n: int = 200) -> None:
+    from api.scan_engine import AIMDLimiter, ScanEngine
+
+    capacity = 6                                # "Yahoo" bu kadar eşzamanlı isteği kaldırıyor
+    in_flight = [0]
+    lock = threading.Lock()
+
+    def download(sym):
+        with lock:
+            in_flight[0] += 1
+            over = in_flight[0] > capacity
+        try:
+            time.sleep(0.03)                    # ağ gecikmesi stand-in
+            if over:
+                raise RuntimeError("429 Too Many Requests")
+            return {"symbol": sym}
+        finally:
+            with lock:
+                in_flight[0] -= 1
+
+    def parse(raw):
+        return {"symbol": raw["symbol"], "score_total_0_100": 50}
+
+    symbols = [f"S{i:04d}.IS" for i in range(n)]
+
+    t0 = time.perf_counter()
+    for s in symbols:
+        parse(download(s))
+    t_seq = (time.perf_counter() - t0) * 1000.0
+
+    import api.scan_engine as se
+    backoff, se.SCAN_THROTTLE_BACKOFF_SEC = se.SCAN_THROTTLE_BACKOFF_SEC, 0.05
+    try:
+        engine = ScanEngine(limiter=AIMDLimiter(initial=2, maximum=16), process_workers=0,
+                            download=download, parse=parse)
+        t0 = time.perf_counter()
+        report = engine.run(symbols, lambda *a: None)
+        t_par = (time.perf_counter() - t0) * 1000.0
+    finally:
+        se.SCAN_THROTTLE_BACKOFF_SEC = backoff
+
+    print(f"📊 temel tarama (n={n}; 30 ms indirme, kapasite {capacity})")
+    print(f"  sıralı (eski, uykusuz): {t_seq:9.1f} ms")
+    print(f"  AIMD paralel (yeni)   : {t_par:9.1f} ms | ok {report['ok']} hata {report['errors']} | {report['concurrency']}")
+
+
+# ============================================================
+# SKOR KARTI: skaler build_payload vs toplu (NumPy)
+# ============================================================
+
+_SECTORS = ["BANK", "INSURANCE", "FINANCE", "REIT", "HOLDING", "DEFENSE", "TECH", "AVIATION",
+            "ENERGY", "TELECOM", "RETAIL", "FOOD", "INDUSTRY", "STEEL", "LOGISTICS", "CONSTRUCTION"]
+
+
+def _synthetic_companies(n: int, seed: int = 7) -> List[Any]:
+    from temel_analiz.veri.modeller import CompanyData, FinancialPeriod
+
+    rnd = random.Random(seed)
+
+    def maybe(v, p_none=0.15):
+        return None if rnd.random() < p_none else v
+
+    out = []
+    for i in range(n):
+        periods = []
+        for q in range(rnd.randint(0 if i % 50 == 0 else 1, 8)):
+            periods.append(FinancialPeriod(
+                period=f"{2025 - q // 4}-{12 - 3 * (q % 4):02d}-30",
+                revenue=rnd.uniform(-5e7, 2e9),
+                net_income=rnd.uniform(-3e8, 4e8),
+                ebitda=rnd.uniform(-3e8, 6e8),
+                equity=rnd.choice([0.0, rnd.uniform(-2e8, 5e9)]),
+                assets=rnd.uniform(1e8, 1e10),
+                liabilities=rnd.uniform(1e7, 5e9),
+                cfo=rnd.uniform(-1e8, 5e8),
+                capex=rnd.uniform(0, 2e8),
+                shares_out=rnd.choice([1.0, rnd.uniform(1e6, 3e9)]),
+                total_debt=rnd.uniform(0, 3e9),
+                cash_and_equivalents=rnd.uniform(0, 1e9),
+            ))
+        info = {
+            "profitMargins": maybe(rnd.uniform(-0.3, 0.4)),
+            "returnOnEquity": maybe(rnd.choice([rnd.uniform(-0.5, 0.9), float("nan")])),
+            "returnOnAssets": maybe(rnd.uniform(-0.1, 0.2)),
+            "debtToEquity": maybe(rnd.uniform(0, 400)),
+            "currentRatio": maybe(rnd.uniform(0.2, 4)),
+            "freeCashflow": maybe(rnd.uniform(-5e8, 8e8)),
+            "totalRevenue": maybe(rnd.uniform(0, 8e9)),
+            "marketCap": maybe(rnd.uniform(1e8, 1e11)),
+            "enterpriseToEbitda": maybe(rnd.uniform(-5, 40)),
+            "ebitda": maybe(rnd.uniform(-1e8, 2e9)),
+        }
+        out.append(CompanyData(
+            symbol=f"S{i:04d}.IS",
+            raw_sector="synthetic",
+            sector_normalized=rnd.choice(_SECTORS),
+            periods=periods,
+            last_price=maybe(rnd.uniform(0.5, 500.0), 0.05),
+            metrics_ttm=info,
+        ))
+    return out
+
+
+def _same(a: Any, b: Any) -> bool:
+    """NaN'ı eşit sayan birebir karşılaştırma."""
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) and isinstance(b, float) and a != a and b != b:
+        return True
+    return a == b and type(a) is type(b)
+
+
+def bench_scorer(n: int = 500) -> None:
+    from temel_analiz.hesaplayicilar.puan_karti import build_payload
+    from temel_analiz.hesaplayicilar.toplu_skor import build_payloads
+
+    companies = _synthetic_companies(n)
+    scalar = [build_payload(c) for c in companies]
+    batch = build_payloads(companies)
+    lean = build_payloads(companies, with_metrics=False)
+    no_metrics = [{k: v for k, v in p.items() if k != "metrics"} for p in scalar]
+    mismatch = [c.symbol for c, a, b in zip(companies, scalar, batch) if not _same(a, b)]
+    mismatch += [c.symbol for c, a, b in zip(companies, no_metrics, lean) if not _same(a, b)]
+
+    t_scalar = _timeit(lambda: [build_payload(c) for c in companies], repeat=5)
+    t_batch = _timeit(lambda: build_payloads(companies), repeat=5)
+    t_lean = _timeit(lambda: build_payloads(companies, with_metrics=False), repeat=5)
+    print(f"📊 skor kartı (n={n} sentetik şirket)")
+    print(f"  skaler build_payload          : {t_scalar:8.2f} ms")
+    print(f"  toplu build_payloads          : {t_batch:8.2f} ms | x{t_scalar / max(t_batch, 1e-9):.1f}")
+    print(f"  toplu, metrics'siz (scanner)  : {t_lean:8.2f} ms | x{t_scalar / max(t_lean, 1e-9):.1f}")
+    print(f"  birebir eşleşme               : {2 * n - len(mismatch)}/{2 * n}" + (f" | farklı: {mismatch[:5]}" if mismatch else ""))
+
+
+# ============================================================
+# TABLO AYRIŞTIRMA: hücre hücre get_val vs alias tablosu + reindex
+# ============================================================
+
+def _statement_fixtures(n: int) -> List[Dict[str, Any]]:
+    """
+    Önce kayıtlı ham tablolar (fundamentals_cache/*.npz, gerçek Yahoo
+    çıktıları); yoksa Yahoo şeklinde sentetik tablolar (~60 satır, %20 NaN).
+    """
+    import numpy as np
+    import pandas as pd
+    from temel_analiz.veri_saglayicilar.ham_onbellek import cached_symbols, load_raw
+    from temel_analiz.veri_saglayicilar.veri_saglayici import ROW_ALIASES
+
+    recorded = [load_raw(s) for s in cached_symbols()[:n]]
+    recorded = [r for r in recorded if r is not None]
+    if recorded:
+        return recorded
+
+    rng = np.random.default_rng(11)
+    cols = pd.to_datetime(["2025-09-30", "2025-06-30", "2025-03-31", "2024-12-31", "2024-09-30"])
+    out = []
+    for i in range(n):
+        raw: Dict[str, Any] = {"symbol": f"S{i:04d}.IS", "last_price": 10.0,
+                               "info": {"sector": "Industrials", "sharesOutstanding": 1e8}}
+        for key in ("fin", "bal", "cf"):
+            rows = [a for tbl, al in ROW_ALIASES.values() if tbl == key for a in al if rng.random() < 0.7]
+            rows += [f"{key} Line {j}" for j in range(60 - len(rows))]
+            df = pd.DataFrame(rng.normal(1e8, 3e8, (len(rows), len(cols))), index=rows, columns=cols)
+            raw[key] = df.mask(rng.random(df.shape) < 0.2)
+        out.append(raw)
+    return out
+
+
+def _parse_cellwise(raw: Dict[str, Any]) -> List[Dict[str, float]]:
+    """Eski erişim kalıbı: her dönem x alan x alias için `in index` + df.loc."""
+    import pandas as pd
+    from temel_analiz.veri_saglayicilar.veri_saglayici import ROW_ALIASES
+
+    out = []
+    for date_col in raw["fin"].columns[:5]:
+        row = {}
+        for field, (key, aliases) in ROW_ALIASES.items():
+            df = raw[key]
+            row[field] = 0.0
+            for k in aliases:
+                if k in df.index:
+                    val = df.loc[k, date_col]
+                    if pd.notna(val):
+                        row[field] = float(val)
+                        break
+        out.append(row)
+    return out
+
+
+def bench_parse(n: int = 200) -> None:
+    from temel_analiz.veri_saglayicilar.veri_saglayici import parse_raw
+
+    raws = _statement_fixtures(n)
+    per_sym = []
+    for r in raws:
+        t0 = time.perf_counter()
+        parse_raw(r)
+        per_sym.append((time.perf_counter() - t0) * 1000.0)
+    per_sym.sort()
+
+    t_old = _timeit(lambda: [_parse_cellwise(r) for r in raws], repeat=3)
+    t_new = _timeit(lambda: [parse_raw(r) for r in raws], repeat=3)
+    print(f"📊 tablo ayrıştırma ({len(raws)} sembol)")
+    print(f"  hücre hücre (eski kalıp): {t_old:9.1f} ms | sembol başı {t_old / len(raws):6.2f} ms")
+    print(f"  reindex (parse_raw)     : {t_new:9.1f} ms | sembol başı {t_new / len(raws):6.2f} ms | x{t_old / max(t_new, 1e-9):.1f}")
+    print(f"  parse_ms p50 {per_sym[len(per_sym) // 2]:.2f} | p95 {per_sym[int(len(per_sym) * 0.95)]:.2f} | max {per_sym[-1]:.2f}")
+
+
+def _synthetic_candle_entry(n: int) -> Dict[str, Any]:
+    import numpy as np
+
+    from api.technical_services import _bars_to_candles
+
+    rng = np.random.default_rng(3)
+    c = 100.0 + np.cumsum(rng.normal(0, 0.5, n))
+    bars = {
+        "t": 1_760_000_000 + np.arange(n, dtype=np.int64) * 900,
+        "o": np.round(c + rng.normal(0, 0.2, n), 2),
+        "h": np.round(c + 0.5, 2),
+        "l": np.round(c - 0.5, 2),
+        "c": np.round(c, 2),
+        "v": rng.integers(1_000, 1_000_000, n).astype(np.int64),
+    }
+    return {"bars": bars, "candles": _bars_to_candles(bars), "meta": {"source": "yfinance", "fetched_at": 0}}
+
+
+def bench_candles(n: int = 600) -> None:
+    import json
+
+    from fastapi.encoders import jsonable_encoder
+
+    from api.technical_services import _entry_payload
+
+    entry = _synthetic_candle_entry(n)
+    last_t = int(entry["bars"]["t"][-1])
+
+    def body(payload: Dict[str, Any], encoder: bool = False) -> bytes:
+        if encoder:
+            # eski yol: FastAPI dict dönüşünü jsonable_encoder + json.dumps ile serileştirir
+            return json.dumps(jsonable_encoder(payload), ensure_ascii=False).encode("utf-8")
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    cases = [
+        ("rows (eski: jsonable_encoder)", lambda: body(_entry_payload("GARAN", "15m", entry), encoder=True)),
+        ("rows", lambda: body(_entry_payload("GARAN", "15m", entry))),
+        ("columnar", lambda: body(_entry_payload("GARAN", "15m", entry, fmt="columnar"))),
+        ("rows + since", lambda: body(_entry_payload("GARAN", "15m", entry, since=last_t))),
+        ("columnar + since", lambda: body(_entry_payload("GARAN", "15m", entry, since=last_t, fmt="columnar"))),
+    ]
+    print(f"📊 /technical/candles yanıtı ({n} bar)")
+    for label, fn in cases:
+        size = len(fn())
+        ms = _timeit(fn, repeat=30)
+        print(f"  {label:30s}: {size / 1024:8.1f} KB | {ms:7.3f} ms")
+
+
+BENCHES: Dict[str, Callable[..., None]] = {
+    "scanner": bench_scanner,
+    "snapshots": bench_snapshots,
+    "storage": bench_storage,
+    "radar": bench_radar,
+    "quotes": bench_quotes,
+    "breaker": bench_breaker,
+    "scan": bench_scan,
+    "scorer": bench_scorer,
+    "parse": bench_parse,
+    "candles": bench_candles,
+}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="WinningWave yerel benchmark'ları")
+    ap.add_argument("name", choices=sorted(BENCHES.keys()))
+    ap.add_argument("-n", type=int, default=500, help="sentetik kayıt sayısı")
+    args = ap.parse_args()
+    BENCHES[args.name](n=args.n)
+
+
+if __name__ == "__main__":
+    main()
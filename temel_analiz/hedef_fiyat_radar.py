@@ -1,6 +1,6 @@
 # coding: utf-8
 """
-WinningWave SenTez AI - Hedef Fiyat Radarı (Nebula UI, Yahoo, Thread'siz)
+WinningWave SenTez AI - Hedef Fiyat Radarı (Nebula UI, Yahoo; toplu fiyat arka plan QThread'inde)
 Bu dosya panelde HedefFiyatRadarWidget olarak kullanılır.
 İstersen tek başına da çalıştırabilirsin.
 """
@@ -10,12 +10,11 @@ from __future__ import annotations
 import os
 import json
 import time
-import random
 from typing import List, Dict, Optional, Tuple
 
-import yfinance as yf
+from temel_analiz.veri_saglayicilar.toplu_fiyat import fetch_quotes
 
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
 from PyQt6.QtGui import QColor, QPen, QFont, QBrush
 from PyQt6.QtWidgets import (
     QApplication,
@@ -56,6 +55,25 @@ def find_piyasa_json() -> str:
     return candidate1
 
 
+# -------------------------------------------------------------
+# Toplu fiyat çekimi (arka plan thread)
+# -------------------------------------------------------------
+class QuoteWorker(QThread):
+    quotesFetched = pyqtSignal(dict)
+
+    def __init__(self, yahoo_symbols: List[str], parent=None):
+        super().__init__(parent)
+        self.yahoo_symbols = yahoo_symbols
+
+    def run(self):
+        # Tüm kuyruk tek toplu istekle; GUI thread'i bloklanmaz
+        try:
+            quotes = fetch_quotes(self.yahoo_symbols)
+        except Exception:
+            quotes = {}
+        self.quotesFetched.emit(quotes)
+
+
 # -------------------------------------------------------------
 # Seçimi boşluğa tıklayınca temizleyen tablo
 # -------------------------------------------------------------
@@ -138,6 +156,8 @@ class HedefFiyatRadarWidget(QWidget):
         self._records: List[Dict] = []
         self._refresh_queue: List[Tuple[str, str]] = []
         self._refresh_in_progress: bool = False
+        self._quote_map: Dict[str, Dict] = {}
+        self._quote_worker: Optional[QuoteWorker] = None
 
         self._init_ui()
         self._load_data()
@@ -384,43 +404,22 @@ class HedefFiyatRadarWidget(QWidget):
     # Yahoo: fiyat + günlük %
     # ---------------------------------------------------------
 
+    def _prefetch_prices(self, yahoo_symbols: List[str]) -> None:
+        # Toplu istek QuoteWorker'da; sonuç gelince adımlar başlar
+        self._quote_worker = QuoteWorker(yahoo_symbols, self)
+        self._quote_worker.quotesFetched.connect(self._on_quotes)
+        self._quote_worker.start()
+
+    def _on_quotes(self, quotes: Dict[str, Dict]) -> None:
+        self._quote_map = quotes or {}
+        # İlk adımı başlat (ağ yok, sadece UI güncellemesi)
+        QTimer.singleShot(0, self._process_refresh_step)
+
     def _fetch_price(self, yahoo_symbol: str) -> Tuple[Optional[float], Optional[float]]:
-        try:
-            ticker = yf.Ticker(yahoo_symbol)
-
-            fi = getattr(ticker, "fast_info", None)
-            last = getattr(fi, "last_price", None) if fi else None
-            if last is None:
-                last = getattr(fi, "last_close", None) if fi else None
-
-            prev_close = getattr(fi, "previous_close", None) if fi else None
-
-            if last is None or prev_close is None:
-                try:
-                    hist = ticker.history(period="2d")
-                    if not hist.empty:
-                        closes = hist["Close"].tolist()
-                        if len(closes) == 1:
-                            last = closes[0]
-                        elif len(closes) >= 2:
-                            prev_close = closes[-2]
-                            last = closes[-1]
-                except Exception:
-                    pass
-
-            if last is None:
-                return None, None
-
-            price = float(last)
-            daily = None
-            if prev_close not in (None, 0):
-                prev = float(prev_close)
-                if prev > 0:
-                    daily = (price - prev) / prev * 100.0
-
-            return price, daily
-        except Exception:
+        q = self._quote_map.get(yahoo_symbol.upper())
+        if not q:
             return None, None
+        return q["price"], q["daily"]
 
     # ---------------------------------------------------------
     # Tabloları yeniden kur
@@ -519,7 +518,7 @@ class HedefFiyatRadarWidget(QWidget):
         self.table_upside.resizeColumnsToContents()
 
     # ---------------------------------------------------------
-    # Fiyat yenileme (threadsiz, adım adım)
+    # Fiyat yenileme (toplu çekim thread'de, UI adım adım)
     # ---------------------------------------------------------
 
     def start_refresh(self):
@@ -541,8 +540,11 @@ class HedefFiyatRadarWidget(QWidget):
         self.btn_refresh.setEnabled(False)
         self.btn_refresh.setText("Güncelleniyor...")
 
-        # İlk adımı başlat
-        QTimer.singleShot(10, self._process_refresh_step)
+        # Adımlar _on_quotes'ta başlar
+        self._prefetch_prices(
+            [s for kind, s in self._refresh_queue if kind == "index"]
+            + [f"{s}.IS" for kind, s in self._refresh_queue if kind == "stock"]
+        )
 
     def _process_refresh_step(self):
         if not self._refresh_queue:
@@ -565,8 +567,8 @@ class HedefFiyatRadarWidget(QWidget):
             if price is not None:
                 self._update_stock(sym, price, daily if daily is not None else 0.0)
 
-        # Bir sonrakini planla (çok küçük delay)
-        QTimer.singleShot(50 + int(random.uniform(0, 50)), self._process_refresh_step)
+        # Bir sonrakini planla (ağ yok, sadece UI güncellemesi)
+        QTimer.singleShot(0, self._process_refresh_step)
 
     # ---------------------------------------------------------
     # Güncelleme yardımcıları
@@ -38,13 +38,13 @@ def calculate_lynch_value(eps: float, growth_rate: float) -> float:
     fair_pe = safe_growth * 100 # Örn: %20 büyüme = 20 F/K
     return eps * fair_pe
 
-def compute_target_price(company: CompanyData, metrics: Dict[str, Any]) -> Tuple[Optional[float], Optional[Tuple[float, float]], str]:
-    if not company or not company.periods or not company.last_price:
-        return (None, None, "Veri Yetersiz")
+def compute_fair_value(company: CompanyData, metrics: Dict[str, Any]) -> Tuple[Optional[float], str]:
+    """Fiyattan bağımsız adil değer (filtre öncesi). Sadece tablolara bakar."""
+    if not company or not company.periods:
+        return (None, "Veri Yetersiz")
 
     mrq = company.mrq()
     sector_code = company.sector_normalized
-    price = company.last_price
     
     # Sektör Parametreleri (Varsayılan: INDUSTRY)
     params = SECTOR_PARAMS.get(sector_code, SECTOR_PARAMS["INDUSTRY"])
@@ -142,13 +142,27 @@ def compute_target_price(company: CompanyData, metrics: Dict[str, Any]) -> Tuple
             final_price = bvps
             methods_used = ["Defter Değeri (Zarar Nedeniyle)"]
         else:
-            return (None, None, "Hesaplanamadı")
+            return (None, "Hesaplanamadı")
 
+    return (final_price, "Karma Model: " + " + ".join(methods_used))
+
+def price_target(fair_value: float, price: float) -> Tuple[float, Tuple[float, float]]:
+    """Adil değer + güncel fiyat -> (hedef, bant). Fiyat değişince sadece bu kısım yeniden hesaplanır."""
+    final_price = fair_value
     # Yapay Zeka Filtresi (Uçuk fiyatları törpüle)
     if final_price > price * 4.0: final_price = price * 2.5
     if final_price < price * 0.4: final_price = price * 0.6
 
     band = (final_price * 0.85, final_price * 1.15)
-    method_desc = "Karma Model: " + " + ".join(methods_used)
+    return (final_price, band)
+
+def compute_target_price(company: CompanyData, metrics: Dict[str, Any]) -> Tuple[Optional[float], Optional[Tuple[float, float]], str]:
+    if not company or not company.periods or not company.last_price:
+        return (None, None, "Veri Yetersiz")
+
+    fair_value, method_desc = compute_fair_value(company, metrics)
+    if fair_value is None:
+        return (None, None, method_desc)
 
+    final_price, band = price_target(fair_value, company.last_price)
     return (final_price, band, method_desc)
\ No newline at end of file
@@ -8,7 +8,7 @@ from time import sleep
 from temel_analiz.veri.modeller import CompanyData
 from temel_analiz.veri_saglayicilar.veri_saglayici import fetch_company
 from temel_analiz.hesaplayicilar.oranlar import all_metrics
-from temel_analiz.hesaplayicilar.degerleme import compute_target_price
+from temel_analiz.hesaplayicilar.degerleme import compute_fair_value, price_target
 
 def _scale(val: Optional[float], target: float, tolerance: float, is_higher_better: bool = True) -> float:
     if val is None: return 50.0
@@ -82,6 +82,12 @@ def calculate_score(company: CompanyData, m: Dict[str, Any], target_price: float
         ])
         
     # --- 4. DEĞERLEME / POTANSİYEL SKORU ---
+    s_val = _valuation_score(target_price, price)
+    
+    subscores = {"profitability": s_prof, "leverage_liquidity": s_lev, "cashflow_quality": s_cf, "valuation_score": s_val}
+    return _weighted_total(sec, subscores), subscores
+
+def _valuation_score(target_price: Optional[float], price: float) -> float:
     # Potansiyel ne kadar yüksekse skor o kadar artar.
     upside = 0
     if target_price and price:
@@ -89,18 +95,25 @@ def calculate_score(company: CompanyData, m: Dict[str, Any], target_price: float
     
     # %50 potansiyel 100 puandır. -%20 potansiyel 30 puandır.
     s_val = 50.0 + (upside * 0.6)
-    s_val = max(10.0, min(100.0, s_val))
-    
-    w = _get_sector_weights(sec)
-    total = (s_prof * w["prof"]) + (s_lev * w["lev"]) + (s_cf * w["cf"]) + (s_val * w["val"])
-    
-    subscores = {"profitability": s_prof, "leverage_liquidity": s_lev, "cashflow_quality": s_cf, "valuation_score": s_val}
-    return total, subscores
+    return max(10.0, min(100.0, s_val))
+
+def _weighted_total(sector_code: str, subscores: Dict[str, float]) -> float:
+    w = _get_sector_weights(sector_code)
+    return (subscores["profitability"] * w["prof"]) + (subscores["leverage_liquidity"] * w["lev"]) \
+        + (subscores["cashflow_quality"] * w["cf"]) + (subscores["valuation_score"] * w["val"])
 
 def build_payload(company: CompanyData) -> Dict[str, Any]:
     if not company or not company.periods: return {}
     m = all_metrics(company)
-    target_price, band, method_desc = compute_target_price(company, m)
+
+    # Hedef = adil değer (tablolardan) + fiyat filtresi (bkz. reprice)
+    target_price, band, fair_value = None, None, None
+    if company.last_price:
+        fair_value, method_desc = compute_fair_value(company, m)
+        if fair_value is not None:
+            target_price, band = price_target(fair_value, company.last_price)
+    else:
+        method_desc = "Veri Yetersiz"
     
     total_score, subscores = calculate_score(company, m, target_price)
     
@@ -115,11 +128,32 @@ def build_payload(company: CompanyData) -> Dict[str, Any]:
         "valuation": {
             "target_price": target_price,
             "confidence_band": band,
+            "fair_value": fair_value,
             "method": method_desc,
             "target_date": "12 Ay"
         }
     }
 
+def reprice(sector_code: str, subscores: Dict[str, float], fair_value: Optional[float], price: float) -> Dict[str, Any]:
+    """
+    Tablolar değişmediyse sadece fiyata bağlı alanları günceller:
+    hedef / bant (fiyat filtresi), potansiyel skoru ve toplam skor.
+    Diğer alt skorlar build_payload'dakiyle aynı kalır.
+    """
+    target_price, band = (None, None)
+    if fair_value is not None and price:
+        target_price, band = price_target(fair_value, price)
+
+    subs = dict(subscores)
+    subs["valuation_score"] = _valuation_score(target_price, price or 1.0)
+    return {
+        "price": price,
+        "subscores": subs,
+        "score_total_0_100": _weighted_total(sector_code, subs),
+        "target_price": target_price,
+        "confidence_band": band,
+    }
+
 def analyze_symbols(symbols: List[str], save: bool = False, sleep_sec: float = 0.0) -> Tuple[List[Dict[str, Any]], List[Tuple[str, str]]]:
     payloads = []
     errors = []
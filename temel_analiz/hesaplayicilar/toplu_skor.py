@@ -0,0 +1,374 @@
+# coding: utf-8
+# temel_analiz/hesaplayicilar/toplu_skor.py
+
+"""
+Toplu (vektörel) skor kartı.
+
+build_payload'ın (oranlar + degerleme + puan_karti) tüm şirketler için
+tek seferde NumPy ile hesaplanan hali. Sonuçlar skaler fonksiyonlarla
+BİREBİR aynıdır:
+  - toplamlar skaler koddaki sırayla (soldan sağa) yapılır
+  - Python min/max'in NaN davranışı (_pymin/_pymax) korunur
+  - None (veri yok -> 50 puan) ile NaN (veri var ama bozuk) ayrı tutulur
+
+Kullanım: build_payloads([CompanyData, ...]) -> [payload | {}, ...]
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from temel_analiz.veri.modeller import CompanyData
+from temel_analiz.hesaplayicilar.oranlar import all_metrics
+from temel_analiz.hesaplayicilar.degerleme import SECTOR_PARAMS
+
+_FIN_PROF = ["BANK", "INSURANCE", "FINANCE"]
+_FIN_CF = ["BANK", "INSURANCE", "REIT", "FINANCE"]
+_HIGH_NDE = ["AVIATION", "TELECOM", "ENERGY", "LOGISTICS", "CONSTRUCTION"]
+_HIGH_EV = ["TECH", "DEFENSE", "ENERGY"]
+
+# puan_karti._get_sector_weights ile aynı tablo
+_W_FIN = (0.60, 0.05, 0.05, 0.30)
+_W_REIT = (0.20, 0.35, 0.10, 0.35)
+_W_HEAVY = (0.30, 0.25, 0.25, 0.20)
+_W_GROWTH = (0.40, 0.20, 0.20, 0.20)
+_W_OTHER = (0.35, 0.25, 0.20, 0.20)
+
+
+def _pymin(a, b):
+    """Python min(a, b): b < a ise b, değilse a (NaN'da a kalır)."""
+    return np.where(b < a, b, a)
+
+
+def _pymax(a, b):
+    """Python max(a, b): b > a ise b, değilse a."""
+    return np.where(b > a, b, a)
+
+
+def _num(v: Any) -> float:
+    if v is None:
+        return np.nan
+    try:
+        return float(v)
+    except Exception:
+        return np.nan
+
+
+def _scale(val: np.ndarray, present: np.ndarray, target, tolerance: float, is_higher_better: bool = True) -> np.ndarray:
+    diff = (val - target) if is_higher_better else (target - val)
+    score = 50.0 + (diff / tolerance) * 50.0
+    score = _pymax(0.0, _pymin(100.0, score))
+    return np.where(present, score, 50.0)
+
+
+# ============================================================
+# 1) TOPLAMA: şirket başına girdiler -> diziler
+# ============================================================
+
+# info (metrics_ttm) alanları: skor girdileri buradan türetilir (bkz. oranlar.py)
+_INFO_KEYS = ("profitMargins", "returnOnEquity", "returnOnAssets", "debtToEquity", "currentRatio",
+              "freeCashflow", "totalRevenue", "enterpriseToEbitda", "ebitda")
+_ZERO4 = [0.0] * 4
+_ZERO8 = [0.0] * 8
+
+
+def _gather(companies: List[CompanyData], with_metrics: bool) -> Dict[str, Any]:
+    # Önce düz Python listeleri, en sonda tek seferde np.array (eleman eleman
+    # numpy ataması döngüden pahalı)
+    valid, has_price, price, sector, metrics, n_periods = [], [], [], [], [], []
+    ebitda_raw, ebitda, net_income, revenue = [], [], [], []
+    equity, shares, total_debt, cash, mrq_rev, mrq_ebitda = [], [], [], [], [], []
+    info: Dict[str, list] = {k: [] for k in _INFO_KEYS}
+
+    for c in companies:
+        sector.append("" if not c or c.sector_normalized is None else str(c.sector_normalized))
+        ok = bool(c and c.periods)
+        valid.append(ok)
+        if not ok:
+            has_price.append(False); price.append(0.0); metrics.append(None); n_periods.append(0)
+            ebitda_raw.append(_ZERO4); ebitda.append(_ZERO4); net_income.append(_ZERO4); revenue.append(_ZERO8)
+            equity.append(0.0); shares.append(1.0); total_debt.append(0.0); cash.append(0.0)
+            mrq_rev.append(0.0); mrq_ebitda.append(0.0)
+            for k in _INFO_KEYS:
+                info[k].append(None)
+            continue
+
+        has_price.append(bool(c.last_price))
+        price.append(c.last_price if c.last_price else 0.0)
+        metrics.append(all_metrics(c) if with_metrics else None)
+
+        m = c.metrics_ttm or {}
+        for k in _INFO_KEYS:
+            info[k].append(m.get(k))
+
+        ps = c.periods
+        n_periods.append(len(ps))
+        p4 = ps[:4]
+        ebitda_raw.append([p.ebitda for p in p4] + _ZERO4[len(p4):])
+        ebitda.append([p.ebitda or 0 for p in p4] + _ZERO4[len(p4):])
+        net_income.append([p.net_income or 0 for p in p4] + _ZERO4[len(p4):])
+        p8 = ps[:8]
+        revenue.append([p.revenue or 0 for p in p8] + _ZERO8[len(p8):])
+
+        mrq = ps[0]
+        equity.append(mrq.equity if mrq.equity else 0)
+        shares.append(mrq.shares_out if mrq.shares_out else 1)
+        total_debt.append(mrq.total_debt or 0)
+        cash.append(mrq.cash_and_equivalents or 0)
+        mrq_rev.append(mrq.revenue)
+        mrq_ebitda.append(mrq.ebitda)
+
+    g: Dict[str, Any] = {
+        "valid": np.array(valid, dtype=bool),
+        "has_price": np.array(has_price, dtype=bool),
+        "price": np.array(price, dtype=float),
+        "sector": np.array(sector, dtype=object),
+        "metrics": metrics,
+        "n_periods": np.array(n_periods, dtype=np.int64),
+        # TTM (ilk 4 dönem) ve önceki 4 dönem toplamları için dönem matrisleri
+        "ebitda_raw": np.array(ebitda_raw, dtype=float),
+        "ebitda": np.array(ebitda, dtype=float),
+        "net_income": np.array(net_income, dtype=float),
+        "revenue": np.array(revenue, dtype=float),
+        "equity": np.array(equity, dtype=float),
+        "shares": np.array(shares, dtype=float),
+        "total_debt": np.array(total_debt, dtype=float),
+        "cash": np.array(cash, dtype=float),
+        "mrq_revenue": np.array(mrq_rev, dtype=float),
+        "mrq_ebitda": np.array(mrq_ebitda, dtype=float),
+    }
+    for k in _INFO_KEYS:
+        g["i_" + k] = np.array([_num(v) for v in info[k]], dtype=float)
+        g["i_" + k + "_p"] = np.array([v is not None for v in info[k]], dtype=bool)
+    _metric_arrays(g)
+    return g
+
+
+def _metric_arrays(g: Dict[str, Any]) -> None:
+    """oranlar.all_metrics'in skorda kullanılan alanları (değer + None değil mi)."""
+    def put(name, val, present):
+        g[name] = val
+        g[name + "_p"] = present
+
+    def info(k):
+        return g["i_" + k], g["i_" + k + "_p"]
+
+    # profitability
+    put("net_margin", *info("profitMargins"))
+    put("roe", *info("returnOnEquity"))
+    put("roa", *info("returnOnAssets"))
+    em_ok = g["mrq_revenue"] > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        put("ebitda_margin", np.where(em_ok, g["mrq_ebitda"] / np.where(em_ok, g["mrq_revenue"], 1.0), np.nan), em_ok)
+
+    # leverage_liquidity (Yahoo D/E yüzde verir: >10 ise /100)
+    dte, dte_p = info("debtToEquity")
+    put("debt_to_equity", np.where(dte > 10, dte / 100.0, dte), dte_p)
+    put("current_ratio", *info("currentRatio"))
+    i_ebitda, i_ebitda_p = info("ebitda")
+    i_ebitda = np.where(i_ebitda_p & (i_ebitda != 0), i_ebitda, 0.0)       # m.get('ebitda') or 0.0
+    ebitda_ttm = np.where(g["n_periods"] >= 4, _seq_sum(g["ebitda_raw"], 0, 4), i_ebitda)
+    nde_ok = ebitda_ttm > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        put("net_debt_ebitda", np.where(nde_ok, (g["total_debt"] - g["cash"]) / np.where(nde_ok, ebitda_ttm, 1.0), np.nan), nde_ok)
+
+    # cashflow_quality
+    fcf, fcf_p = info("freeCashflow")
+    rev, rev_p = info("totalRevenue")
+    rev_truthy = rev_p & (rev != 0)
+    revenue = np.where(rev_truthy, rev, g["mrq_revenue"] * 4)
+    fm_ok = fcf_p & (revenue != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        put("fcf_margin", np.where(fm_ok, fcf / np.where(fm_ok, revenue, 1.0), np.nan), fm_ok)
+    put("ev_ebitda", *info("enterpriseToEbitda"))
+
+
+def _seq_sum(mat: np.ndarray, start: int, stop: int) -> np.ndarray:
+    # sum(...) ile aynı sıra: 0 + x0 + x1 + ...
+    acc = np.zeros(mat.shape[0])
+    for j in range(start, stop):
+        acc = acc + mat[:, j]
+    return acc
+
+
+# ============================================================
+# 2) DEĞERLEME (degerleme.compute_fair_value + price_target)
+# ============================================================
+
+def _fair_values(g: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, List[Optional[str]]]:
+    sec = g["sector"]
+    n = len(sec)
+
+    method = np.array([SECTOR_PARAMS.get(s, SECTOR_PARAMS["INDUSTRY"])["method"] for s in sec], dtype=object)
+    base_mult = np.array([SECTOR_PARAMS.get(s, SECTOR_PARAMS["INDUSTRY"])["multiplier"] for s in sec], dtype=float)
+
+    ttm_ebitda = _seq_sum(g["ebitda"], 0, 4)
+    ttm_net_income = _seq_sum(g["net_income"], 0, 4)
+    ttm_revenue = _seq_sum(g["revenue"], 0, 4)
+
+    shares = g["shares"]
+    net_debt = g["total_debt"] - g["cash"]
+    eps = ttm_net_income / shares
+    bvps = g["equity"] / shares
+    revenue_ps = ttm_revenue / shares
+
+    past_rev = _seq_sum(g["revenue"], 4, 8)
+    use_growth = (g["n_periods"] >= 5) & (past_rev > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth_rate = np.where(use_growth, (ttm_revenue - past_rev) / np.where(use_growth, past_rev, 1.0), 0.10)
+
+    # --- Piyasa çarpanları ---
+    is_pb = (method == "PB") | ((ttm_net_income < 0) & (ttm_ebitda < 0))
+    is_ev = ~is_pb & (method == "EV_EBITDA")
+    debt_impact = np.where(sec == "AVIATION", net_debt * 0.5, net_debt)
+    market_price = np.zeros(n)
+    market_price = np.where(is_pb, bvps * base_mult, market_price)
+    ev_a = is_ev & (ttm_ebitda > 0)
+    ev_b = is_ev & ~(ttm_ebitda > 0) & (ttm_net_income > 0)
+    ev_c = is_ev & ~(ttm_ebitda > 0) & ~(ttm_net_income > 0) & (ttm_revenue > 0)
+    market_price = np.where(ev_a, ((ttm_ebitda * base_mult) - debt_impact) / shares, market_price)
+    market_price = np.where(ev_b, eps * 12.0, market_price)
+    market_price = np.where(ev_c, revenue_ps * 1.5, market_price)
+
+    # --- Graham / Lynch ---
+    g_ok = ~((eps <= 0) | (bvps <= 0))
+    with np.errstate(invalid="ignore"):
+        graham_price = np.where(g_ok, np.sqrt(np.where(g_ok, 22.5 * eps * bvps, 0.0)), 0.0)
+    safe_growth = _pymin(_pymax(growth_rate, 0.05), 0.35)
+    lynch_price = np.where(eps <= 0, 0.0, eps * (safe_growth * 100))
+
+    # --- Hibrit ---
+    m_pos, g_pos, l_pos = market_price > 0, graham_price > 0, lynch_price > 0
+    g_zero, l_zero = graham_price == 0, lynch_price == 0
+
+    w_m = np.where(g_zero & l_zero, 1.0, np.where(g_zero | l_zero, 0.75, 0.50))
+    w_g = np.where(l_zero & m_pos, 0.50, np.where(m_pos, 0.25, 0.50))
+    w_l = np.where(g_zero & m_pos, 0.50, np.where(m_pos, 0.25, 0.50))
+
+    final_price = np.zeros(n)
+    final_price = final_price + np.where(m_pos, market_price * w_m, 0.0)
+    final_price = final_price + np.where(g_pos, graham_price * w_g, 0.0)
+    final_price = final_price + np.where(l_pos, lynch_price * w_l, 0.0)
+
+    fallback = ~(final_price > 0) & ~np.isnan(final_price)
+    book = fallback & (bvps > 0)
+    final_price = np.where(book, bvps, final_price)
+    ok = g["valid"] & g["has_price"] & ~(fallback & ~book)
+
+    descs: List[Optional[str]] = [None] * n
+    for i in range(n):
+        if not g["valid"][i] or not g["has_price"][i]:
+            descs[i] = "Veri Yetersiz"
+        elif not ok[i]:
+            descs[i] = "Hesaplanamadı"
+        elif book[i]:
+            descs[i] = "Karma Model: Defter Değeri (Zarar Nedeniyle)"
+        else:
+            used = []
+            if m_pos[i]: used.append("Piyasa Çarpanları")
+            if g_pos[i]: used.append("Graham (İçsel)")
+            if l_pos[i]: used.append("Lynch (Büyüme)")
+            descs[i] = "Karma Model: " + " + ".join(used)
+    return final_price, ok, descs
+
+
+def _price_targets(fair: np.ndarray, price: np.ndarray) -> np.ndarray:
+    target = np.where(fair > price * 4.0, price * 2.5, fair)
+    target = np.where(target < price * 0.4, price * 0.6, target)
+    return target
+
+
+# ============================================================
+# 3) SKOR (puan_karti.calculate_score)
+# ============================================================
+
+def _scores(g: Dict[str, Any], target: np.ndarray, has_target: np.ndarray) -> Dict[str, np.ndarray]:
+    sec = g["sector"]
+    price = np.where(g["has_price"], g["price"], 1.0)
+
+    def sc(k, t, tol, hib=True):
+        return _scale(g[k], g[k + "_p"], t, tol, hib)
+
+    fin = np.isin(sec, _FIN_PROF)
+    s_prof_fin = ((0 + sc("roe", 0.35, 0.15)) + sc("roa", 0.03, 0.02)) / 2
+    s_prof_oth = (((0 + sc("net_margin", 0.08, 0.08)) + sc("ebitda_margin", 0.12, 0.10)) + sc("roe", 0.30, 0.20)) / 3
+    s_prof = np.where(fin, s_prof_fin, s_prof_oth)
+
+    target_nde = np.where(np.isin(sec, _HIGH_NDE), 4.5, 2.5)
+    s_lev_oth = (((0 + sc("debt_to_equity", 1.5, 1.0, False)) + sc("current_ratio", 1.2, 0.5))
+                 + sc("net_debt_ebitda", target_nde, 2.5, False)) / 3
+    s_lev = np.where(fin, 85.0, s_lev_oth)
+
+    target_ev = np.where(np.isin(sec, _HIGH_EV), 12.0, 8.0)
+    s_cf_oth = ((0 + sc("fcf_margin", 0.05, 0.10)) + sc("ev_ebitda", target_ev, 5.0, False)) / 2
+    s_cf = np.where(np.isin(sec, _FIN_CF), 70.0, s_cf_oth)
+
+    use = has_target & (target != 0) & (price != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        upside = np.where(use, ((target - price) / price) * 100.0, 0.0)
+    s_val = _pymax(10.0, _pymin(100.0, 50.0 + (upside * 0.6)))
+
+    w = np.array([
+        _W_FIN if s in ("BANK", "INSURANCE", "FINANCE", "FACTORING", "LEASING")
+        else _W_REIT if s == "REIT"
+        else _W_HEAVY if s in ("AVIATION", "TELECOM", "ENERGY", "STEEL", "MINING", "REFINERY", "LOGISTICS")
+        else _W_GROWTH if s in ("RETAIL", "FOOD", "TECH", "DEFENSE", "TEXTILE")
+        else _W_OTHER
+        for s in sec
+    ]).reshape(len(sec), 4)
+    total = (s_prof * w[:, 0]) + (s_lev * w[:, 1]) + (s_cf * w[:, 2]) + (s_val * w[:, 3])
+
+    return {"profitability": s_prof, "leverage_liquidity": s_lev, "cashflow_quality": s_cf,
+            "valuation_score": s_val, "total": total}
+
+
+# ============================================================
+# GİRİŞ
+# ============================================================
+
+def build_payloads(companies: List[CompanyData], with_metrics: bool = True) -> List[Dict[str, Any]]:
+    """
+    build_payload'ın toplu hali; sıra korunur, veri olmayanlar için {}.
+    with_metrics=False: payload'a "metrics" sözlüğü konmaz (scanner / rescore
+    sadece skor + hedef kullanır); şirket başına all_metrics çağrısı atlanır.
+    """
+    if not companies:
+        return []
+    g = _gather(companies, with_metrics)
+    fair, ok, descs = _fair_values(g)
+    target = _price_targets(fair, g["price"])
+    s = _scores(g, target, ok)
+
+    out: List[Dict[str, Any]] = []
+    for i, c in enumerate(companies):
+        if not g["valid"][i]:
+            out.append({})
+            continue
+        tp = float(target[i]) if ok[i] else None
+        p = {
+            "symbol": c.symbol,
+            "sector": c.sector_normalized,
+            "price": c.last_price,
+            "mrq_date": c.most_recent_quarter_date(),
+            "metrics": g["metrics"][i],
+            "subscores": {
+                "profitability": float(s["profitability"][i]),
+                "leverage_liquidity": float(s["leverage_liquidity"][i]),
+                "cashflow_quality": float(s["cashflow_quality"][i]),
+                "valuation_score": float(s["valuation_score"][i]),
+            },
+            "score_total_0_100": float(s["total"][i]),
+            "valuation": {
+                "target_price": tp,
+                "confidence_band": (tp * 0.85, tp * 1.15) if tp is not None else None,
+                "fair_value": float(fair[i]) if ok[i] else None,
+                "method": descs[i],
+                "target_date": "12 Ay",
+            },
+        }
+        if not with_metrics:
+            del p["metrics"]
+        out.append(p)
+    return out
@@ -8,11 +8,9 @@ from __future__ import annotations
 
 import os
 import json
-import time
-import random
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional
 
-import yfinance as yf
+from temel_analiz.veri_saglayicilar.toplu_fiyat import fetch_quotes
 
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer
 from PyQt6.QtGui import QColor, QPen
@@ -105,49 +103,25 @@ class PriceWorker(QThread):
         self.symbols = symbols
         self.index_syms = index_syms
 
-    def _fetch(self, ysym: str) -> Tuple[Optional[float], Optional[float]]:
+    def run(self):
+        # Endeksler + hisseler tek toplu istekte (sembol başına Ticker yok)
+        stock_syms = [f"{s}.IS" for s in self.symbols]
         try:
-            t = yf.Ticker(ysym)
-            fi = getattr(t, "fast_info", None)
-
-            last = getattr(fi, "last_price", None) if fi else None
-            prev = getattr(fi, "previous_close", None) if fi else None
-
-            if last is None or prev is None:
-                hist = t.history(period="2d")
-                if not hist.empty:
-                    closes = hist["Close"].tolist()
-                    if len(closes) == 1:
-                        last = closes[0]
-                    elif len(closes) >= 2:
-                        prev = closes[-2]
-                        last = closes[-1]
-
-            if last is None:
-                return None, None
-
-            daily = None
-            if prev:
-                daily = (last - prev) / prev * 100.0
-
-            return float(last), daily
-        except:
-            return None, None
+            quotes = fetch_quotes(list(self.index_syms) + stock_syms)
+        except Exception:
+            quotes = {}
 
-    def run(self):
         # Endeksler
         for idx in self.index_syms:
-            time.sleep(random.uniform(0.3, 0.45))
-            p, d = self._fetch(idx)
-            if p is not None:
-                self.indexFetched.emit(idx, p, d or 0)
+            q = quotes.get(idx.upper())
+            if q:
+                self.indexFetched.emit(idx, q["price"], q["daily"] or 0)
 
         # Hisseler
-        for s in self.symbols:
-            time.sleep(random.uniform(0.10, 0.20))
-            p, d = self._fetch(f"{s}.IS")
-            if p is not None:
-                self.priceFetched.emit(s, p, d or 0)
+        for s, ysym in zip(self.symbols, stock_syms):
+            q = quotes.get(ysym.upper())
+            if q:
+                self.priceFetched.emit(s, q["price"], q["daily"] or 0)
 
         self.finished.emit()
 
@@ -0,0 +1,117 @@
+# coding: utf-8
+# temel_analiz/veri_saglayicilar/ham_onbellek.py
+
+"""
+Ham finansal tablo önbelleği (sembol başına bir .npz).
+
+download_raw() çıktısı (quarterly financials / balance sheet / cashflow +
+info) sütunsal olarak saklanır:
+  {fin,bal,cf}_values : float64 matris (kalem x dönem)
+  {fin,bal,cf}_index  : kalem adları
+  {fin,bal,cf}_cols   : dönem tarihleri (YYYY-MM-DD)
+  meta                : JSON (last_price, shares_fast, info, saved_at)
+
+Böylece SECTOR_PARAMS / puan_karti ağırlıkları değiştiğinde ağa çıkmadan
+CompanyData yeniden kurulup build_payload tekrar çalıştırılabilir
+(bkz. api.services.rescore_from_cache).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+RAW_CACHE_DIR = Path(os.getenv(
+    "RAW_FUNDAMENTALS_DIR",
+    os.path.join(os.getenv("CACHE_ROOT", str(BASE_DIR)), "fundamentals_cache"),
+))
+
+_TABLES = ("fin", "bal", "cf")
+
+
+def _path(symbol: str) -> Path:
+    return RAW_CACHE_DIR / f"{symbol.upper().strip()}.npz"
+
+
+def save_raw(raw: Dict[str, Any]) -> Optional[Path]:
+    """download_raw çıktısını yazar. Yerel CSV kaynaklılar (company) zaten diskte; atlanır."""
+    if not raw or raw.get("company") is not None or not raw.get("symbol"):
+        return None
+
+    arrays: Dict[str, np.ndarray] = {}
+    for key in _TABLES:
+        df = raw.get(key)
+        if df is None:
+            df = pd.DataFrame()
+        num = df.apply(pd.to_numeric, errors="coerce") if not df.empty else df
+        arrays[f"{key}_values"] = num.to_numpy(dtype=np.float64) if not df.empty else np.zeros((0, 0))
+        arrays[f"{key}_index"] = np.array([str(i) for i in df.index], dtype=str)
+        arrays[f"{key}_cols"] = np.array(
+            [c.strftime("%Y-%m-%d") if hasattr(c, "strftime") else str(c)[:10] for c in df.columns],
+            dtype=str,
+        )
+
+    meta = {
+        "symbol": raw["symbol"],
+        "last_price": raw.get("last_price"),
+        "shares_fast": raw.get("shares_fast"),
+        "info": raw.get("info") or {},
+        "saved_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    arrays["meta"] = np.array(json.dumps(meta, ensure_ascii=False, default=str))
+
+    RAW_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = _path(raw["symbol"])
+    # benzersiz tmp (aynı dizin): /analyze ile tarama aynı sembolü aynı anda yazabilir
+    fd, tmp = tempfile.mkstemp(dir=RAW_CACHE_DIR, prefix=f"{path.stem}.", suffix=".tmp.npz")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+def load_raw(symbol: str) -> Optional[Dict[str, Any]]:
+    """save_raw'ın tersi: download_raw ile aynı şekilde dict (DataFrame'li) döner."""
+    path = _path(symbol)
+    if not path.exists():
+        return None
+
+    with np.load(path, allow_pickle=False) as z:
+        meta = json.loads(str(z["meta"]))
+        raw: Dict[str, Any] = {
+            "symbol": meta.get("symbol") or symbol.upper().strip(),
+            "last_price": meta.get("last_price"),
+            "shares_fast": meta.get("shares_fast"),
+            "info": meta.get("info") or {},
+            "saved_at": meta.get("saved_at"),
+        }
+        for key in _TABLES:
+            values = z[f"{key}_values"]
+            index = list(z[f"{key}_index"])
+            cols = pd.to_datetime(list(z[f"{key}_cols"]))
+            if values.size == 0:
+                raw[key] = pd.DataFrame(index=index, columns=cols, dtype=float)
+            else:
+                raw[key] = pd.DataFrame(values, index=index, columns=cols)
+    return raw
+
+
+def cached_symbols() -> List[str]:
+    if not RAW_CACHE_DIR.exists():
+        return []
+    return sorted(p.stem for p in RAW_CACHE_DIR.glob("*.npz") if not p.stem.endswith(".tmp"))
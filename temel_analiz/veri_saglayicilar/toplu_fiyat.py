@@ -0,0 +1,138 @@
+# temel_analiz/veri_saglayicilar/toplu_fiyat.py
+
+"""
+Toplu (çok sembollü) Yahoo fiyat çekimi.
+
+Sembol başına yf.Ticker + fast_info (+ eksikse history) yerine tüm liste
+birkaç çok sembollü istekle alınır:
+  1) yfinance.download  (günlük mumlar, chunk'lar halinde)
+  2) eksik kalanlar için yahooquery Ticker(...).price (tek istek)
+
+Dönüş: {yahoo_symbol: {"price": son, "prev": önceki kapanış, "daily": günlük %}}
+Bulunamayan semboller sözlükte yer almaz.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+import yfinance as yf
+
+CHUNK_SIZE = int(os.getenv("YF_BATCH_CHUNK", "100"))
+
+
+def _quote(last: Any, prev: Any) -> Optional[Dict[str, Optional[float]]]:
+    try:
+        price = float(last)
+    except Exception:
+        return None
+    if price != price or price <= 0:   # NaN / boş
+        return None
+
+    prev_f: Optional[float] = None
+    try:
+        if prev is not None and float(prev) == float(prev) and float(prev) != 0:
+            prev_f = float(prev)
+    except Exception:
+        prev_f = None
+
+    daily = (price - prev_f) / prev_f * 100.0 if prev_f else None
+    return {"price": price, "prev": prev_f, "daily": daily}
+
+
+def _from_download(chunk: List[str]) -> Dict[str, Dict[str, Optional[float]]]:
+    df = yf.download(
+        tickers=chunk,
+        period="5d",
+        interval="1d",
+        group_by="ticker",
+        auto_adjust=False,
+        threads=True,
+        progress=False,
+    )
+    out: Dict[str, Dict[str, Optional[float]]] = {}
+    if df is None or df.empty:
+        return out
+
+    multi = isinstance(df.columns, pd.MultiIndex)
+    level0 = set(df.columns.get_level_values(0)) if multi else set()
+
+    for sym in chunk:
+        if multi:
+            if sym not in level0:
+                continue
+            sub = df[sym]
+        elif len(chunk) == 1:
+            sub = df
+        else:
+            continue
+
+        if "Close" not in sub:
+            continue
+        closes = sub["Close"].dropna()
+        if closes.empty:
+            continue
+        prev = closes.iloc[-2] if len(closes) >= 2 else None
+        q = _quote(closes.iloc[-1], prev)
+        if q:
+            out[sym] = q
+    return out
+
+
+def _from_yahooquery(symbols: List[str]) -> Dict[str, Dict[str, Optional[float]]]:
+    from yahooquery import Ticker
+
+    out: Dict[str, Dict[str, Optional[float]]] = {}
+    price_mod = Ticker(symbols, asynchronous=True).price
+    if not isinstance(price_mod, dict):
+        return out
+    for sym in symbols:
+        rec = price_mod.get(sym)
+        if not isinstance(rec, dict):
+            continue
+        q = _quote(rec.get("regularMarketPrice"), rec.get("regularMarketPreviousClose"))
+        if q:
+            out[sym] = q
+    return out
+
+
+def fetch_quotes(
+    yahoo_symbols: Iterable[str],
+    chunk_size: int = CHUNK_SIZE,
+    strict: bool = False,
+) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    strict=True ise iki kaynak da hata verirse exception yükselir
+    (çağıran breaker / sayaç tutuyorsa); aksi halde boş sonuç döner.
+    """
+    syms = list(dict.fromkeys(s.strip().upper() for s in yahoo_symbols if s and s.strip()))
+    out: Dict[str, Dict[str, Optional[float]]] = {}
+    if not syms:
+        return out
+
+    last_err: Optional[Exception] = None
+    for i in range(0, len(syms), max(1, chunk_size)):
+        chunk = syms[i:i + chunk_size]
+        try:
+            out.update(_from_download(chunk))
+        except Exception as e:
+            last_err = e
+
+    missing = [s for s in syms if s not in out]
+    if missing:
+        try:
+            out.update(_from_yahooquery(missing))
+            last_err = None
+        except Exception as e:
+            last_err = last_err or e
+
+    if strict and not out and last_err is not None:
+        raise last_err
+    return out
+
+
+def fetch_quote(yahoo_symbol: str) -> Optional[Dict[str, Optional[float]]]:
+    """Tek sembol kolaylığı (yine toplu yol üzerinden)."""
+    return fetch_quotes([yahoo_symbol]).get((yahoo_symbol or "").strip().upper())
@@ -0,0 +1,206 @@
+# coding: utf-8
+# temel_analiz/veri_saglayicilar/toplu_temel.py
+
+"""
+Toplu (çok sembollü) temel veri çekimi: yahooquery Ticker([...]).
+
+Sembol başına yfinance akışı (history "tetikleme" + fast_info + info +
+3 çeyreklik tablo + boşsa 3 yıllık tablo = 6+ istek) yerine, skorlamanın
+ihtiyaç duyduğu veriler iki çağrıda alınır:
+  1) get_modules(FUNDAMENTAL_MODULES)  -> info (tek quoteSummary isteği/sembol)
+  2) all_financial_data("q")           -> tüm tablo kalemleri (tek timeseries isteği/sembol)
+     çeyreklik verisi olmayanlar için tek bir all_financial_data("a")
+
+Dönen ham dict download_raw ile aynı şekildedir (parse_raw aynen çalışır).
+RequestMeter: HTTP istek sayısı ve indirilen byte (session response hook'u).
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from temel_analiz.veri_saglayicilar.veri_saglayici import ROW_ALIASES
+
+FUNDAMENTAL_MODULES = ["assetProfile", "summaryDetail", "defaultKeyStatistics", "financialData", "price"]
+FUND_BATCH_SIZE = int(os.getenv("FUND_BATCH_SIZE", "25"))
+
+# tablo kalemi -> hangi tabloya yazılacağı (alias tablosundan); diğerleri "fin"
+_ROW_TABLE = {a: tbl for tbl, aliases in ROW_ALIASES.values() for a in aliases}
+
+
+# ============================================================
+# İSTEK SAYACI
+# ============================================================
+
+class RequestMeter:
+    """
+    attach(session): requests tabanlı session'a response hook'u takar
+    (gerçek istek + byte). count(): byte'ı ölçülemeyen istekler
+    (yfinance'in kendi session'ı) için elle sayım.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.bytes = 0
+        self.unmeasured = 0
+
+    def _hook(self, resp, *args, **kwargs):
+        try:
+            size = len(resp.content or b"")
+        except Exception:
+            size = 0
+        with self._lock:
+            self.requests += 1
+            self.bytes += size
+        return resp
+
+    def attach(self, session: Any) -> bool:
+        hooks = getattr(session, "hooks", None)
+        if not isinstance(hooks, dict):
+            return False
+        resp_hooks = hooks.setdefault("response", [])
+        if not isinstance(resp_hooks, list):
+            resp_hooks = [resp_hooks]
+            hooks["response"] = resp_hooks
+        resp_hooks.append(self._hook)
+        return True
+
+    def count(self, n: int = 1, size: Optional[int] = None) -> None:
+        with self._lock:
+            self.requests += n
+            if size is None:
+                self.unmeasured += n
+            else:
+                self.bytes += size
+
+    def snapshot(self, symbols: int = 0) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "bytes": self.bytes,
+                "unmeasured_requests": self.unmeasured,
+                "requests_per_symbol": round(self.requests / symbols, 2) if symbols else None,
+                "kb_per_symbol": round(self.bytes / 1024.0 / symbols, 1) if symbols else None,
+            }
+
+
+# ============================================================
+# DÖNÜŞTÜRME
+# ============================================================
+
+_CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+
+
+def yahoo_label(name: str) -> str:
+    """'NetIncomeCommonStockholders' -> 'Net Income Common Stockholders', 'NormalizedEBITDA' -> 'Normalized EBITDA'."""
+    return _CAMEL.sub(" ", name)
+
+
+def _statements(df: pd.DataFrame, sym: str, period_type: str) -> Optional[Dict[str, pd.DataFrame]]:
+    """all_financial_data çıktısından sembolün tabloları (yfinance düzeni: kalem x dönem, yeni -> eski)."""
+    if not isinstance(df, pd.DataFrame) or df.empty or sym not in df.index:
+        return None
+    sub = df.loc[[sym]]
+    if "periodType" in sub.columns:
+        sub = sub[sub["periodType"] == period_type]
+    if sub.empty or "asOfDate" not in sub.columns:
+        return None
+
+    sub = sub.sort_values("asOfDate", ascending=False)
+    cols = pd.to_datetime(sub["asOfDate"]).tolist()
+    items = sub.drop(columns=[c for c in ("asOfDate", "periodType", "currencyCode") if c in sub.columns])
+    st = items.apply(pd.to_numeric, errors="coerce").T
+    st.columns = cols
+    st.index = [yahoo_label(str(i)) for i in st.index]
+    st = st.dropna(how="all")
+    if st.empty:
+        return None
+
+    table = pd.Series([_ROW_TABLE.get(i, "fin") for i in st.index], index=st.index)
+    return {key: st[table.values == key] for key in ("fin", "bal", "cf")}
+
+
+def _merge_info(mods: Any) -> Dict[str, Any]:
+    # yfinance .info gibi: modüller tek düz sözlükte
+    info: Dict[str, Any] = {}
+    if not isinstance(mods, dict):
+        return info
+    for name in FUNDAMENTAL_MODULES:
+        part = mods.get(name)
+        if isinstance(part, dict):
+            for k, v in part.items():
+                info.setdefault(k, v)
+    return info
+
+
+# ============================================================
+# GİRİŞ
+# ============================================================
+
+def download_raw_batch(
+    symbols: List[str],
+    meter: Optional[RequestMeter] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Dönüş: {SYM: ham dict}. Bulunamayanlar dönmez (çağıran sembol başına
+    yfinance yoluna düşebilir). Ağ/429 hataları yukarı fırlatılır.
+    """
+    from yahooquery import Ticker
+
+    syms = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    if not syms:
+        return {}
+
+    t = Ticker(syms, asynchronous=True)
+    if meter is not None:
+        meter.attach(getattr(t, "session", None))
+
+    modules = t.get_modules(FUNDAMENTAL_MODULES)
+    if isinstance(modules, str):
+        # yahooquery hata mesajını str olarak döndürür (429 dahil)
+        raise RuntimeError(modules)
+    modules = modules if isinstance(modules, dict) else {}
+
+    quarterly = t.all_financial_data(frequency="q")
+    found: Dict[str, Tuple[Dict[str, pd.DataFrame], str]] = {}
+    for sym in syms:
+        st = _statements(quarterly, sym, "3M")
+        if st is not None:
+            found[sym] = (st, "q")
+
+    # Eksik kalanlar için yıllık tablolar (tek istek)
+    missing = [s for s in syms if s not in found]
+    if missing:
+        ta = Ticker(missing, asynchronous=True)
+        if meter is not None:
+            meter.attach(getattr(ta, "session", None))
+        annual = ta.all_financial_data(frequency="a")
+        for sym in missing:
+            st = _statements(annual, sym, "12M")
+            if st is not None:
+                found[sym] = (st, "a")
+
+    out: Dict[str, Dict[str, Any]] = {}
+    for sym, (st, freq) in found.items():
+        mods = modules.get(sym)
+        if not isinstance(mods, dict):
+            continue
+        info = _merge_info(mods)
+        last_price = info.get("currentPrice") or info.get("regularMarketPrice")
+        out[sym] = {
+            "symbol": sym,
+            "last_price": last_price,
+            "info": info,
+            "shares_fast": info.get("sharesOutstanding"),
+            "fin": st["fin"],
+            "bal": st["bal"],
+            "cf": st["cf"],
+            "source": f"yahooquery:{freq}",
+        }
+    return out
@@ -1,9 +1,11 @@
 # coding: utf-8
 # temel_analiz/veri_saglayicilar/veri_saglayici.py
 from __future__ import annotations
+import hashlib
 import os
 import time
 import random
+import numpy as np
 import yfinance as yf
 import pandas as pd
 from temel_analiz.veri.modeller import CompanyData, FinancialPeriod
@@ -47,6 +49,22 @@ def _detect_sector_smart(symbol: str, info: dict) -> str:
     return "INDUSTRY"
 
 
+def is_rate_limit_error(e: Exception) -> bool:
+    err_msg = str(e).lower()
+    return "too many requests" in err_msg or "429" in err_msg
+
+
+def is_no_data_error(e: Exception) -> bool:
+    """Delist / hiç fiyat / currentTradingPeriod bug'i / timestamp keyerror -> kalıcı 'VERİ YOK'."""
+    err_msg = str(e).lower()
+    return (
+        "delisted" in err_msg
+        or "no data" in err_msg
+        or "currenttradingperiod" in err_msg
+        or err_msg.startswith("timestamp(")
+    )
+
+
 def fetch_company(symbol: str) -> CompanyData:
     """
     Dışarıdan kullandığın ana fonksiyon.
@@ -65,21 +83,14 @@ def fetch_company(symbol: str) -> CompanyData:
         try:
             return _fetch_internal(sym)
         except Exception as e:
-            err_msg = str(e).lower()
-
             # Hız limiti / 429
-            if "too many requests" in err_msg or "429" in err_msg:
+            if is_rate_limit_error(e):
                 print(f"⚠️  UYARI ({sym}): Hız sınırı! 5 saniye bekleniyor...")
                 time.sleep(5)
                 continue
 
-            # Kalıcı veri yok: delist / hiç fiyat / currentTradingPeriod bug'i / timestamp keyerror
-            elif (
-                "delisted" in err_msg
-                or "no data" in err_msg
-                or "currenttradingperiod" in err_msg
-                or err_msg.startswith("timestamp(")
-            ):
+            # Kalıcı veri yok
+            elif is_no_data_error(e):
                 if attempt == 0:
                     print(
                         f"❌  VERİ YOK ({sym}): "
@@ -105,101 +116,210 @@ def _fetch_internal(sym: str) -> CompanyData:
     - Yoksa Yahoo Finance üzerinden finansal tabloları çeker.
     - CompanyData nesnesi üretir.
     """
+    return parse_raw(download_raw(sym))
+
+
+def download_raw(sym: str, meter=None) -> dict:
+    """
+    Ağ kısmı (I/O): Yahoo'dan ham tablolar + info. Ayrıştırma yapmaz.
+    Dönüş picklable bir dict (process pool'a gönderilebilir).
+    Yerel CSV varsa {"symbol", "company"} döner.
+    meter: RequestMeter (toplu_temel) verilirse yapılan istekler sayılır.
+    Toplu yol için bkz. toplu_temel.download_raw_batch.
+    """
     # Önce yerel CSV var mı bak
     csv_path = os.path.join("data", f"{sym}.csv")
     if os.path.exists(csv_path):
         cd = load_company_from_csv(sym, csv_path)
         if cd:
-            return cd
-
-    ticker = yf.Ticker(sym)
+            return {"symbol": sym, "company": cd}
 
-    # Bağlantıyı tetikle (bazı yfinance bug'larını azaltıyor)
-    try:
-        ticker.history(period="5d")
-    except Exception:
-        pass
+    def _count(n: int = 1) -> None:
+        if meter is not None:
+            meter.count(n)
 
-    fast_info = ticker.fast_info
-    last_price = fast_info.last_price if fast_info else None
+    ticker = yf.Ticker(sym)
 
+    # Fiyat ve hisse sayısı info'dan (tek istek). Eskiden bağlantıyı
+    # "tetiklemek" için history(5d) + fast_info da çekiliyordu; artık
+    # fast_info sadece info'da eksik varsa.
     info = ticker.info or {}
-    if not info and last_price:
-        info = {}
-
-    sector_normalized = _detect_sector_smart(sym, info)
-    raw_sector = info.get("sector", "Unknown")
-    shares_out = info.get("sharesOutstanding") or (fast_info.shares if fast_info else None)
+    _count()
+    last_price = info.get("currentPrice") or info.get("regularMarketPrice")
+    shares_fast = None
+    if not last_price or not info.get("sharesOutstanding"):
+        fast_info = ticker.fast_info
+        if fast_info:
+            if not last_price:
+                last_price = fast_info.last_price
+                _count()
+            if not info.get("sharesOutstanding"):
+                shares_fast = fast_info.shares
+                _count()
 
     # Tabloları çek
     fin_q = ticker.quarterly_financials
     bal_q = ticker.quarterly_balance_sheet
     cf_q = ticker.quarterly_cashflow
+    _count(3)
 
     # Eğer çeyreklikler boşsa yıllıklara fallback
     if fin_q.empty:
         fin_q = ticker.financials
         bal_q = ticker.balance_sheet
         cf_q = ticker.cashflow
+        _count(3)
         if fin_q.empty:
             # Hata fırlat ki yukarıda yakalayıp log basalım
             raise ValueError("Finansal tablolar boş.")
 
-    periods: list[FinancialPeriod] = []
+    return {
+        "symbol": sym,
+        "last_price": last_price,
+        "info": dict(info),
+        "shares_fast": shares_fast,
+        "fin": fin_q,
+        "bal": bal_q,
+        "cf": cf_q,
+    }
 
-    # Son 4–5 kolonu al (en yeni → eski)
-    cols = fin_q.columns[:5]
 
-    for date_col in cols:
-        def get_val(df: pd.DataFrame, keys):
-            for k in keys:
-                if k in df.index:
-                    val = df.loc[k, date_col]
-                    if pd.notna(val):
-                        return float(val)
-            return 0.0
-
-        rev = get_val(fin_q, ["Total Revenue", "Operating Revenue", "Revenue"])
-        net_inc = get_val(fin_q, ["Net Income", "Net Income Common Stockholders"])
-
-        ebitda = get_val(fin_q, ["EBITDA", "Normalized EBITDA"])
-        if ebitda == 0.0 and sector_normalized not in ["BANK", "INSURANCE"]:
-            op_inc = get_val(fin_q, ["Operating Income", "EBIT"])
-            depr = abs(get_val(cf_q, ["Depreciation", "Depreciation And Amortization"]))
-            ebitda = op_inc + depr
-
-        equity = get_val(bal_q, ["Stockholders Equity", "Total Equity Gross Minority Interest"])
-        assets = get_val(bal_q, ["Total Assets"])
-        liab = get_val(
-            bal_q,
-            ["Total Liabilities Net Minority Interest", "Total Liabilities"],
-        )
+def raw_fingerprint(raw: dict) -> str:
+    """
+    Ham tabloların özeti (sha1, 16 hane). Değer değişmediyse aynı kalır;
+    artımlı taramada "tablolar değişti mi?" sorusu için kullanılır.
+    """
+    h = hashlib.sha1()
+    if raw.get("company") is not None:
+        h.update(repr(raw["company"].periods).encode("utf-8"))
+        return h.hexdigest()[:16]
+
+    for key in ("fin", "bal", "cf"):
+        df = raw.get(key)
+        if df is None or df.empty:
+            continue
+        h.update(key.encode("utf-8"))
+        h.update("|".join(map(str, df.columns)).encode("utf-8"))
+        h.update("|".join(map(str, df.index)).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()[:16]
+
+
+# ============================================================
+# TABLO -> FinancialPeriod
+# ============================================================
+
+# Kanonik alan -> (tablo, Yahoo satır adları; ilk dolu olan kazanır)
+ROW_ALIASES = {
+    "revenue":      ("fin", ["Total Revenue", "Operating Revenue", "Revenue"]),
+    "net_income":   ("fin", ["Net Income", "Net Income Common Stockholders"]),
+    "ebitda":       ("fin", ["EBITDA", "Normalized EBITDA"]),
+    "op_income":    ("fin", ["Operating Income", "EBIT"]),
+    "depreciation": ("cf",  ["Depreciation", "Depreciation And Amortization"]),
+    "equity":       ("bal", ["Stockholders Equity", "Total Equity Gross Minority Interest"]),
+    "assets":       ("bal", ["Total Assets"]),
+    "liabilities":  ("bal", ["Total Liabilities Net Minority Interest", "Total Liabilities"]),
+    "total_debt":   ("bal", ["Total Debt", "Total Financial Debt"]),
+    "long_debt":    ("bal", ["Long Term Debt"]),
+    "current_debt": ("bal", ["Current Debt"]),
+    "cash":         ("bal", ["Cash And Cash Equivalents", "Cash Financial"]),
+    "cfo":          ("cf",  ["Operating Cash Flow", "Total Cash From Operating Activities"]),
+    "capex":        ("cf",  ["Capital Expenditure", "Capital Expenditures"]),
+}
+
+# Tablo başına tek reindex için satır listesi
+_STATEMENT_ROWS = {
+    key: list(dict.fromkeys(a for tbl, aliases in ROW_ALIASES.values() if tbl == key for a in aliases))
+    for key in ("fin", "bal", "cf")
+}
+
+
+def _statement_fields(raw: dict, cols) -> dict:
+    """
+    Her tablo için TEK reindex (alias satırları x dönemler; get_indexer ile
+    konumsal), sonra her
+    kanonik alan için alias'lar arasında ilk NaN olmayan değer; yoksa 0.0.
+    Dönüş: {alan: np.ndarray (dönem sayısı)}
+    """
+    mats = {}
+    for key, rows in _STATEMENT_ROWS.items():
+        df = raw[key]
+        if not df.index.is_unique:
+            df = df[~df.index.duplicated()]
+        # reindex'in konumsal hali: DataFrame kopyası/hizalaması olmadan
+        pos = {label: i for i, label in enumerate(df.index)}
+        ri = np.array([pos.get(r, -1) for r in rows], dtype=np.intp)
+        ci = np.arange(len(cols)) if df.columns[:len(cols)].equals(cols) else df.columns.get_indexer(cols)
+        try:
+            vals = df.to_numpy(dtype=float, na_value=np.nan)
+        except (TypeError, ValueError):
+            vals = df.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        mat = np.full((len(rows), len(cols)), np.nan)
+        rok, cok = ri >= 0, ci >= 0
+        mat[np.ix_(rok, cok)] = vals[np.ix_(ri[rok], ci[cok])]
+        mats[key] = ({r: i for i, r in enumerate(rows)}, mat)
+
+    out = {}
+    for field, (key, aliases) in ROW_ALIASES.items():
+        pos, mat = mats[key]
+        block = mat[[pos[a] for a in aliases]]
+        val = np.zeros(len(cols))
+        filled = np.zeros(len(cols), dtype=bool)
+        for row in block:
+            take = ~filled & ~np.isnan(row)
+            val[take] = row[take]
+            filled |= take
+        out[field] = val
+    return out
+
+
+def parse_raw(raw: dict) -> CompanyData:
+    """
+    CPU kısmı (pandas): ham tablolardan CompanyData. Ağa çıkmaz.
+    """
+    if raw.get("company") is not None:
+        return raw["company"]
+
+    sym = raw["symbol"]
+    last_price = raw.get("last_price")
+    info = raw.get("info") or {}
+    fin_q = raw["fin"]
+
+    sector_normalized = _detect_sector_smart(sym, info)
+    raw_sector = info.get("sector", "Unknown")
+    shares_out = info.get("sharesOutstanding") or raw.get("shares_fast")
+    non_fin = sector_normalized not in ["BANK", "INSURANCE"]
 
-        total_debt = get_val(bal_q, ["Total Debt", "Total Financial Debt"])
-        if total_debt == 0.0 and sector_normalized not in ["BANK", "INSURANCE"]:
-            total_debt = get_val(bal_q, ["Long Term Debt"]) + get_val(bal_q, ["Current Debt"])
-
-        cash = get_val(bal_q, ["Cash And Cash Equivalents", "Cash Financial"])
-        cfo = get_val(cf_q, ["Operating Cash Flow", "Total Cash From Operating Activities"])
-        capex = abs(get_val(cf_q, ["Capital Expenditure", "Capital Expenditures"]))
-
-        periods.append(
-            FinancialPeriod(
-                period=date_col.strftime("%Y-%m-%d"),
-                revenue=rev,
-                net_income=net_inc,
-                ebitda=ebitda,
-                equity=equity,
-                assets=assets,
-                liabilities=liab,
-                cfo=cfo,
-                capex=capex,
-                shares_out=shares_out if shares_out else 1.0,
-                price=None,
-                total_debt=total_debt,
-                cash_and_equivalents=cash,
-            )
+    # Son 4–5 kolonu al (en yeni → eski)
+    cols = fin_q.columns[:5]
+    f = _statement_fields(raw, cols)
+
+    ebitda = f["ebitda"]
+    if non_fin:
+        ebitda = np.where(ebitda == 0.0, f["op_income"] + np.abs(f["depreciation"]), ebitda)
+    total_debt = f["total_debt"]
+    if non_fin:
+        total_debt = np.where(total_debt == 0.0, f["long_debt"] + f["current_debt"], total_debt)
+    capex = np.abs(f["capex"])
+
+    periods: list[FinancialPeriod] = [
+        FinancialPeriod(
+            period=date_col.strftime("%Y-%m-%d"),
+            revenue=float(f["revenue"][j]),
+            net_income=float(f["net_income"][j]),
+            ebitda=float(ebitda[j]),
+            equity=float(f["equity"][j]),
+            assets=float(f["assets"][j]),
+            liabilities=float(f["liabilities"][j]),
+            cfo=float(f["cfo"][j]),
+            capex=float(capex[j]),
+            shares_out=shares_out if shares_out else 1.0,
+            price=None,
+            total_debt=float(total_debt[j]),
+            cash_and_equivalents=float(f["cash"][j]),
         )
+        for j, date_col in enumerate(cols)
+    ]
 
     if last_price and periods:
         periods[0].price = last_price
@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+import sys
+
+# repo kökü: api / temel_analiz paketleri buradan import edilir
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,128 @@
+# tests/test_parse_raw.py
+"""
+parse_raw (tablo başına tek hizalı okuma) ile eski hücre hücre get_val
+çıkarımının birebir aynı CompanyData'yı ürettiği.
+"""
+from __future__ import annotations
+
+from dataclasses import asdict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from temel_analiz.veri.modeller import CompanyData, FinancialPeriod
+from temel_analiz.veri_saglayicilar.veri_saglayici import ROW_ALIASES, _detect_sector_smart, parse_raw
+
+
+def _baseline_parse(raw: dict) -> CompanyData:
+    """user-038 öncesi parse_raw (dönem x alan x alias için `in index` + df.loc)."""
+    sym = raw["symbol"]
+    last_price = raw.get("last_price")
+    info = raw.get("info") or {}
+    fin_q, bal_q, cf_q = raw["fin"], raw["bal"], raw["cf"]
+
+    sector_normalized = _detect_sector_smart(sym, info)
+    raw_sector = info.get("sector", "Unknown")
+    shares_out = info.get("sharesOutstanding") or raw.get("shares_fast")
+
+    periods = []
+    for date_col in fin_q.columns[:5]:
+        def get_val(df, keys):
+            for k in keys:
+                if k in df.index:
+                    val = df.loc[k, date_col]
+                    if pd.notna(val):
+                        return float(val)
+            return 0.0
+
+        rev = get_val(fin_q, ["Total Revenue", "Operating Revenue", "Revenue"])
+        net_inc = get_val(fin_q, ["Net Income", "Net Income Common Stockholders"])
+        ebitda = get_val(fin_q, ["EBITDA", "Normalized EBITDA"])
+        if ebitda == 0.0 and sector_normalized not in ["BANK", "INSURANCE"]:
+            op_inc = get_val(fin_q, ["Operating Income", "EBIT"])
+            depr = abs(get_val(cf_q, ["Depreciation", "Depreciation And Amortization"]))
+            ebitda = op_inc + depr
+        equity = get_val(bal_q, ["Stockholders Equity", "Total Equity Gross Minority Interest"])
+        assets = get_val(bal_q, ["Total Assets"])
+        liab = get_val(bal_q, ["Total Liabilities Net Minority Interest", "Total Liabilities"])
+        total_debt = get_val(bal_q, ["Total Debt", "Total Financial Debt"])
+        if total_debt == 0.0 and sector_normalized not in ["BANK", "INSURANCE"]:
+            total_debt = get_val(bal_q, ["Long Term Debt"]) + get_val(bal_q, ["Current Debt"])
+        cash = get_val(bal_q, ["Cash And Cash Equivalents", "Cash Financial"])
+        cfo = get_val(cf_q, ["Operating Cash Flow", "Total Cash From Operating Activities"])
+        capex = abs(get_val(cf_q, ["Capital Expenditure", "Capital Expenditures"]))
+
+        periods.append(FinancialPeriod(
+            period=date_col.strftime("%Y-%m-%d"),
+            revenue=rev, net_income=net_inc, ebitda=ebitda, equity=equity,
+            assets=assets, liabilities=liab, cfo=cfo, capex=capex,
+            shares_out=shares_out if shares_out else 1.0, price=None,
+            total_debt=total_debt, cash_and_equivalents=cash,
+        ))
+
+    if last_price and periods:
+        periods[0].price = last_price
+
+    return CompanyData(
+        symbol=sym,
+        raw_sector=raw_sector,
+        sector_normalized=sector_normalized,
+        periods=periods,
+        last_price=last_price,
+        metrics_ttm=info,
+    )
+
+
+_INFOS = [
+    {"sector": "Industrials", "sharesOutstanding": 1e8},
+    {"sector": "Financial Services - Banks", "industry": "Banks"},  # BANK: EBITDA / borç yedeği yok
+    {"sector": "Insurance"},
+    {"sector": "Real Estate", "sharesOutstanding": 0},
+]
+
+
+def _fixtures(n: int, seed: int = 11):
+    """Yahoo şeklinde tablolar: alias'ların bir kısmı eksik, %20 NaN, sıfır satırlar, farklı kolon sırası."""
+    rng = np.random.default_rng(seed)
+    cols = pd.to_datetime(["2025-09-30", "2025-06-30", "2025-03-31", "2024-12-31", "2024-09-30", "2024-06-30"])
+    out = []
+    for i in range(n):
+        raw = {
+            "symbol": f"T{i:04d}.IS",
+            "last_price": [None, 0.0, 12.5][i % 3],
+            "shares_fast": [None, 5e7][i % 2],
+            "info": dict(_INFOS[i % len(_INFOS)]),
+        }
+        for key in ("fin", "bal", "cf"):
+            rows = [a for tbl, al in ROW_ALIASES.values() if tbl == key for a in al if rng.random() < 0.7]
+            rows += [f"{key} Line {j}" for j in range(30)]
+            rng.shuffle(rows)
+            df = pd.DataFrame(rng.normal(1e8, 3e8, (len(rows), len(cols))), index=rows, columns=cols)
+            df = df.mask(rng.random(df.shape) < 0.2)
+            # EBITDA / toplam borç 0 -> yedek formüller
+            for r in ("EBITDA", "Total Debt"):
+                if r in df.index and rng.random() < 0.3:
+                    df.loc[r] = 0.0
+            if key != "fin" and i % 4 == 0:
+                # bilanço / nakit akışı kolonları farklı sırada
+                df = df[list(reversed(cols))]
+            raw[key] = df
+        out.append(raw)
+    return out
+
+
+def _as_dict(c: CompanyData) -> dict:
+    return asdict(c)
+
+
+@pytest.mark.parametrize("raw", _fixtures(80), ids=lambda r: r["symbol"])
+def test_parse_raw_matches_baseline(raw):
+    assert _as_dict(parse_raw(raw)) == _as_dict(_baseline_parse(raw))
+
+
+def test_parse_raw_empty_statements():
+    cols = pd.to_datetime(["2025-09-30", "2025-06-30"])
+    empty = pd.DataFrame(index=pd.Index([], dtype=object), columns=cols, dtype=float)
+    raw = {"symbol": "EMPTY.IS", "last_price": 3.0, "info": {}, "fin": empty, "bal": empty, "cf": empty}
+    assert _as_dict(parse_raw(raw)) == _as_dict(_baseline_parse(raw))
@@ -0,0 +1,79 @@
+# tests/test_technical_indicators.py
+"""
+Artımlı gösterge yolunun (memo'dan sürdürme) aynı barlar için tam hesapla
+(memo'suz) aynı sonucu verdiği: son bar güncellemesi, yeni bar, pencere kayması.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from api.technical_indicators import DEFAULT_INDICATOR_SET, _compute, _make, parse_indicator_set
+
+TOKENS = parse_indicator_set(DEFAULT_INDICATOR_SET + ",ema5,rsi7,macd5_13_4,bb10_3")
+N = 700
+
+
+def _bars(step: int):
+    rng = np.random.default_rng(5)
+    c = 100.0 + np.cumsum(rng.normal(0, 1.0, N))
+    o = c + rng.normal(0, 0.2, N)
+    return {
+        "t": 1_760_000_000 + np.arange(N, dtype=np.int64) * step,
+        "o": o,
+        "h": np.maximum(o, c) + 0.5,
+        "l": np.minimum(o, c) - 0.5,
+        "c": c,
+        "v": rng.uniform(1_000, 100_000, N),
+    }
+
+
+def _window(bars, lo: int, hi: int):
+    return {k: v[lo:hi].copy() for k, v in bars.items()}
+
+
+def _outputs(tf: str, states):
+    out = {}
+    for tok in TOKENS:
+        o = _make(tok, tf).output(states[tok])
+        out[tok] = o if isinstance(o, dict) else {"": o}
+    return out
+
+
+def _assert_same(tf: str, warm, cold):
+    a, b = _outputs(tf, warm), _outputs(tf, cold)
+    for tok in TOKENS:
+        for k in a[tok]:
+            np.testing.assert_allclose(a[tok][k], b[tok][k], rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=f"{tok}{k}")
+
+
+def _warm_vs_cold(tf: str, old_bars, new_bars):
+    prev_states, _ = _compute(tf, TOKENS, old_bars, None)
+    warm, mode = _compute(tf, TOKENS, new_bars, {"bars": old_bars, "states": prev_states})
+    cold, _ = _compute(tf, TOKENS, new_bars, None)
+    _assert_same(tf, warm, cold)
+    return mode
+
+
+@pytest.mark.parametrize("tf,step", [("1d", 86400), ("15m", 900)])
+def test_last_bar_update(tf, step):
+    bars = _bars(step)
+    old = _window(bars, 0, 600)
+    new = _window(bars, 0, 600)
+    new["c"][-1] += 1.0
+    new["h"][-1] += 1.0
+    new["v"][-1] += 500.0
+    assert _warm_vs_cold(tf, old, new) == "incremental"
+
+
+@pytest.mark.parametrize("tf,step", [("1d", 86400), ("15m", 900)])
+def test_appended_bars(tf, step):
+    bars = _bars(step)
+    assert _warm_vs_cold(tf, _window(bars, 0, 550), _window(bars, 0, 560)) == "incremental"
+
+
+@pytest.mark.parametrize("tf,step", [("1d", 86400), ("15m", 900)])
+def test_window_slide(tf, step):
+    # 600 barlık pencere bir bar kayar: memo'lu sonuç soğuk hesapla aynı olmalı
+    bars = _bars(step)
+    assert _warm_vs_cold(tf, _window(bars, 0, 600), _window(bars, 1, 601)) == "full"
@@ -0,0 +1,102 @@
+# tests/test_toplu_skor.py
+"""
+Toplu skor kartı (build_payloads) ile skaler build_payload'ın birebir
+aynı payload'ı ürettiği (NaN eşit sayılır, tipler de aynı olmalı).
+"""
+from __future__ import annotations
+
+import random
+from typing import Any, List
+
+import pytest
+
+from temel_analiz.hesaplayicilar.puan_karti import build_payload
+from temel_analiz.hesaplayicilar.toplu_skor import build_payloads
+from temel_analiz.veri.modeller import CompanyData, FinancialPeriod
+
+_SECTORS = ["BANK", "INSURANCE", "FINANCE", "REIT", "HOLDING", "DEFENSE", "TECH", "AVIATION",
+            "ENERGY", "TELECOM", "RETAIL", "FOOD", "INDUSTRY", "STEEL", "LOGISTICS", "CONSTRUCTION"]
+
+
+def _companies(n: int, seed: int = 7) -> List[CompanyData]:
+    """Tüm sektörler; boş dönemli, sıfır özkaynaklı, None / NaN metrikli şirketler dahil."""
+    rnd = random.Random(seed)
+
+    def maybe(v, p_none=0.15):
+        return None if rnd.random() < p_none else v
+
+    out = []
+    for i in range(n):
+        periods = []
+        for q in range(rnd.randint(0 if i % 50 == 0 else 1, 8)):
+            periods.append(FinancialPeriod(
+                period=f"{2025 - q // 4}-{12 - 3 * (q % 4):02d}-30",
+                revenue=rnd.uniform(-5e7, 2e9),
+                net_income=rnd.uniform(-3e8, 4e8),
+                ebitda=rnd.uniform(-3e8, 6e8),
+                equity=rnd.choice([0.0, rnd.uniform(-2e8, 5e9)]),
+                assets=rnd.uniform(1e8, 1e10),
+                liabilities=rnd.uniform(1e7, 5e9),
+                cfo=rnd.uniform(-1e8, 5e8),
+                capex=rnd.uniform(0, 2e8),
+                shares_out=rnd.choice([1.0, rnd.uniform(1e6, 3e9)]),
+                total_debt=rnd.uniform(0, 3e9),
+                cash_and_equivalents=rnd.uniform(0, 1e9),
+            ))
+        info = {
+            "profitMargins": maybe(rnd.uniform(-0.3, 0.4)),
+            "returnOnEquity": maybe(rnd.choice([rnd.uniform(-0.5, 0.9), float("nan")])),
+            "returnOnAssets": maybe(rnd.uniform(-0.1, 0.2)),
+            "debtToEquity": maybe(rnd.uniform(0, 400)),
+            "currentRatio": maybe(rnd.uniform(0.2, 4)),
+            "freeCashflow": maybe(rnd.uniform(-5e8, 8e8)),
+            "totalRevenue": maybe(rnd.uniform(0, 8e9)),
+            "marketCap": maybe(rnd.uniform(1e8, 1e11)),
+            "enterpriseToEbitda": maybe(rnd.uniform(-5, 40)),
+            "ebitda": maybe(rnd.uniform(-1e8, 2e9)),
+        }
+        out.append(CompanyData(
+            symbol=f"S{i:04d}.IS",
+            raw_sector="synthetic",
+            sector_normalized=_SECTORS[i % len(_SECTORS)],
+            periods=periods,
+            last_price=maybe(rnd.uniform(0.5, 500.0), 0.05),
+            metrics_ttm=info,
+        ))
+    return out
+
+
+def _same(a: Any, b: Any) -> bool:
+    """NaN'ı eşit sayan birebir karşılaştırma."""
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) and isinstance(b, float) and a != a and b != b:
+        return True
+    return a == b and type(a) is type(b)
+
+
+COMPANIES = _companies(400)
+
+
+@pytest.fixture(scope="module")
+def scalar():
+    return [build_payload(c) for c in COMPANIES]
+
+
+def test_batch_matches_scalar(scalar):
+    batch = build_payloads(COMPANIES)
+    diff = [c.symbol for c, a, b in zip(COMPANIES, scalar, batch) if not _same(a, b)]
+    assert not diff, diff[:5]
+
+
+def test_batch_without_metrics_matches_scalar(scalar):
+    lean = build_payloads(COMPANIES, with_metrics=False)
+    expected = [{k: v for k, v in p.items() if k != "metrics"} for p in scalar]
+    diff = [c.symbol for c, a, b in zip(COMPANIES, expected, lean) if not _same(a, b)]
+    assert not diff, diff[:5]
+
+
+def test_batch_empty():
+    assert build_payloads([]) == []